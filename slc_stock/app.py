@@ -1,13 +1,25 @@
-from datetime import date
+import hashlib
+import json
+from datetime import UTC, date, datetime, timedelta
 from pathlib import Path
+from typing import Optional
 
-from flask import Blueprint, Flask, jsonify, request
+from flask import Blueprint, Flask, Response, jsonify, request
 
+from slc_stock import compression, wire
 import slc_stock.providers.yfinance_provider  # noqa: F401 — register providers
 import slc_stock.providers.alpha_vantage_provider  # noqa: F401
 import slc_stock.providers.polygon_provider  # noqa: F401
+from slc_stock.config import (
+    BATCH_MAX_ITEMS,
+    HISTORY_MAX_SYMBOLS,
+    HTTP_IMMUTABLE_MAX_AGE,
+    HTTP_MAX_AGE,
+    HTTP_MUTABLE_DAYS,
+    HTTP_STALE_WHILE_REVALIDATE,
+)
 from slc_stock.logging_config import setup_logging
-from slc_stock.providers import SymbolNotFoundError
+from slc_stock.providers import SymbolNotFoundError, get_provider
 from slc_stock.service import QuoteService
 from slc_stock.validation import is_valid_symbol_format
 
@@ -15,6 +27,10 @@ api = Blueprint("api", __name__)
 
 _svc: QuoteService | None = None
 
+_HISTORY_FORMATS = ("rows", "columnar")
+_MAX_PAGE_ROWS = 10000
+_EPOCH = date(1970, 1, 1)
+
 
 def _get_svc() -> QuoteService:
     global _svc
@@ -23,11 +39,69 @@ def _get_svc() -> QuoteService:
     return _svc
 
 
+def _etag(*parts) -> str:
+    """An entity tag for this request's URL plus whatever else decides the body."""
+    key = repr((request.full_path, *parts)).encode()
+    return hashlib.blake2b(key, digest_size=12).hexdigest()
+
+
+def _not_modified(etag: str, last_modified: Optional[datetime] = None):
+    """Return a 304 if the request's validators match, else None.
+
+    ``If-None-Match`` wins over ``If-Modified-Since``, which is only honoured
+    when ``last_modified`` is given. Pass the same values to
+    :func:`_set_validators` on the full response.
+    """
+    if request.if_none_match:
+        # Weak comparison: compression marks the tags it sends as weak.
+        fresh = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        stamp = last_modified.replace(tzinfo=UTC, microsecond=0)
+        fresh = stamp <= request.if_modified_since
+    else:
+        fresh = False
+    if not fresh:
+        return None
+    return _set_validators(Response(status=304), etag, last_modified)
+
+
+def _set_validators(resp, etag: str, last_modified: Optional[datetime] = None):
+    resp.set_etag(etag)
+    if last_modified:
+        resp.last_modified = last_modified.replace(tzinfo=UTC)
+    return resp
+
+
+def _cache_control(resp, newest: Optional[date] = None):
+    """Set Cache-Control for a response built from bars dated up to ``newest``.
+
+    Bars older than ``HTTP_MUTABLE_DAYS`` don't change, so a response made
+    only of those is ``immutable`` for proxies and browsers. Anything else
+    (``newest`` of None means "may include recent bars") gets a short
+    max-age and is revalidated in the background.
+    """
+    cc = resp.cache_control
+    cc.public = True
+    if newest is not None and newest < date.today() - timedelta(days=HTTP_MUTABLE_DAYS):
+        cc.max_age = HTTP_IMMUTABLE_MAX_AGE
+        cc.immutable = True
+    else:
+        cc.max_age = HTTP_MAX_AGE
+        cc.stale_while_revalidate = HTTP_STALE_WHILE_REVALIDATE
+    return resp
+
+
 @api.route("/health")
 def health():
     return jsonify({"status": "ok"})
 
 
+def _date_arg(name: str) -> Optional[date]:
+    """Parse an optional YYYY-MM-DD query parameter; raises ValueError."""
+    value = request.args.get(name)
+    return date.fromisoformat(value) if value else None
+
+
 def _check_symbol(symbol: str):
     """Return a 400 JSON response if the symbol format is invalid, else None."""
     if not is_valid_symbol_format(symbol):
@@ -48,7 +122,7 @@ def stock_quote_latest(symbol: str):
         return jsonify({"error": str(exc)}), 400
     if result is None:
         return jsonify({"error": f"No quote available for {symbol.upper()}"}), 404
-    return jsonify(result)
+    return _cache_control(jsonify(result))
 
 
 @api.route("/stock/quote/<symbol>/<date_str>")
@@ -65,8 +139,11 @@ def stock_quote(symbol: str, date_str: str):
     provider_arg = request.args.get("provider")
 
     if provider_arg == "all":
+        # Only what is stored; other providers' bars may still arrive.
         results = svc.get_quote_all_providers(symbol, day)
-        return jsonify({"symbol": symbol.upper(), "date": date_str, "quotes": results})
+        return _cache_control(
+            jsonify({"symbol": symbol.upper(), "date": date_str, "quotes": results})
+        )
 
     try:
         result = svc.get_quote(symbol, day, provider_name=provider_arg)
@@ -75,7 +152,172 @@ def stock_quote(symbol: str, date_str: str):
 
     if result is None:
         return jsonify({"error": f"No quote found for {symbol.upper()} on {date_str}"}), 404
-    return jsonify(result)
+    # A fallback across a trading session rests on a "no bar" answer that
+    # expires, so only an exact bar or one across a closure is final.
+    bar = date.fromisoformat(result["date"])
+    final = bar == day or not svc.sessions_between(bar + timedelta(days=1), day)
+    return _cache_control(jsonify(result), day if final else None)
+
+
+@api.route("/stock/quotes", methods=["POST"])
+def stock_quotes_batch():
+    body = request.get_json(silent=True)
+    items = body.get("items") if isinstance(body, dict) else None
+    if not isinstance(items, list):
+        return jsonify({
+            "error": 'Expected a JSON body like {"items": [{"symbol": "CSCO", "date": "2026-02-13"}]}.'
+        }), 400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"At most {BATCH_MAX_ITEMS} items per request."}), 400
+    provider_arg = body.get("provider") or request.args.get("provider")
+
+    # Malformed items get their own status; the rest go to the service.
+    results: list[Optional[dict]] = []
+    valid = []
+    for item in items:
+        symbol = item.get("symbol") if isinstance(item, dict) else None
+        date_str = item.get("date") if isinstance(item, dict) else None
+        try:
+            day = date.fromisoformat(date_str)
+        except (TypeError, ValueError):
+            day = None
+        if not isinstance(symbol, str) or not is_valid_symbol_format(symbol) or day is None:
+            results.append({
+                "symbol": symbol,
+                "date": date_str,
+                "status": "invalid",
+                "error": "Each item needs a valid symbol and a YYYY-MM-DD date.",
+            })
+        else:
+            results.append(None)
+            valid.append((symbol, day))
+
+    try:
+        resolved = iter(_get_svc().get_quotes(valid, provider_name=provider_arg))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    results = [r if r is not None else next(resolved) for r in results]
+    return jsonify({"count": len(results), "results": results})
+
+
+@api.route("/stock/history", methods=["GET", "POST"])
+def stock_history_multi():
+    if request.method == "POST":
+        params = request.get_json(silent=True)
+        if not isinstance(params, dict):
+            return jsonify({"error": "Expected a JSON object body."}), 400
+        symbols = params.get("symbols") or []
+        if isinstance(symbols, str):
+            symbols = [symbols]
+    else:
+        params = request.args.to_dict()
+        # symbols=A,B and symbols=A&symbols=B both work.
+        symbols = request.args.getlist("symbols")
+    symbols = [
+        s.strip() for part in symbols if isinstance(part, str)
+        for s in part.split(",") if s.strip()
+    ]
+    if not symbols:
+        return jsonify({"error": "symbols is required."}), 400
+    if len(symbols) > HISTORY_MAX_SYMBOLS:
+        return jsonify({"error": f"At most {HISTORY_MAX_SYMBOLS} symbols per request."}), 400
+    bad = [s for s in symbols if not is_valid_symbol_format(s)]
+    if bad:
+        return jsonify({"error": f"Invalid symbol format: {bad[:10]}"}), 400
+
+    try:
+        start = date.fromisoformat(params["start"])
+        end = date.fromisoformat(params["end"]) if params.get("end") else date.today()
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "start (and optional end) must be YYYY-MM-DD."}), 400
+    if start > end:
+        return jsonify({"error": "start must not be after end."}), 400
+
+    provider_arg = params.get("provider")
+    if provider_arg:
+        try:
+            get_provider(provider_arg)
+        except (TypeError, ValueError) as exc:
+            return jsonify({"error": str(exc)}), 400
+    fields = params.get("fields")
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(",") if f.strip()]
+    fmt = params.get("format", "rows")
+    if fmt not in _HISTORY_FORMATS:
+        return jsonify({
+            "error": f"Unknown format '{fmt}'. Available: {list(_HISTORY_FORMATS)}"
+        }), 400
+    align = str(params.get("align", "")).lower() in ("1", "true", "yes", "on")
+    try:
+        mimetype = wire.negotiate(request.accept_mimetypes)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 406
+    if align and mimetype != wire.MIME_JSON:
+        return jsonify({"error": "align=true responses are only available as JSON."}), 406
+    svc = _get_svc()
+
+    from slc_stock.config import DEFAULT_PROVIDER as _dp
+
+    try:
+        if align:
+            result = svc.get_history_matrix(
+                symbols, start, end, provider_name=provider_arg,
+                field=params.get("field", "close"),
+            )
+            result.update(start=start.isoformat(), end=end.isoformat())
+            resp = jsonify(result)
+            resp.vary.add("Accept")
+            return _cache_control(resp)
+        if mimetype != wire.MIME_JSON:
+            # Binary encodings are always columnar: the symbols' columns
+            # back to back, with each symbol's row count to split them.
+            names, counts, columns = [], [], {}
+            for symbol, history in svc.iter_histories(
+                symbols, start, end, provider_name=provider_arg,
+                fields=fields, columnar=True, typed=True,
+            ):
+                names.append(symbol)
+                counts.append(len(next(iter(history.values()), ())))
+                for name, values in history.items():
+                    columns.setdefault(name, []).extend(values)
+            meta = {
+                "provider": provider_arg or _dp,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "fields": list(columns),
+                "symbols": names,
+                "counts": counts,
+            }
+            body = wire.encode(mimetype, meta, wire.typed_columns(columns))
+            resp = Response(body, mimetype=mimetype)
+            resp.vary.add("Accept")
+            return _cache_control(resp)
+        histories = svc.iter_histories(
+            symbols, start, end, provider_name=provider_arg,
+            fields=fields, columnar=fmt == "columnar",
+        )
+        # Start the query now so bad parameters are a 400, not a broken stream.
+        first = next(histories, None)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    def generate():
+        head = {
+            "provider": provider_arg or _dp,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "format": fmt,
+        }
+        yield json.dumps(head)[:-1] + ', "symbols": {'
+        if first is not None:
+            yield f"{json.dumps(first[0])}: {json.dumps(first[1])}"
+            for symbol, history in histories:
+                yield f", {json.dumps(symbol)}: {json.dumps(history)}"
+        yield "}}"
+
+    resp = Response(generate(), mimetype="application/json")
+    resp.vary.add("Accept")
+    return _cache_control(resp)
 
 
 @api.route("/stock/history/<symbol>")
@@ -84,26 +326,117 @@ def stock_history(symbol: str):
     if bad:
         return bad
     svc = _get_svc()
-    years = request.args.get("years", 3, type=int)
-    if not 1 <= years <= 30:
-        return jsonify({"error": "years must be between 1 and 30."}), 400
     provider_arg = request.args.get("provider")
-    end = date.today()
-    start = date(end.year - years, end.month, end.day)
-
-    results = svc.get_history(symbol, start, end, provider_name=provider_arg)
-    return jsonify({
-        "symbol": symbol.upper(),
-        "start": start.isoformat(),
-        "end": end.isoformat(),
-        "count": len(results),
-        "quotes": results,
-    })
+    if provider_arg:
+        try:
+            get_provider(provider_arg)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+    try:
+        start = _date_arg("start")
+        end = _date_arg("end") or date.today()
+        after = _date_arg("cursor")
+    except ValueError:
+        return jsonify({"error": "start, end and cursor must be YYYY-MM-DD."}), 400
+    if start is None:
+        years = request.args.get("years", 3, type=int)
+        if not 1 <= years <= 30:
+            return jsonify({"error": "years must be between 1 and 30."}), 400
+        start = date(end.year - years, end.month, end.day)
+    if start > end:
+        return jsonify({"error": "start must not be after end."}), 400
+    limit = request.args.get("limit", type=int)
+    if limit is not None and not 1 <= limit <= _MAX_PAGE_ROWS:
+        return jsonify({"error": f"limit must be between 1 and {_MAX_PAGE_ROWS}."}), 400
+
+    fields = request.args.get("fields")
+    fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    if limit and fields and "date" not in fields:
+        fields.append("date")  # the cursor is a date
+    fmt = request.args.get("format", "rows")
+    if fmt not in _HISTORY_FORMATS:
+        return jsonify({
+            "error": f"Unknown format '{fmt}'. Available: {list(_HISTORY_FORMATS)}"
+        }), 400
+    try:
+        mimetype = wire.negotiate(request.accept_mimetypes)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 406
+
+    version, last_modified = svc.data_version(symbol, provider_arg)
+    etag = _etag(version, start, end, mimetype)
+    settled = end < date.today() - timedelta(days=HTTP_MUTABLE_DAYS)
+    resp = _not_modified(etag, last_modified)
+    if resp:
+        resp.vary.add("Accept")
+        # Without Cache-Control, caches keep the policy sent with the body.
+        return resp if settled else _cache_control(resp)
+
+    # Only a range that is both settled and fully stored is final.
+    newest = end if settled and svc.covers(symbol, start, end, provider_arg) else None
+
+    window = {"start": start.isoformat(), "end": end.isoformat()}
+    bounds = dict(provider_name=provider_arg, fields=fields, after=after, limit=limit)
+    try:
+        if mimetype != wire.MIME_JSON or fmt == "columnar":
+            binary = mimetype != wire.MIME_JSON
+            result = svc.get_history_columns(symbol, start, end, typed=binary, **bounds)
+            dates = result["columns"].get("date")
+            last = dates[-1] if limit and result["count"] == limit else None
+            if binary and last is not None:
+                last = _EPOCH + timedelta(days=last)
+            result.update(window, next_cursor=last and str(last))
+            if binary:
+                # Binary encodings are always columnar.
+                columns = wire.typed_columns(result.pop("columns"))
+                resp = Response(wire.encode(mimetype, result, columns), mimetype=mimetype)
+            else:
+                resp = jsonify(result)
+        else:
+            results = svc.get_history(symbol, start, end, **bounds)
+            more = limit and len(results) == limit
+            resp = jsonify({
+                "symbol": symbol.upper(),
+                **window,
+                "count": len(results),
+                "next_cursor": results[-1]["date"] if more else None,
+                "quotes": results,
+            })
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    resp.vary.add("Accept")
+    return _cache_control(_set_validators(resp, etag, last_modified), newest)
+
+
+@api.route("/stock/changes")
+def stock_changes():
+    since = request.args.get("since", 0, type=int)
+    if since < 0:
+        return jsonify({"error": "since must be a write sequence (0 or more)."}), 400
+    limit = request.args.get("limit", 1000, type=int)
+    if not 1 <= limit <= _MAX_PAGE_ROWS:
+        return jsonify({"error": f"limit must be between 1 and {_MAX_PAGE_ROWS}."}), 400
+    symbol = request.args.get("symbol")
+    if symbol:
+        bad = _check_symbol(symbol)
+        if bad:
+            return bad
+    fields = request.args.get("fields")
+    fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        result = _get_svc().get_changes(
+            since, symbol, request.args.get("provider"), fields, limit
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(result)
 
 
 @api.route("/stock/info")
 def stock_info_all():
-    return jsonify(_get_svc().get_cache_info())
+    svc = _get_svc()
+    etag = _etag(svc.cache_info_version())
+    return _not_modified(etag) or _set_validators(jsonify(svc.get_cache_info()), etag)
 
 
 @api.route("/stock/info/<symbol>")
@@ -111,10 +444,16 @@ def stock_info(symbol: str):
     bad = _check_symbol(symbol)
     if bad:
         return bad
-    result = _get_svc().get_symbol_info(symbol)
+    svc = _get_svc()
+    version, last_modified = svc.data_version(symbol)
+    etag = _etag(version)
+    resp = _not_modified(etag, last_modified)
+    if resp:
+        return resp
+    result = svc.get_symbol_info(symbol)
     if result is None:
         return jsonify({"error": f"No data cached for {symbol.upper()}"}), 404
-    return jsonify(result)
+    return _set_validators(jsonify(result), etag, last_modified)
 
 
 @api.route("/stock/prefetch/<symbol>", methods=["POST"])
@@ -149,6 +488,7 @@ def create_app() -> Flask:
     )
 
     app.register_blueprint(api, url_prefix="/api/v1")
+    compression.init_app(app)
 
     from slc_stock.web import web
     app.register_blueprint(web)
@@ -0,0 +1,453 @@
+"""Streaming readers and writers for database backups.
+
+Backups are a JSON array of quote records, NDJSON (one record per line), or
+the columnar binary format below. Records are written and parsed
+incrementally, so memory use does not grow with the file, and readers track
+a byte ``offset`` from which an interrupted load can resume.
+
+Columnar format, version 1 (all integers little-endian)::
+
+    header   b"SLCQCOL\\0"  u16 version  u16 flags  u32 reserved
+    block*   u32 compressed_len  u32 raw_len  u32 crc32(compressed)  zlib data
+    trailer  u32 0  u64 total_rows  u32 block_count
+
+Each block holds up to ``_BLOCK_ROWS`` rows of one (symbol, provider)::
+
+    u16 len, symbol   u16 len, provider   u32 n
+    int32[n] date (days since 1970-01-01)
+    float64[n] open, high, low, close   (NaN = null)
+    int64[n] volume                     (INT64_MIN = null)
+    uint8[n] adjusted
+    int64[n] fetched_at (microseconds since 1970-01-01 UTC)
+"""
+
+import codecs
+import json
+import math
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import date, datetime, timedelta
+from typing import BinaryIO, Iterable, Iterator, Optional, TextIO
+
+FORMAT_JSON = "json"
+FORMAT_NDJSON = "ndjson"
+FORMAT_COLUMNAR = "columnar"
+
+COLUMNAR_MAGIC = b"SLCQCOL\0"
+COLUMNAR_VERSION = 1
+_HEADER = struct.Struct("<8sHHI")
+_BLOCK = struct.Struct("<III")
+_TRAILER = struct.Struct("<QI")
+_BLOCK_ROWS = 65536
+_NULL_INT = -(2**63)
+_EPOCH = date(1970, 1, 1)
+_EPOCH_DT = datetime(1970, 1, 1)
+
+_CHUNK_SIZE = 1 << 16
+_MAX_RECORD_SIZE = 1 << 20
+_WHITESPACE = " \t\r\n"
+
+
+class BackupFormatError(ValueError):
+    """Raised when a backup file cannot be parsed."""
+
+
+def detect_format(f: BinaryIO) -> str:
+    """Sniff the format: columnar magic, else ``[`` means a JSON array."""
+    pos = f.tell()
+    try:
+        if f.read(len(COLUMNAR_MAGIC)) == COLUMNAR_MAGIC:
+            return FORMAT_COLUMNAR
+        f.seek(pos)
+        while chunk := f.read(64):
+            stripped = chunk.lstrip()
+            if stripped:
+                return FORMAT_JSON if stripped[:1] == b"[" else FORMAT_NDJSON
+        return FORMAT_NDJSON
+    finally:
+        f.seek(pos)
+
+
+def write_json(records: Iterable[dict], f: TextIO) -> int:
+    """Write records as a compact JSON array, one record per line."""
+    count = 0
+    f.write("[")
+    for rec in records:
+        f.write(",\n" if count else "\n")
+        f.write(json.dumps(rec, separators=(",", ":")))
+        count += 1
+    f.write("\n]\n")
+    return count
+
+
+def write_ndjson(records: Iterable[dict], f: TextIO) -> int:
+    """Write records as newline-delimited JSON."""
+    count = 0
+    for rec in records:
+        f.write(json.dumps(rec, separators=(",", ":")))
+        f.write("\n")
+        count += 1
+    return count
+
+
+class RecordReader:
+    """Yield quote records from a JSON array or NDJSON stream.
+
+    ``offset`` is the byte position just past the most recently yielded
+    record; passing it back as ``start_offset`` (with the same ``fmt``)
+    continues from the next record.
+    """
+
+    def __init__(
+        self,
+        f: BinaryIO,
+        fmt: Optional[str] = None,
+        start_offset: int = 0,
+        chunk_size: int = _CHUNK_SIZE,
+    ):
+        if start_offset and fmt is None:
+            raise ValueError("fmt is required when resuming from an offset")
+        self._f = f
+        self._chunk_size = chunk_size
+        f.seek(start_offset)
+        self.format = fmt or detect_format(f)
+        self.offset = start_offset
+        self.count = 0
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        # Whether the opening "[" of a JSON array has been consumed.
+        self._opened = start_offset > 0
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(self._chunk_size)
+        self._buf = self._buf[self._pos:] + self._utf8.decode(chunk, final=not chunk)
+        self._pos = 0
+        if not chunk:
+            self._eof = True
+            return False
+        return True
+
+    def _advance(self, end: int):
+        self.offset += len(self._buf[self._pos:end].encode("utf-8"))
+        self._pos = end
+
+    def _next_token(self) -> Optional[str]:
+        """Skip whitespace and return the next character, or None at EOF."""
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._advance(pos)
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return None
+
+    def __iter__(self) -> Iterator[dict]:
+        return self
+
+    def __next__(self) -> dict:
+        if self.format == FORMAT_JSON:
+            token = self._next_token()
+            if not self._opened:
+                if token != "[":
+                    raise BackupFormatError("JSON backup must be an array of records")
+                self._advance(self._pos + 1)
+                self._opened = True
+                token = self._next_token()
+            if token == ",":
+                self._advance(self._pos + 1)
+                token = self._next_token()
+            if token == "]":
+                raise StopIteration
+            if token is None:
+                raise BackupFormatError("Unexpected end of file inside JSON array")
+        elif self._next_token() is None:
+            raise StopIteration
+
+        while True:
+            try:
+                record, end = self._decoder.raw_decode(self._buf, self._pos)
+                break
+            except json.JSONDecodeError as exc:
+                if len(self._buf) - self._pos > _MAX_RECORD_SIZE:
+                    raise BackupFormatError(f"Record at byte {self.offset} is too large") from exc
+                if not self._fill():
+                    raise BackupFormatError(
+                        f"Invalid record at byte {self.offset}: {exc.msg}"
+                    ) from exc
+
+        self._advance(end)
+        self.count += 1
+        return record
+
+    @property
+    def count_at_offset(self) -> int:
+        """Records yielded before ``offset``: all of them, for this format."""
+        return self.count
+
+
+def _little_endian(arr: array) -> array:
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def _pack_str(value: str) -> bytes:
+    raw = value.encode("utf-8")
+    return struct.pack("<H", len(raw)) + raw
+
+
+def _encode_block(symbol: str, provider: str, rows: list[dict]) -> bytes:
+    dates = array("i", ((date.fromisoformat(r["date"]) - _EPOCH).days for r in rows))
+    prices = [
+        array("d", (math.nan if r.get(col) is None else r[col] for r in rows))
+        for col in ("open", "high", "low", "close")
+    ]
+    volume = array("q", (
+        _NULL_INT if r.get("volume") is None else round(r["volume"]) for r in rows
+    ))
+    adjusted = array("B", (1 if r.get("adjusted", True) else 0 for r in rows))
+    fetched = array("q", (
+        (datetime.fromisoformat(r["fetched_at"]).replace(tzinfo=None) - _EPOCH_DT)
+        // timedelta(microseconds=1)
+        for r in rows
+    ))
+    parts = [_pack_str(symbol), _pack_str(provider), struct.pack("<I", len(rows))]
+    for column in (dates, *prices, volume, adjusted, fetched):
+        parts.append(_little_endian(column).tobytes())
+    return b"".join(parts)
+
+
+def _decode_block(raw: bytes) -> list[dict]:
+    view = memoryview(raw)
+    pos = 0
+
+    def take_str() -> str:
+        nonlocal pos
+        (n,) = struct.unpack_from("<H", view, pos)
+        value = bytes(view[pos + 2:pos + 2 + n]).decode("utf-8")
+        pos += 2 + n
+        return value
+
+    def take(typecode: str, count: int) -> array:
+        nonlocal pos
+        arr = array(typecode)
+        size = arr.itemsize * count
+        arr.frombytes(view[pos:pos + size])
+        pos += size
+        return _little_endian(arr)
+
+    symbol = take_str()
+    provider = take_str()
+    (n,) = struct.unpack_from("<I", view, pos)
+    pos += 4
+    dates = take("i", n)
+    opens, highs, lows, closes = (take("d", n) for _ in range(4))
+    volume = take("q", n)
+    adjusted = take("B", n)
+    fetched = take("q", n)
+    if pos != len(raw):
+        raise BackupFormatError("Columnar block has trailing bytes")
+
+    def price(v: float) -> Optional[float]:
+        return None if math.isnan(v) else v
+
+    return [
+        {
+            "symbol": symbol,
+            "date": (_EPOCH + timedelta(days=dates[i])).isoformat(),
+            "open": price(opens[i]),
+            "high": price(highs[i]),
+            "low": price(lows[i]),
+            "close": price(closes[i]),
+            "volume": None if volume[i] == _NULL_INT else volume[i],
+            "adjusted": bool(adjusted[i]),
+            "provider": provider,
+            "fetched_at": (_EPOCH_DT + timedelta(microseconds=fetched[i])).isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+def write_columnar(records: Iterable[dict], f: BinaryIO, level: int = 6) -> int:
+    """Write records (grouped by symbol and provider) in the columnar format.
+
+    Records are buffered one block at a time; consecutive records with the
+    same symbol and provider share a block.
+    """
+    f.write(_HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, 0, 0))
+    total = 0
+    blocks = 0
+    group = None
+    rows: list[dict] = []
+
+    def flush():
+        nonlocal blocks
+        if rows:
+            raw = _encode_block(group[0], group[1], rows)
+            data = zlib.compress(raw, level)
+            f.write(_BLOCK.pack(len(data), len(raw), zlib.crc32(data)))
+            f.write(data)
+            blocks += 1
+            rows.clear()
+
+    for rec in records:
+        key = (rec["symbol"], rec["provider"])
+        if key != group or len(rows) >= _BLOCK_ROWS:
+            flush()
+            group = key
+        rows.append(rec)
+        total += 1
+    flush()
+
+    f.write(struct.pack("<I", 0))
+    f.write(_TRAILER.pack(total, blocks))
+    return total
+
+
+class ColumnarReader:
+    """Yield records from a columnar backup, one decompressed block at a time.
+
+    ``offset`` is the start of the block holding the next record (or the
+    end of the last finished block), so resuming may replay a few records
+    of a partially loaded block; loads are upserts, so that is harmless.
+    """
+
+    format = FORMAT_COLUMNAR
+
+    def __init__(self, f: BinaryIO, start_offset: int = 0):
+        self._f = f
+        self.count = 0
+        self._rows: list[dict] = []
+        self._index = 0
+        self._blocks = 0
+        self._rows_seen = 0
+        self._done = False
+        self._verify_trailer = start_offset == 0
+        f.seek(0)
+        magic, version, _flags, _reserved = _HEADER.unpack(self._read(_HEADER.size))
+        if magic != COLUMNAR_MAGIC:
+            raise BackupFormatError("Not a columnar backup")
+        if version > COLUMNAR_VERSION:
+            raise BackupFormatError(f"Unsupported columnar backup version {version}")
+        if start_offset:
+            f.seek(start_offset)
+        self.offset = f.tell()
+        self._next_block_at = self.offset
+
+    def _read(self, n: int) -> bytes:
+        data = self._f.read(n)
+        if len(data) != n:
+            raise BackupFormatError("Unexpected end of columnar backup")
+        return data
+
+    def _load_block(self) -> bool:
+        self.offset = self._next_block_at
+        (size,) = struct.unpack("<I", self._read(4))
+        if size == 0:
+            total, blocks = _TRAILER.unpack(self._read(_TRAILER.size))
+            if self._verify_trailer and (total, blocks) != (self._rows_seen, self._blocks):
+                raise BackupFormatError("Columnar backup trailer does not match its blocks")
+            self._next_block_at = self._f.tell()
+            self.offset = self._next_block_at
+            return False
+        raw_len, crc = struct.unpack("<II", self._read(8))
+        data = self._read(size)
+        if zlib.crc32(data) != crc:
+            raise BackupFormatError(f"Checksum mismatch in block at byte {self.offset}")
+        raw = zlib.decompress(data)
+        if len(raw) != raw_len:
+            raise BackupFormatError(f"Bad block length at byte {self.offset}")
+        self._rows = _decode_block(raw)
+        self._index = 0
+        self._blocks += 1
+        self._rows_seen += len(self._rows)
+        self._next_block_at = self._f.tell()
+        return True
+
+    def __iter__(self) -> Iterator[dict]:
+        return self
+
+    def __next__(self) -> dict:
+        while self._index >= len(self._rows):
+            if self._done or not self._load_block():
+                self._done = True
+                raise StopIteration
+        rec = self._rows[self._index]
+        self._index += 1
+        self.count += 1
+        if self._index == len(self._rows):
+            self.offset = self._next_block_at
+        return rec
+
+    @property
+    def count_at_offset(self) -> int:
+        """Records yielded before ``offset``.
+
+        Mid-block, ``offset`` is still the block's start, so its rows yielded
+        so far don't count yet: a resume from ``offset`` yields them again.
+        """
+        if self._index < len(self._rows):
+            return self.count - self._index
+        return self.count
+
+
+def open_reader(f: BinaryIO, fmt: Optional[str] = None, start_offset: int = 0):
+    """Return the streaming reader for a backup file, detecting its format."""
+    if start_offset and fmt is None:
+        raise ValueError("fmt is required when resuming from an offset")
+    f.seek(0)
+    fmt = fmt or detect_format(f)
+    if fmt == FORMAT_COLUMNAR:
+        return ColumnarReader(f, start_offset=start_offset)
+    return RecordReader(f, fmt=fmt, start_offset=start_offset)
+
+
+class Checkpoint:
+    """Progress marker for a resumable load, stored next to the backup file."""
+
+    def __init__(self, path: str):
+        self.path = path + ".checkpoint"
+        self._source = path
+
+    def _fingerprint(self) -> dict:
+        st = os.stat(self._source)
+        return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+    def read(self) -> Optional[dict]:
+        """Return the saved position, or None if absent or for another file."""
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("source") != self._fingerprint():
+            return None
+        return state
+
+    def write(self, fmt: str, offset: int, records: int):
+        state = {
+            "source": self._fingerprint(),
+            "format": fmt,
+            "offset": offset,
+            "records": records,
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
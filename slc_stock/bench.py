@@ -0,0 +1,230 @@
+"""Benchmark quotes table layouts on a synthetic database.
+
+    python -m slc_stock.bench --rows 10000000
+
+Builds the same data in three layouts and times the query shapes the
+service runs:
+
+- ``legacy``: rowid table with single-column indexes on symbol and date
+  plus the (symbol, date, provider) unique constraint (schema version 1).
+- ``indexed``: the legacy table after migration 2, which replaces them
+  with a (symbol, provider, date) key index.
+- ``clustered``: ``QUOTES_WITHOUT_ROWID``, with rows stored in key order.
+- ``compact``: clustered plus ``QUOTES_COMPACT_STORAGE`` (epoch-day
+  INTEGER dates, INTEGER volume).
+
+Rows are inserted day by day across all symbols, the order a daily refresh
+produces them, so a rowid table scatters each symbol's history over many
+pages.
+"""
+
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import click
+from sqlalchemy import create_engine
+
+from slc_stock import migrations
+from slc_stock.models import SymbolStat, _from_epoch_day
+from slc_stock.trading_calendar import get_calendar
+
+_EPOCH = date(1970, 1, 1)
+
+_LEGACY_DDL = [
+    """CREATE TABLE quotes (
+        id INTEGER NOT NULL,
+        symbol VARCHAR NOT NULL,
+        date DATE NOT NULL,
+        open FLOAT,
+        high FLOAT,
+        low FLOAT,
+        close FLOAT,
+        volume FLOAT,
+        adjusted BOOLEAN NOT NULL,
+        provider VARCHAR NOT NULL,
+        fetched_at DATETIME NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_symbol_date_provider UNIQUE (symbol, date, provider)
+    )""",
+    "CREATE INDEX ix_quotes_symbol ON quotes (symbol)",
+    "CREATE INDEX ix_quotes_date ON quotes (date)",
+]
+
+# Query shape -> (SQL, days between the start and end bounds).
+_QUERIES = {
+    "history (1y)": (
+        "SELECT symbol, date, open, high, low, close, volume, adjusted, provider, fetched_at "
+        "FROM quotes WHERE symbol = ? AND provider = ? AND date >= ? AND date <= ? "
+        "ORDER BY date",
+        365,
+    ),
+    "stored dates (1y)": (
+        "SELECT date FROM quotes "
+        "WHERE symbol = ? AND provider = ? AND date >= ? AND date <= ?",
+        365,
+    ),
+    "quote fallback": (
+        "SELECT symbol, date, open, high, low, close, volume, adjusted, provider, fetched_at "
+        "FROM quotes WHERE symbol = ? AND provider = ? AND date >= ? AND date <= ? "
+        "ORDER BY date DESC LIMIT 1",
+        7,
+    ),
+}
+
+
+def _build_legacy(path: str, rows: int, providers: list[str], years: int):
+    end = date.today()
+    sessions = get_calendar("weekdays").sessions_between(
+        date(end.year - years, end.month, 1), end
+    )
+    per_symbol = len(sessions) * len(providers)
+    symbols = [f"S{i:05d}" for i in range(max(1, -(-rows // per_symbol)))]
+    fetched = datetime.now().isoformat(sep=" ")
+
+    conn = sqlite3.connect(path)
+    try:
+        for stmt in _LEGACY_DDL:
+            conn.execute(stmt)
+        written = 0
+        for day in sessions:
+            iso = day.isoformat()
+            batch = []
+            for symbol in symbols:
+                for provider in providers:
+                    if written + len(batch) >= rows:
+                        break
+                    price = 100.0 + random.random()
+                    batch.append((
+                        symbol, iso, price, price + 1, price - 1, price + 0.5,
+                        float(random.randint(1, 10_000_000)), 1, provider, fetched,
+                    ))
+            conn.executemany(
+                "INSERT INTO quotes (symbol, date, open, high, low, close, volume, "
+                "adjusted, provider, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+            written += len(batch)
+        conn.commit()
+    finally:
+        conn.close()
+    return symbols, sessions
+
+
+# Layout name -> target passed to migrations.rebuild_quotes (None: keep rowid).
+_LAYOUTS = {
+    "legacy": None,
+    "indexed": None,
+    "clustered": {"clustered": True, "compact": False},
+    "compact": {"clustered": True, "compact": True},
+}
+
+
+def _migrate(path: str, name: str):
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        with engine.begin() as conn:
+            if name != "legacy":
+                migrations._key_quotes(conn)
+                migrations._add_quotes_seq(conn)
+            target = _LAYOUTS[name]
+            if target:
+                SymbolStat.__table__.create(conn, checkfirst=True)
+                migrations.rebuild_quotes(conn, migrations.quotes_layout(conn), target)
+        with engine.connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+    finally:
+        engine.dispose()
+
+
+def _time_queries(path: str, params: list[tuple], compact: bool) -> dict[str, float]:
+    def encode(day: date):
+        return (day - _EPOCH).days if compact else day.isoformat()
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA cache_size = -65536")
+        # Warm the OS and page caches so the first shape isn't timed cold.
+        conn.execute("SELECT count(*) FROM quotes").fetchone()
+        sql, window = _QUERIES["history (1y)"]
+        for symbol, provider, day in params:
+            conn.execute(sql, (symbol, provider, encode(day - timedelta(days=window)), encode(day))).fetchall()
+        results = {}
+        for name, (sql, window) in _QUERIES.items():
+            timings = []
+            for symbol, provider, day in params:
+                args = (symbol, provider, encode(day - timedelta(days=window)), encode(day))
+                t0 = time.perf_counter()
+                conn.execute(sql, args).fetchall()
+                timings.append((time.perf_counter() - t0) * 1000)
+            results[name] = statistics.median(timings)
+
+        # The history scan again, decoding dates the way the service does.
+        decode = _from_epoch_day if compact else date.fromisoformat
+        sql, window = _QUERIES["history (1y)"]
+        timings = []
+        for symbol, provider, day in params:
+            args = (symbol, provider, encode(day - timedelta(days=window)), encode(day))
+            t0 = time.perf_counter()
+            [decode(row[1]) for row in conn.execute(sql, args)]
+            timings.append((time.perf_counter() - t0) * 1000)
+        results["history (1y), decoded"] = statistics.median(timings)
+        return results
+    finally:
+        conn.close()
+
+
+@click.command()
+@click.option("--rows", default=1_000_000, show_default=True, help="Quotes to generate.")
+@click.option("--providers", default=2, show_default=True, help="Providers per symbol.")
+@click.option("--years", default=10, show_default=True, help="Years of sessions per symbol.")
+@click.option("--queries", default=200, show_default=True, help="Queries per shape and layout.")
+@click.option("--dir", "workdir", default=None, help="Where to build the databases (default: a temp dir).")
+@click.option("--seed", default=0, show_default=True, help="Random seed.")
+def main(rows: int, providers: int, years: int, queries: int, workdir, seed: int):
+    """Compare range-scan latency across quotes table layouts."""
+    random.seed(seed)
+    own_dir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="slc-stock-bench-")
+    provider_names = [f"p{i}" for i in range(providers)]
+    try:
+        paths = {name: os.path.join(workdir, f"{name}.db") for name in _LAYOUTS}
+        click.echo(f"Building {rows:,} quotes in {workdir} ...", err=True)
+        symbols, sessions = _build_legacy(paths["legacy"], rows, provider_names, years)
+        for name, path in paths.items():
+            if name != "legacy":
+                shutil.copyfile(paths["legacy"], path)
+            _migrate(path, name)
+
+        params = []
+        for _ in range(queries):
+            params.append((
+                random.choice(symbols),
+                random.choice(provider_names),
+                random.choice(sessions[len(sessions) // 10:]),
+            ))
+
+        results = {
+            name: _time_queries(path, params, compact=bool(_LAYOUTS[name] and _LAYOUTS[name]["compact"]))
+            for name, path in paths.items()
+        }
+        shapes = list(results["legacy"])
+        width = max(len(q) for q in shapes)
+        click.echo(f"{'median ms':<{width}}  " + "  ".join(f"{n:>10}" for n in paths))
+        for query in shapes:
+            cells = "  ".join(f"{results[n][query]:>10.3f}" for n in paths)
+            click.echo(f"{query:<{width}}  {cells}")
+        sizes = "  ".join(f"{os.path.getsize(p) / 2**20:>10.1f}" for p in paths.values())
+        click.echo(f"{'size (MiB)':<{width}}  {sizes}")
+    finally:
+        if own_dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe bounded map with LRU eviction and a per-entry TTL.
+
+    A ``maxsize`` of 0 disables the cache; a ``ttl`` of 0 means entries never
+    expire on their own and only leave through eviction or invalidation.
+    With ``weigh``, ``maxsize`` bounds the total weight of the values (e.g.
+    ``weigh=len`` for bytes) rather than their number; a value heavier
+    than ``maxsize`` on its own is not stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float = 0, weigh: Optional[Callable[[Any], int]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._weigh = weigh or (lambda value: 1)
+        self._weight = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires, value = entry
+                if not self.ttl or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._drop(key)
+            self.misses += 1
+            return None
+
+    def _drop(self, key: Hashable):
+        _, value = self._data.pop(key)
+        self._weight -= self._weigh(value)
+
+    def put(self, key: Hashable, value: Any):
+        weight = self._weigh(value)
+        if self.maxsize <= 0 or weight > self.maxsize:
+            return
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._weight += weight
+            while self._weight > self.maxsize:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every key for which ``predicate(key)`` is true."""
+        with self._lock:
+            doomed = [k for k in self._data if predicate(k)]
+            for k in doomed:
+                self._drop(k)
+        return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "weight": self._weight,
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
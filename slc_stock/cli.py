@@ -1,4 +1,5 @@
-import json
+import os
+import sys
 from datetime import date
 
 import click
@@ -6,7 +7,20 @@ import click
 import slc_stock.providers.yfinance_provider  # noqa: F401 — register providers
 import slc_stock.providers.alpha_vantage_provider  # noqa: F401
 import slc_stock.providers.polygon_provider  # noqa: F401
-from slc_stock.config import DEFAULT_PROVIDER
+from slc_stock.backup import (
+    FORMAT_COLUMNAR,
+    FORMAT_JSON,
+    FORMAT_NDJSON,
+    BackupFormatError,
+    Checkpoint,
+    open_reader,
+    write_columnar,
+    write_json,
+    write_ndjson,
+)
+from slc_stock import migrations
+from slc_stock.config import DEFAULT_PROVIDER, WRITE_BATCH_SIZE
+from slc_stock.db import engine
 from slc_stock.logging_config import setup_logging
 from slc_stock.providers import list_providers
 from slc_stock.service import QuoteService
@@ -22,21 +36,23 @@ def cli():
 @click.argument("symbol")
 @click.option("--years", default=3, help="Years of history to fetch.")
 @click.option("--provider", default=DEFAULT_PROVIDER, help="Data provider to use.")
-def prefetch(symbol: str, years: int, provider: str):
+@click.option("--full", is_flag=True, help="Re-download the whole range, not just gaps.")
+def prefetch(symbol: str, years: int, provider: str, full: bool):
     """Download historical quotes into the local database."""
     svc = QuoteService()
     end = date.today()
     start = date(end.year - years, end.month, end.day)
 
     click.echo(f"Fetching {years}y of {symbol.upper()} from {provider} …")
-    count = svc.prefetch(symbol, start, end, provider_name=provider)
+    count = svc.prefetch(symbol, start, end, provider_name=provider, full=full)
     click.echo(f"Stored {count} quotes.")
 
 
 @cli.command("prefetch-all")
 @click.argument("symbol")
 @click.option("--years", default=3, help="Years of history to fetch.")
-def prefetch_all(symbol: str, years: int):
+@click.option("--full", is_flag=True, help="Re-download the whole range, not just gaps.")
+def prefetch_all(symbol: str, years: int, full: bool):
     """Download history from every configured provider."""
     svc = QuoteService()
     end = date.today()
@@ -47,7 +63,7 @@ def prefetch_all(symbol: str, years: int):
             click.echo(f"  {name}: skipped (not configured)")
             continue
         click.echo(f"  {name}: fetching …", nl=False)
-        count = svc.prefetch(symbol, start, end, provider_name=name)
+        count = svc.prefetch(symbol, start, end, provider_name=name, full=full)
         click.echo(f" {count} quotes stored.")
 
 
@@ -86,26 +102,101 @@ def compare(symbol: str, date_str: str):
         )
 
 
+@cli.command()
+@click.option("--dry-run", is_flag=True, help="List pending migrations without applying them.")
+def migrate(dry_run: bool):
+    """Upgrade the database schema to the current version."""
+    with engine.connect() as conn:
+        version = migrations.current_version(conn) or 0
+    steps = migrations.migrate(engine, dry_run=dry_run)
+    if not steps:
+        click.echo(f"Schema is current (version {migrations.HEAD}).")
+        return
+    verb = "Pending" if dry_run else "Applied"
+    for step in steps:
+        click.echo(f"  {verb} {step.version}: {step.name}")
+    if not dry_run:
+        click.echo(f"Schema upgraded from version {version} to {migrations.HEAD}.")
+
+
 @cli.command()
 @click.option("--output", "-o", default="quotes.json", help="Output file path.")
-def dump(output: str):
-    """Export the entire database to a JSON file."""
+@click.option("--format", "fmt",
+              type=click.Choice([FORMAT_JSON, FORMAT_NDJSON, FORMAT_COLUMNAR]),
+              default=FORMAT_JSON, show_default=True, help="Backup file format.")
+@click.option("--symbol", default=None, help="Only dump this symbol.")
+@click.option("--provider", default=None, help="Only dump this provider.")
+@click.option("--start", type=click.DateTime(["%Y-%m-%d"]), default=None,
+              help="Earliest date to include (YYYY-MM-DD).")
+@click.option("--end", type=click.DateTime(["%Y-%m-%d"]), default=None,
+              help="Latest date to include (YYYY-MM-DD).")
+def dump(output: str, fmt: str, symbol, provider, start, end):
+    """Export the database (or a filtered slice of it) to a backup file."""
     svc = QuoteService()
-    records = svc.dump_database()
-    with open(output, "w") as f:
-        json.dump(records, f, indent=2)
-    click.echo(f"Dumped {len(records)} quotes to {output}")
+    records = svc.iter_quotes(
+        symbol=symbol,
+        provider_name=provider,
+        start=start.date() if start else None,
+        end=end.date() if end else None,
+    )
+    if fmt == FORMAT_COLUMNAR:
+        with open(output, "wb") as f:
+            count = write_columnar(records, f)
+    else:
+        writer = write_ndjson if fmt == FORMAT_NDJSON else write_json
+        with open(output, "w") as f:
+            count = writer(records, f)
+    click.echo(f"Dumped {count} quotes to {output}")
 
 
 @cli.command()
-@click.argument("file", type=click.Path(exists=True))
-def load(file: str):
-    """Import quotes from a JSON file into the database."""
+@click.argument("file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", default=WRITE_BATCH_SIZE, show_default=True,
+              help="Records per committed batch.")
+@click.option("--resume/--no-resume", default=True, show_default=True,
+              help="Continue from the checkpoint left by an interrupted load.")
+def load(file: str, batch_size: int, resume: bool):
+    """Import quotes from a JSON, NDJSON or columnar backup file."""
     svc = QuoteService()
-    with open(file) as f:
-        records = json.load(f)
-    count = svc.load_database(records)
-    click.echo(f"Loaded {count} quotes from {file}")
+    checkpoint = Checkpoint(file)
+    state = checkpoint.read() if resume else None
+    if state:
+        click.echo(f"Resuming after {state['records']} records (byte {state['offset']}) …")
+    else:
+        checkpoint.clear()
+
+    with open(file, "rb") as f:
+        try:
+            reader = open_reader(
+                f,
+                fmt=state["format"] if state else None,
+                start_offset=state["offset"] if state else 0,
+            )
+        except BackupFormatError as exc:
+            click.echo(f"Cannot read {file}: {exc}", err=True)
+            raise SystemExit(1)
+        done = state["records"] if state else 0
+
+        with click.progressbar(
+            length=os.path.getsize(file), label="Loading", file=sys.stderr
+        ) as bar:
+            bar.update(reader.offset)
+            last = reader.offset
+
+            def on_commit(stats):
+                nonlocal last
+                checkpoint.write(reader.format, reader.offset, done + reader.count_at_offset)
+                bar.update(reader.offset - last)
+                last = reader.offset
+
+            try:
+                stats = svc.load_records(reader, batch_size=batch_size, on_commit=on_commit)
+            except BackupFormatError as exc:
+                click.echo(f"\nStopped at byte {reader.offset}: {exc}", err=True)
+                raise SystemExit(1)
+
+    checkpoint.clear()
+    click.echo(f"Loaded {stats.total} quotes from {file} ({stats!r})")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+"""gzip / brotli response compression, negotiated on ``Accept-Encoding``.
+
+Bodies of a compressible type and at least ``COMPRESS_MIN_BYTES`` long are
+compressed once they are built; streamed bodies are compressed chunk by
+chunk as they are sent, whatever their size. brotli is preferred when the
+optional ``brotli`` package is installed and the client accepts it.
+
+A response with an ETag is versioned by it (see ``app._etag``), so its
+compressed body is kept in an LRU keyed on (ETag, encoding): polling a
+range that hasn't changed costs a lookup rather than another compression.
+The LRU holds at most ``COMPRESS_CACHE_MB`` of compressed bytes.
+Compressed responses carry the ETag as weak, as the bytes differ from the
+identity encoding.
+"""
+
+import gzip
+import logging
+import zlib
+
+from flask import Flask, request
+
+from slc_stock.cache import LRUCache
+from slc_stock.config import (
+    COMPRESS_CACHE_MB,
+    COMPRESS_LEVEL,
+    COMPRESS_MIN_BYTES,
+    RESPONSE_COMPRESSION,
+)
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+log = logging.getLogger(__name__)
+
+_COMPRESSIBLE = {
+    "application/json",
+    "application/javascript",
+    "application/msgpack",
+    "application/vnd.apache.arrow.stream",
+    "image/svg+xml",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+}
+
+# brotli quality for dynamic responses: near gzip -6 speed, smaller output.
+_BROTLI_QUALITY = 5
+
+# Bounded by bytes: a multi-year history compresses to hundreds of KB.
+_cache = LRUCache(COMPRESS_CACHE_MB * 2**20, weigh=len)
+
+
+def encodings() -> list[str]:
+    """Return the content codings on offer, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0)
+
+
+def _compressor(encoding: str):
+    """Return (feed, finish) functions for incremental compression."""
+    if encoding == "br":
+        c = brotli.Compressor(quality=_BROTLI_QUALITY)
+        return c.process, c.finish
+    c = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)  # 31: gzip framing
+    return c.compress, c.flush
+
+
+def _stream(chunks, encoding: str):
+    feed, finish = _compressor(encoding)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            out = feed(chunk)
+            if out:
+                yield out
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+
+
+def compress_response(resp):
+    """``after_request`` hook: compress ``resp`` in place when worthwhile."""
+    if (
+        resp.status_code != 200
+        or resp.direct_passthrough
+        or "Content-Encoding" in resp.headers
+        or resp.mimetype not in _COMPRESSIBLE
+    ):
+        return resp
+    if not resp.is_streamed and resp.content_length is not None:
+        if resp.content_length < COMPRESS_MIN_BYTES:
+            return resp
+
+    resp.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(encodings())
+    if encoding is None:
+        return resp
+
+    etag, weak = resp.get_etag()
+    if resp.is_streamed:
+        resp.response = _stream(resp.response, encoding)
+        resp.headers.pop("Content-Length", None)
+    else:
+        key = (etag, encoding) if etag else None
+        body = _cache.get(key) if key else None
+        if body is None:
+            body = compress(resp.get_data(), encoding)
+            if key:
+                _cache.put(key, body)
+        resp.set_data(body)
+    resp.headers["Content-Encoding"] = encoding
+    if etag and not weak:
+        resp.set_etag(etag, weak=True)
+    return resp
+
+
+def init_app(app: Flask):
+    if RESPONSE_COMPRESSION:
+        app.after_request(compress_response)
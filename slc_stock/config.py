@@ -21,3 +21,75 @@ try:
     PREFETCH_YEARS = int(os.getenv("PREFETCH_YEARS", "3"))
 except (ValueError, TypeError):
     PREFETCH_YEARS = 3
+
+# Exchange calendar used to resolve the previous trading session on fallback.
+TRADING_CALENDAR = os.getenv("TRADING_CALENDAR", "XNYS")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# In-process cache of recently served quotes (0 entries disables it).
+QUOTE_CACHE_SIZE = _env_int("QUOTE_CACHE_SIZE", 4096)
+QUOTE_CACHE_TTL = _env_int("QUOTE_CACHE_TTL", 300)
+
+# Seconds to remember "no bar for this day" and "unknown symbol" answers.
+NEGATIVE_CACHE_TTL = _env_int("NEGATIVE_CACHE_TTL", 86400)
+INVALID_SYMBOL_TTL = _env_int("INVALID_SYMBOL_TTL", 86400)
+
+# Seconds a provider's confirmation that a symbol exists is trusted.
+SYMBOL_VALIDATION_TTL = _env_int("SYMBOL_VALIDATION_TTL", 7 * 86400)
+
+# Most (symbol, date) items accepted by one POST /api/v1/stock/quotes.
+BATCH_MAX_ITEMS = _env_int("BATCH_MAX_ITEMS", 1000)
+
+# Most symbols accepted by one multi-symbol history request.
+HISTORY_MAX_SYMBOLS = _env_int("HISTORY_MAX_SYMBOLS", 500)
+
+# Rows per INSERT ... ON CONFLICT statement when writing quotes in bulk.
+WRITE_BATCH_SIZE = _env_int("WRITE_BATCH_SIZE", 500)
+
+# SQLite connection profile, applied to every connection the app opens.
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+SQLITE_CACHE_SIZE_KB = _env_int("SQLITE_CACHE_SIZE_KB", 65536)
+SQLITE_MMAP_SIZE_MB = _env_int("SQLITE_MMAP_SIZE_MB", 256)
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+
+# Connections in the read-only pool; writes always share a single connection.
+DB_READ_POOL_SIZE = _env_int("DB_READ_POOL_SIZE", 5)
+
+# Store quotes as a WITHOUT ROWID table clustered on (symbol, provider, date).
+# Existing databases are rebuilt into this layout on startup when enabled.
+QUOTES_WITHOUT_ROWID = _env_bool("QUOTES_WITHOUT_ROWID", False)
+
+# Store quote dates as INTEGER days since 1970-01-01 and volume as INTEGER
+# instead of ISO-text dates and REAL volume. Existing data is converted on
+# startup when this changes.
+QUOTES_COMPACT_STORAGE = _env_bool("QUOTES_COMPACT_STORAGE", False)
+
+# gzip/brotli response compression (see slc_stock/compression.py).
+RESPONSE_COMPRESSION = _env_bool("RESPONSE_COMPRESSION", True)
+COMPRESS_MIN_BYTES = _env_int("COMPRESS_MIN_BYTES", 1024)
+COMPRESS_LEVEL = _env_int("COMPRESS_LEVEL", 6)
+# Memory for compressed bodies kept per (ETag, encoding); 0 disables the cache.
+COMPRESS_CACHE_MB = _env_int("COMPRESS_CACHE_MB", 32)
+
+# HTTP caching: responses made only of bars older than HTTP_MUTABLE_DAYS are
+# sent as immutable; anything more recent gets a short max-age.
+HTTP_MUTABLE_DAYS = _env_int("HTTP_MUTABLE_DAYS", 5)
+HTTP_IMMUTABLE_MAX_AGE = _env_int("HTTP_IMMUTABLE_MAX_AGE", 365 * 86400)
+HTTP_MAX_AGE = _env_int("HTTP_MAX_AGE", 60)
+HTTP_STALE_WHILE_REVALIDATE = _env_int("HTTP_STALE_WHILE_REVALIDATE", 300)
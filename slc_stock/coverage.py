@@ -0,0 +1,32 @@
+"""Plan provider requests that fill only the gaps in stored history."""
+
+from datetime import date
+
+
+def missing_ranges(
+    expected: list[date],
+    present: set[date],
+    merge_within: int = 0,
+) -> list[tuple[date, date]]:
+    """Group the ``expected`` sessions absent from ``present`` into ranges.
+
+    ``expected`` must be sorted. Two runs of missing sessions separated by
+    at most ``merge_within`` present sessions become one range, since
+    re-downloading a few stored days is cheaper than another request.
+    """
+    runs: list[list[int]] = []
+    for i, day in enumerate(expected):
+        if day in present:
+            continue
+        if runs and i - runs[-1][1] - 1 <= merge_within:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    return [(expected[first], expected[last]) for first, last in runs]
+
+
+def span(ranges: list[tuple[date, date]]) -> list[tuple[date, date]]:
+    """Collapse ranges into the single range that covers all of them."""
+    if not ranges:
+        return []
+    return [(ranges[0][0], ranges[-1][1])]
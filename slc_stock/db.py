@@ -1,35 +1,136 @@
 import logging
 
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 
-from slc_stock.config import DATABASE_URL
-from slc_stock.models import Base
+from slc_stock import migrations
+from slc_stock.config import (
+    DATABASE_URL,
+    DB_READ_POOL_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE_MB,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_TEMP_STORE,
+)
 
 log = logging.getLogger(__name__)
 
-engine = create_engine(DATABASE_URL, echo=False)
-Session = sessionmaker(bind=engine)
+_PRAGMA_CHOICES = {
+    "journal_mode": ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"),
+    "synchronous": ("OFF", "NORMAL", "FULL", "EXTRA"),
+    "temp_store": ("DEFAULT", "FILE", "MEMORY"),
+}
+
+
+def _choice(pragma: str, value: str) -> str:
+    value = value.upper()
+    if value not in _PRAGMA_CHOICES[pragma]:
+        raise ValueError(
+            f"Invalid SQLite {pragma} '{value}'. Available: {list(_PRAGMA_CHOICES[pragma])}"
+        )
+    return value
+
+
+def _connection_pragmas() -> list[tuple[str, object]]:
+    """PRAGMAs set on every connection, in the order they are applied."""
+    return [
+        ("busy_timeout", SQLITE_BUSY_TIMEOUT_MS),
+        ("synchronous", _choice("synchronous", SQLITE_SYNCHRONOUS)),
+        # A negative cache_size is in KiB rather than pages.
+        ("cache_size", -SQLITE_CACHE_SIZE_KB),
+        ("mmap_size", SQLITE_MMAP_SIZE_MB * 1024 * 1024),
+        ("temp_store", _choice("temp_store", SQLITE_TEMP_STORE)),
+    ]
+
+
+def _on_connect(pragmas: list[tuple[str, object]]):
+    def apply(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    return apply
+
+
+def _create_engines():
+    """Return ``(writer, reader)`` engines for ``DATABASE_URL``.
+
+    All writes go through one connection, so threads queue in the pool
+    instead of contending for SQLite's file lock. Reads get their own
+    pool of ``query_only`` connections, which WAL lets run alongside the
+    writer. An in-memory database cannot be shared between pools, so it
+    gets a single engine.
+    """
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() != "sqlite":
+        writer = create_engine(url, echo=False)
+        return writer, writer
 
+    pragmas = _connection_pragmas()
+    if url.database in (None, "", ":memory:"):
+        writer = create_engine(url, echo=False)
+        event.listen(writer, "connect", _on_connect(pragmas))
+        return writer, writer
 
-def _migrate_db():
-    """Add columns that were introduced after the initial schema."""
-    insp = inspect(engine)
-    if "quotes" not in insp.get_table_names():
-        return
-    columns = {col["name"] for col in insp.get_columns("quotes")}
-    with engine.begin() as conn:
-        if "adjusted" not in columns:
-            log.info("Migrating: adding 'adjusted' column to quotes table")
-            conn.execute(
-                text("ALTER TABLE quotes ADD COLUMN adjusted BOOLEAN DEFAULT 1")
-            )
+    writer = create_engine(url, echo=False, pool_size=1, max_overflow=0)
+    journal = ("journal_mode", _choice("journal_mode", SQLITE_JOURNAL_MODE))
+    event.listen(writer, "connect", _on_connect([journal] + pragmas))
+
+    reader = create_engine(
+        url, echo=False, pool_size=max(DB_READ_POOL_SIZE, 1), max_overflow=0,
+    )
+    event.listen(reader, "connect", _on_connect(pragmas + [("query_only", "ON")]))
+    return writer, reader
+
+
+engine, read_engine = _create_engines()
+Session = sessionmaker(bind=engine)
+ReadSession = sessionmaker(bind=read_engine)
+
+_REPORTED_PRAGMAS = (
+    "journal_mode", "synchronous", "busy_timeout", "cache_size",
+    "mmap_size", "temp_store", "query_only",
+)
+_PRAGMA_NAMES = {
+    "synchronous": dict(enumerate(_PRAGMA_CHOICES["synchronous"])),
+    "temp_store": dict(enumerate(_PRAGMA_CHOICES["temp_store"])),
+}
 
 
 def init_db():
-    Base.metadata.create_all(engine)
-    _migrate_db()
+    """Create or upgrade the schema; two small queries when it is current."""
+    with engine.connect() as conn:
+        version = migrations.current_version(conn)
+    if version is None or version < migrations.HEAD:
+        migrations.migrate(engine)
+    migrations.ensure_quotes_layout(engine)
 
 
 def get_session():
+    """Session on the writer engine, for anything that modifies the database."""
     return Session()
+
+
+def get_read_session():
+    """Session on the read-only engine."""
+    return ReadSession()
+
+
+def active_pragmas() -> dict:
+    """Return the PRAGMA values in effect on a read connection."""
+    if engine.dialect.name != "sqlite":
+        return {}
+    with read_engine.connect() as conn:
+        values = {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in _REPORTED_PRAGMAS
+        }
+    for name, names in _PRAGMA_NAMES.items():
+        values[name] = names.get(values[name], values[name])
+    values["query_only"] = bool(values["query_only"])
+    return values
@@ -0,0 +1,345 @@
+"""Versioned schema migrations.
+
+Each :class:`Migration` upgrades the schema by one version and is recorded
+in the ``schema_version`` table once applied. New databases are created
+from the models and stamped with the latest version; older databases run
+the steps they are missing, in order, each in its own transaction.
+
+Steps must be idempotent. A database created before ``schema_version``
+existed starts at version 0 and re-runs every step.
+
+To change the schema, update the model *and* append a step. Never edit or
+renumber a step that has already shipped.
+"""
+
+import logging
+import re
+import time
+from datetime import UTC, datetime
+from typing import Callable, Optional
+
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Float,
+    MetaData,
+    PrimaryKeyConstraint,
+    Table,
+    delete,
+    func,
+    insert,
+    inspect,
+    literal,
+    select,
+    text,
+)
+from sqlalchemy.exc import OperationalError
+
+from slc_stock.config import QUOTES_COMPACT_STORAGE, QUOTES_WITHOUT_ROWID
+from slc_stock.models import (
+    Base,
+    EpochDay,
+    Quote,
+    SchemaVersion,
+    SymbolStat,
+    WholeNumber,
+    WriteSequence,
+)
+
+log = logging.getLogger(__name__)
+
+_QUOTES_KEY = ("symbol", "provider", "date")
+
+# Julian day number of 1970-01-01T00:00Z.
+_UNIX_EPOCH_JD = 2440587.5
+
+
+class Migration:
+    def __init__(self, version: int, name: str, apply: Callable):
+        self.version = version
+        self.name = name
+        self.apply = apply
+
+    def __repr__(self):
+        return f"<Migration {self.version}: {self.name}>"
+
+
+# ----------------------------------------------------------------------
+# Helpers for steps
+# ----------------------------------------------------------------------
+
+def create_index(conn, name: str, table: str, columns: tuple[str, ...], unique: bool = False):
+    """Build an index inside the step's transaction and refresh its statistics.
+
+    SQLite builds indexes in one pass while holding the write lock. Under
+    WAL, readers keep reading the last committed snapshot throughout, and
+    writers wait on ``busy_timeout``. A step that fails rolls back with
+    nothing half-built.
+    """
+    started = time.monotonic()
+    conn.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} "
+        f"ON {table} ({', '.join(columns)})"
+    ))
+    conn.execute(text(f"ANALYZE {name}"))
+    log.info("Built index %s in %.1fs", name, time.monotonic() - started)
+
+
+def quotes_layout(conn) -> dict:
+    """Describe how ``quotes`` is stored, from its CREATE TABLE statement."""
+    sql = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'quotes'"
+    )).scalar() or ""
+    return {
+        "clustered": "WITHOUT ROWID" in sql.upper(),
+        "compact": re.search(r"^\s*\"?date\"?\s+INTEGER\b", sql, re.I | re.M) is not None,
+    }
+
+
+def configured_quotes_layout() -> dict:
+    return {"clustered": QUOTES_WITHOUT_ROWID, "compact": QUOTES_COMPACT_STORAGE}
+
+
+# SQL that converts a stored column from one encoding to the other.
+_TO_COMPACT = {
+    "date": f"CAST(julianday(date) - {_UNIX_EPOCH_JD} AS INTEGER)",
+    "volume": "CAST(round(volume) AS INTEGER)",
+}
+_FROM_COMPACT = {
+    "date": f"date(date + {_UNIX_EPOCH_JD})",
+    "volume": "CAST(volume AS REAL)",
+}
+
+
+def _quotes_table(name: str, layout: dict) -> Table:
+    compact = layout["compact"]
+    types = {
+        "date": EpochDay() if compact else Date(),
+        "volume": WholeNumber() if compact else Float(),
+    }
+    return Table(
+        name,
+        MetaData(),
+        *(
+            Column(c.name, types.get(c.name, c.type), nullable=c.nullable)
+            for c in Quote.__table__.columns
+        ),
+        PrimaryKeyConstraint(*_QUOTES_KEY, name="pk_quotes"),
+        sqlite_with_rowid=not layout["clustered"],
+    )
+
+
+def rebuild_quotes(conn, source: dict, target: Optional[dict] = None):
+    """Copy ``quotes`` into a new table with the ``target`` layout.
+
+    ``source`` is the current :func:`quotes_layout` and ``target`` defaults
+    to the configured one; dates and volumes are converted in SQL if the
+    encoding changes. Rows are inserted in key order, which for a WITHOUT
+    ROWID table means contiguous pages per symbol. ``symbol_stats`` is
+    rebuilt to match.
+    """
+    target = target or configured_quotes_layout()
+    table = _quotes_table("quotes_rebuild", target)
+    conversions = {}
+    if source["compact"] != target["compact"]:
+        conversions = _TO_COMPACT if target["compact"] else _FROM_COMPACT
+    names = [c.name for c in table.columns]
+    select_list = ", ".join(conversions.get(name, name) for name in names)
+
+    conn.execute(text("DROP TABLE IF EXISTS quotes_rebuild"))
+    table.create(conn)
+    conn.execute(text(
+        f"INSERT INTO quotes_rebuild ({', '.join(names)}) "
+        f"SELECT {select_list} FROM quotes ORDER BY symbol, provider, date"
+    ))
+    conn.execute(text("DROP TABLE quotes"))
+    conn.execute(text("ALTER TABLE quotes_rebuild RENAME TO quotes"))
+    create_index(conn, "ix_quotes_seq", "quotes", ("seq",))
+    rebuild_symbol_stats(conn)
+
+
+def rebuild_symbol_stats(conn):
+    """Recompute ``symbol_stats`` from scratch out of ``quotes``.
+
+    ``changed_at`` is set to now, so HTTP clients revalidate once.
+    """
+    stats = SymbolStat.__table__
+    quotes = Quote.__table__
+    conn.execute(delete(stats))
+    conn.execute(insert(stats).from_select(
+        ["symbol", "provider", "count", "earliest", "latest", "last_fetched", "changed_at"],
+        select(
+            quotes.c.symbol,
+            quotes.c.provider,
+            func.count(),
+            func.min(quotes.c.date),
+            func.max(quotes.c.date),
+            func.max(quotes.c.fetched_at),
+            literal(datetime.now(UTC), DateTime),
+        ).group_by(quotes.c.symbol, quotes.c.provider),
+    ))
+
+
+# ----------------------------------------------------------------------
+# Steps
+# ----------------------------------------------------------------------
+
+def _add_quotes_adjusted(conn):
+    columns = {col["name"] for col in inspect(conn).get_columns("quotes")}
+    if "adjusted" not in columns:
+        conn.execute(text("ALTER TABLE quotes ADD COLUMN adjusted BOOLEAN DEFAULT 1"))
+
+
+def _key_quotes(conn):
+    pk = inspect(conn).get_pk_constraint("quotes")["constrained_columns"]
+    if tuple(pk) != _QUOTES_KEY:
+        create_index(conn, "ix_quotes_symbol_provider_date", "quotes", _QUOTES_KEY, unique=True)
+    conn.execute(text("DROP INDEX IF EXISTS ix_quotes_symbol"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_quotes_date"))
+
+
+def _backfill_symbol_stats(conn):
+    has_stats = conn.execute(select(SymbolStat.__table__.c.id).limit(1)).first()
+    if not has_stats:
+        rebuild_symbol_stats(conn)
+
+
+def _add_symbol_stats_writes(conn):
+    columns = {col["name"] for col in inspect(conn).get_columns("symbol_stats")}
+    if "writes" not in columns:
+        conn.execute(text(
+            "ALTER TABLE symbol_stats ADD COLUMN writes INTEGER NOT NULL DEFAULT 0"
+        ))
+
+
+def _add_quotes_seq(conn):
+    columns = {col["name"] for col in inspect(conn).get_columns("quotes")}
+    if "seq" not in columns:
+        conn.execute(text("ALTER TABLE quotes ADD COLUMN seq INTEGER NOT NULL DEFAULT 0"))
+        # Number existing rows in the order they were fetched.
+        conn.execute(text(
+            "UPDATE quotes SET seq = numbered.n FROM ("
+            " SELECT symbol, provider, date, row_number() OVER"
+            " (ORDER BY fetched_at, symbol, provider, date) AS n FROM quotes"
+            ") AS numbered "
+            "WHERE quotes.symbol = numbered.symbol AND quotes.provider = numbered.provider"
+            " AND quotes.date = numbered.date"
+        ))
+    create_index(conn, "ix_quotes_seq", "quotes", ("seq",))
+
+
+def _add_write_sequence(conn):
+    WriteSequence.__table__.create(conn, checkfirst=True)
+    conn.execute(text(
+        "INSERT OR IGNORE INTO write_sequence (id, value) "
+        "SELECT 1, coalesce(max(seq), 0) FROM quotes"
+    ))
+
+
+def _add_symbol_stats_changed_at(conn):
+    columns = {col["name"] for col in inspect(conn).get_columns("symbol_stats")}
+    if "changed_at" not in columns:
+        conn.execute(text("ALTER TABLE symbol_stats ADD COLUMN changed_at DATETIME"))
+        # Last-Modified was last_fetched until now; carry it over.
+        conn.execute(text("UPDATE symbol_stats SET changed_at = last_fetched"))
+
+
+MIGRATIONS = [
+    Migration(1, "add quotes.adjusted", _add_quotes_adjusted),
+    Migration(2, "key quotes on (symbol, provider, date)", _key_quotes),
+    Migration(3, "backfill symbol_stats", _backfill_symbol_stats),
+    Migration(4, "add symbol_stats.writes", _add_symbol_stats_writes),
+    Migration(5, "add quotes.seq", _add_quotes_seq),
+    Migration(6, "add write_sequence", _add_write_sequence),
+    Migration(7, "add symbol_stats.changed_at", _add_symbol_stats_changed_at),
+]
+
+HEAD = MIGRATIONS[-1].version
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def current_version(conn) -> Optional[int]:
+    """Return the applied schema version, or None if the table is missing."""
+    try:
+        return conn.execute(select(func.max(SchemaVersion.version))).scalar() or 0
+    except OperationalError:
+        conn.rollback()
+        return None
+
+
+def _record(conn, version: int, name: str):
+    conn.execute(insert(SchemaVersion.__table__).values(
+        version=version, name=name, applied_at=datetime.now(UTC),
+    ))
+
+
+def pending(conn) -> list[Migration]:
+    """Return the steps a :func:`migrate` would apply, oldest first."""
+    tables = set(inspect(conn).get_table_names())
+    if "quotes" not in tables:
+        return []
+    version = current_version(conn) or 0
+    return [m for m in MIGRATIONS if m.version > version]
+
+
+def migrate(engine, dry_run: bool = False) -> list[Migration]:
+    """Bring the database at ``engine`` up to :data:`HEAD`.
+
+    Returns the steps applied, or that would be with ``dry_run``.
+    """
+    with engine.connect() as conn:
+        steps = pending(conn)
+        fresh = "quotes" not in inspect(conn).get_table_names()
+    if dry_run:
+        return steps
+
+    Base.metadata.create_all(engine)
+    if fresh:
+        with engine.begin() as conn:
+            if not current_version(conn):
+                _record(conn, HEAD, "initial schema")
+        return []
+
+    for step in steps:
+        started = time.monotonic()
+        with engine.connect() as conn:
+            # An explicit immediate transaction: the DB-API driver would
+            # otherwise autocommit each DDL statement on its own.
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            if (current_version(conn) or 0) >= step.version:
+                conn.rollback()
+                continue
+            step.apply(conn)
+            _record(conn, step.version, step.name)
+            conn.commit()
+        log.info(
+            "Migrated to version %d (%s) in %.1fs",
+            step.version, step.name, time.monotonic() - started,
+        )
+    return steps
+
+
+def ensure_quotes_layout(engine) -> bool:
+    """Rebuild ``quotes`` if its layout differs from the configuration.
+
+    Layout (``QUOTES_WITHOUT_ROWID``, ``QUOTES_COMPACT_STORAGE``) is a
+    deployment choice rather than a schema version, so it is compared on
+    every start: one lookup in ``sqlite_master``. Returns True if rebuilt.
+    """
+    with engine.connect() as conn:
+        layout = quotes_layout(conn)
+        if layout == configured_quotes_layout():
+            return False
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        started = time.monotonic()
+        rebuild_quotes(conn, layout)
+        conn.commit()
+    log.info(
+        "Rebuilt quotes as %s in %.1fs",
+        configured_quotes_layout(), time.monotonic() - started,
+    )
+    return True
@@ -1,4 +1,6 @@
 from datetime import UTC, date, datetime
+from functools import lru_cache
+from typing import Optional
 
 from sqlalchemy import (
     Boolean,
@@ -6,32 +8,90 @@ from sqlalchemy import (
     Date,
     DateTime,
     Float,
+    Index,
     Integer,
+    JSON,
+    PrimaryKeyConstraint,
     String,
+    TypeDecorator,
     UniqueConstraint,
 )
 from sqlalchemy.orm import declarative_base
 
+from slc_stock.config import QUOTES_COMPACT_STORAGE, QUOTES_WITHOUT_ROWID
+
 Base = declarative_base()
 
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=65536)
+def _from_epoch_day(value: Optional[int]) -> Optional[date]:
+    # A history scan sees the same few thousand days over and over; the
+    # cached lookup is cheaper than parsing ISO text for every row.
+    if value is None:
+        return None
+    return date.fromordinal(value + _EPOCH_ORDINAL)
+
+
+class EpochDay(TypeDecorator):
+    """A ``date`` stored as an INTEGER count of days since 1970-01-01."""
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return value.toordinal() - _EPOCH_ORDINAL
+
+    def process_result_value(self, value, dialect):
+        return _from_epoch_day(value)
+
+    def result_processor(self, dialect, coltype):
+        return _from_epoch_day
+
+
+class WholeNumber(TypeDecorator):
+    """A share count stored as INTEGER; fractional input is rounded."""
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int(round(value))
+
+
+# Column types for quote dates and volumes; see QUOTES_COMPACT_STORAGE.
+QuoteDate = EpochDay if QUOTES_COMPACT_STORAGE else Date
+QuoteVolume = WholeNumber if QUOTES_COMPACT_STORAGE else Float
+
 
 class Quote(Base):
+    """One daily bar per (symbol, provider, date)."""
+
     __tablename__ = "quotes"
     __table_args__ = (
-        UniqueConstraint("symbol", "date", "provider", name="uq_symbol_date_provider"),
+        PrimaryKeyConstraint("symbol", "provider", "date", name="pk_quotes"),
+        Index("ix_quotes_seq", "seq"),
+        {"sqlite_with_rowid": not QUOTES_WITHOUT_ROWID},
     )
 
-    id = Column(Integer, primary_key=True)
-    symbol = Column(String, nullable=False, index=True)
-    date = Column(Date, nullable=False, index=True)
+    symbol = Column(String, nullable=False)
+    date = Column(QuoteDate, nullable=False)
     open = Column(Float)
     high = Column(Float)
     low = Column(Float)
     close = Column(Float)
-    volume = Column(Float)
+    volume = Column(QuoteVolume)
     adjusted = Column(Boolean, nullable=False, default=True)
     provider = Column(String, nullable=False)
     fetched_at = Column(DateTime, nullable=False, default=lambda: datetime.now(UTC))
+    # Write sequence: set from a database-wide counter each time the row is
+    # inserted or its values change, so "changed since N" is a range scan.
+    seq = Column(Integer, nullable=False, default=0, server_default="0")
 
     def to_dict(self):
         return {
@@ -46,3 +106,89 @@ class Quote(Base):
             "provider": self.provider,
             "fetched_at": self.fetched_at.isoformat(),
         }
+
+
+class NegativeResult(Base):
+    """A provider answer of "nothing there", remembered until ``expires_at``.
+
+    Rows with a ``date`` mean the provider had no bar for that day; rows
+    without one mean the symbol itself was rejected by the provider.
+    """
+
+    __tablename__ = "negative_results"
+    __table_args__ = (
+        Index("ix_negative_symbol_provider_date", "symbol", "provider", "date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    provider = Column(String, nullable=False)
+    date = Column(Date, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(UTC))
+
+
+class ValidatedSymbol(Base):
+    """A symbol the provider confirmed as tradeable, trusted until ``expires_at``."""
+
+    __tablename__ = "validated_symbols"
+    __table_args__ = (
+        UniqueConstraint("symbol", "provider", name="uq_validated_symbol_provider"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    provider = Column(String, nullable=False)
+    details = Column(JSON, nullable=False, default=dict)
+    validated_at = Column(DateTime, nullable=False, default=lambda: datetime.now(UTC))
+    expires_at = Column(DateTime, nullable=False)
+
+
+class SymbolStat(Base):
+    """Per symbol/provider summary of the ``quotes`` table.
+
+    Kept current by every quote write so the dashboard never has to
+    aggregate ``quotes`` itself.
+    """
+
+    __tablename__ = "symbol_stats"
+    __table_args__ = (
+        UniqueConstraint("symbol", "provider", name="uq_symbol_stats_symbol_provider"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    provider = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    earliest = Column(QuoteDate)
+    latest = Column(QuoteDate)
+    last_fetched = Column(DateTime)
+    # Bumped by every write that changes this symbol/provider's quotes.
+    writes = Column(Integer, nullable=False, default=0, server_default="0")
+    # When that write happened. Unlike ``last_fetched`` this moves forward
+    # even for loaded corrections that carry an old ``fetched_at``.
+    changed_at = Column(DateTime)
+
+
+class WriteSequence(Base):
+    """The last ``quotes.seq`` handed out, in a single row (``id`` 1).
+
+    Numbers are reserved by bumping it, which is a write: the transaction
+    holds SQLite's write lock before it sees the counter, so numbers are
+    unique and in commit order across processes, not only threads.
+    """
+
+    __tablename__ = "write_sequence"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    value = Column(Integer, nullable=False)
+
+
+class SchemaVersion(Base):
+    """One row per applied migration (see ``slc_stock.migrations``)."""
+
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False)
+    applied_at = Column(DateTime, nullable=False, default=lambda: datetime.now(UTC))
@@ -39,6 +39,9 @@ class StockProvider(ABC):
     """Common interface every data provider must implement."""
 
     name: str = ""
+    # False when get_history downloads the full series regardless of the
+    # requested range, so several small requests cost more than one big one.
+    range_requests: bool = True
 
     @abstractmethod
     def get_quote(self, symbol: str, day: date) -> Optional[QuoteData]:
@@ -54,6 +57,14 @@ class StockProvider(ABC):
     def validate_symbol(self, symbol: str) -> bool:
         """Return True if the symbol is a valid, tradeable ticker."""
 
+    def describe_symbol(self, symbol: str) -> Optional[dict]:
+        """Return metadata for a valid symbol, or None if it is not tradeable.
+
+        May raise if the provider cannot be reached, in which case the
+        answer is unknown rather than negative.
+        """
+        return {} if self.validate_symbol(symbol) else None
+
     def is_configured(self) -> bool:
         """Return True if this provider has all required credentials."""
         return True
@@ -42,6 +42,7 @@ def _request_with_retry(params: dict) -> dict:
 @register
 class AlphaVantageProvider(StockProvider):
     name = "alpha_vantage"
+    range_requests = False
 
     def is_configured(self) -> bool:
         return bool(ALPHA_VANTAGE_API_KEY)
@@ -54,21 +55,31 @@ class AlphaVantageProvider(StockProvider):
             )
 
     def validate_symbol(self, symbol: str) -> bool:
-        if not self.is_configured():
-            return True
         try:
-            params = {
-                "function": "SYMBOL_SEARCH",
-                "keywords": symbol,
-                "apikey": ALPHA_VANTAGE_API_KEY,
-            }
-            resp = requests.get(_BASE_URL, params=params, timeout=15)
-            resp.raise_for_status()
-            matches = resp.json().get("bestMatches", [])
-            return any(m.get("1. symbol", "").upper() == symbol.upper() for m in matches)
+            return self.describe_symbol(symbol) is not None
         except Exception:
             return True
 
+    def describe_symbol(self, symbol: str) -> Optional[dict]:
+        if not self.is_configured():
+            return {}
+        params = {
+            "function": "SYMBOL_SEARCH",
+            "keywords": symbol,
+            "apikey": ALPHA_VANTAGE_API_KEY,
+        }
+        resp = requests.get(_BASE_URL, params=params, timeout=15)
+        resp.raise_for_status()
+        for m in resp.json().get("bestMatches", []):
+            if m.get("1. symbol", "").upper() == symbol.upper():
+                return {
+                    "name": m.get("2. name"),
+                    "type": m.get("3. type"),
+                    "region": m.get("4. region"),
+                    "currency": m.get("8. currency"),
+                }
+        return None
+
     def _fetch_daily(self, symbol: str, outputsize: str = "compact") -> dict:
         self._require_key()
         log.info("Alpha Vantage: fetching %s (outputsize=%s)", symbol, outputsize)
@@ -50,19 +50,30 @@ class PolygonProvider(StockProvider):
         return resp
 
     def validate_symbol(self, symbol: str) -> bool:
-        if not self.is_configured():
-            return True
         try:
-            url = f"{_BASE_URL}/v3/reference/tickers/{symbol.upper()}"
-            resp = requests.get(url, headers=self._headers(), timeout=15)
-            if resp.status_code == 404:
-                return False
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("status") == "OK" and bool(data.get("results"))
+            return self.describe_symbol(symbol) is not None
         except Exception:
             return True
 
+    def describe_symbol(self, symbol: str) -> Optional[dict]:
+        if not self.is_configured():
+            return {}
+        url = f"{_BASE_URL}/v3/reference/tickers/{symbol.upper()}"
+        resp = requests.get(url, headers=self._headers(), timeout=15)
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        data = resp.json()
+        results = data.get("results")
+        if data.get("status") != "OK" or not results:
+            return None
+        return {
+            "name": results.get("name"),
+            "exchange": results.get("primary_exchange"),
+            "currency": results.get("currency_name"),
+            "type": results.get("type"),
+        }
+
     def get_quote(self, symbol: str, day: date) -> Optional[QuoteData]:
         self._require_key()
         url = f"{_BASE_URL}/v1/open-close/{symbol.upper()}/{day.isoformat()}"
@@ -15,12 +15,24 @@ class YFinanceProvider(StockProvider):
 
     def validate_symbol(self, symbol: str) -> bool:
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            return bool(info and info.get("shortName"))
+            return self.describe_symbol(symbol) is not None
         except Exception:
+            log.warning("yfinance: could not validate %s", symbol, exc_info=True)
             return False
 
+    def describe_symbol(self, symbol: str) -> Optional[dict]:
+        # Network and HTTP errors propagate: they mean "couldn't ask", and
+        # must not be remembered as an invalid symbol.
+        info = yf.Ticker(symbol).info
+        if not (info and info.get("shortName")):
+            return None
+        return {
+            "name": info.get("shortName"),
+            "exchange": info.get("exchange"),
+            "currency": info.get("currency"),
+            "type": info.get("quoteType"),
+        }
+
     def get_quote(self, symbol: str, day: date) -> Optional[QuoteData]:
         ticker = yf.Ticker(symbol)
         start = day
@@ -47,7 +59,10 @@ class YFinanceProvider(StockProvider):
             "yfinance: fetching history %s %s→%s",
             symbol, start.isoformat(), end.isoformat(),
         )
-        df = ticker.history(start=start.isoformat(), end=end.isoformat())
+        # yfinance treats ``end`` as exclusive.
+        df = ticker.history(
+            start=start.isoformat(), end=(end + timedelta(days=1)).isoformat()
+        )
         results = []
         for idx, row in df.iterrows():
             results.append(
@@ -1,59 +1,337 @@
+import bisect
 import json
 import logging
 import os
 import threading
 from datetime import UTC, date, datetime, timedelta
+from functools import lru_cache
+from itertools import groupby, islice
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
 
-from sqlalchemy import func
+from sqlalchemy import Integer, String, and_, func, or_, select, tuple_, type_coerce
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 
-from slc_stock.config import DATABASE_URL, DEFAULT_PROVIDER, PREFETCH_YEARS
-from slc_stock.db import get_session, init_db
-from slc_stock.models import Quote
+from slc_stock.cache import LRUCache
+from slc_stock.config import (
+    DATABASE_URL,
+    DEFAULT_PROVIDER,
+    INVALID_SYMBOL_TTL,
+    NEGATIVE_CACHE_TTL,
+    PREFETCH_YEARS,
+    QUOTES_COMPACT_STORAGE,
+    QUOTE_CACHE_SIZE,
+    QUOTE_CACHE_TTL,
+    SYMBOL_VALIDATION_TTL,
+    TRADING_CALENDAR,
+    WRITE_BATCH_SIZE,
+)
+from slc_stock.coverage import missing_ranges, span
+from slc_stock.db import active_pragmas, get_read_session, get_session, init_db
+from slc_stock.models import (
+    NegativeResult,
+    Quote,
+    SymbolStat,
+    ValidatedSymbol,
+    WriteSequence,
+    _EPOCH_ORDINAL,
+    _from_epoch_day,
+)
 from slc_stock.providers import (
     QuoteData,
+    StockProvider,
     SymbolNotFoundError,
     get_provider,
     list_providers,
 )
+from slc_stock.singleflight import SingleFlight
+from slc_stock.trading_calendar import get_calendar
 
 log = logging.getLogger(__name__)
 
 _MAX_FALLBACK_DAYS = 7
 
+# A missing bar for today or yesterday may still show up once the provider
+# catches up, so those answers are only remembered briefly.
+_RECENT_DAYS = 2
+_RECENT_NEGATIVE_TTL = 900
+
+# Gaps in stored history separated by this many stored sessions or fewer
+# are fetched as a single provider request.
+_PREFETCH_MERGE_SESSIONS = 5
+
+# (symbol, start, end) windows per batch-quote query; see _stored_bars.
+_RANGES_PER_QUERY = 250
+
+
+# Fields of a quote record, in Quote.to_dict order.
+QUOTE_FIELDS = (
+    "symbol", "date", "open", "high", "low", "close", "volume",
+    "adjusted", "provider", "fetched_at",
+)
+_DUMP_BATCH_SIZE = 1000
+
+# Columns an upsert overwrites; a row is "unchanged" when none of them differ.
+_VALUE_COLUMNS = ("open", "high", "low", "close", "volume", "adjusted")
+
+
+_EPOCH_DT = datetime(1970, 1, 1)
+
+
+@lru_cache(maxsize=65536)
+def _epoch_day_iso(value: int) -> str:
+    return _from_epoch_day(value).isoformat()
+
+
+@lru_cache(maxsize=4096)
+def _timestamp_iso(value: str) -> str:
+    # Rows written together share one fetched_at, so this is mostly hits.
+    return datetime.fromisoformat(value).isoformat()
+
+
+@lru_cache(maxsize=65536)
+def _iso_epoch_day(value: str) -> int:
+    return date.fromisoformat(value).toordinal() - _EPOCH_ORDINAL
+
+
+@lru_cache(maxsize=4096)
+def _timestamp_micros(value: str) -> int:
+    stamp = datetime.fromisoformat(value).replace(tzinfo=None)
+    return (stamp - _EPOCH_DT) // timedelta(microseconds=1)
+
+
+def _quote_columns(fields: Iterable[str], typed: bool = False) -> tuple[list, list]:
+    """Return quote columns as stored, plus per-column converters (or None).
+
+    Dates and timestamps skip the ORM type round trip (text to ``date`` and
+    back to text): they are read raw and turned straight into the ISO
+    strings the API returns. With ``typed``, they become integers instead:
+    days and microseconds since 1970-01-01 (UTC), as in the columnar backup
+    format.
+    """
+    table = Quote.__table__
+    columns, converters = [], []
+    for name in fields:
+        column = table.c[name]
+        if name == "date" and QUOTES_COMPACT_STORAGE:
+            columns.append(type_coerce(column, Integer))
+            converters.append(None if typed else _epoch_day_iso)
+        elif name == "date":
+            columns.append(type_coerce(column, String))
+            converters.append(_iso_epoch_day if typed else None)
+        elif name == "fetched_at":
+            columns.append(type_coerce(column, String))
+            converters.append(_timestamp_micros if typed else _timestamp_iso)
+        else:
+            columns.append(column)
+            converters.append(None)
+    return columns, converters
+
+
+def _check_fields(fields: Optional[Iterable[str]]) -> tuple[str, ...]:
+    if not fields:
+        return QUOTE_FIELDS
+    fields = tuple(dict.fromkeys(fields))
+    unknown = [f for f in fields if f not in QUOTE_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s) {unknown}. Available: {list(QUOTE_FIELDS)}"
+        )
+    return fields
+
+
+def _history_records(
+    rows, fields: tuple[str, ...], selected: list[str], converters: list, constants: dict
+) -> list[dict]:
+    """Build :meth:`QuoteService.get_history` records from raw ``selected`` rows."""
+    template = {f: constants.get(f) for f in fields}
+    convert = [(i, fn) for i, fn in enumerate(converters) if fn]
+    records = []
+    for row in rows:
+        if convert:
+            row = list(row)
+            for i, fn in convert:
+                row[i] = fn(row[i])
+        rec = template.copy()
+        rec.update(zip(selected, row))
+        records.append(rec)
+    return records
+
+
+def _history_columns(rows, selected: list[str], converters: list) -> dict[str, list]:
+    """Transpose raw ``selected`` rows into one converted list per field."""
+    transposed = list(zip(*rows)) if rows else [()] * len(selected)
+    return {
+        name: [fn(v) for v in values] if fn else list(values)
+        for name, values, fn in zip(selected, transposed, converters)
+    }
+
+
+class WriteStats:
+    """Row counts from a bulk quote write."""
+
+    def __init__(self, inserted: int = 0, updated: int = 0, unchanged: int = 0):
+        self.inserted = inserted
+        self.updated = updated
+        self.unchanged = unchanged
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    def __iadd__(self, other: "WriteStats") -> "WriteStats":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        return self
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.inserted} inserted, {self.updated} updated, "
+            f"{self.unchanged} unchanged"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+        }
+
+
+def _batched(iterable: Iterable, size: int) -> Iterator[list]:
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _quote_row(qd: QuoteData, provider_name: str, fetched_at: datetime) -> dict:
+    return {
+        "symbol": qd.symbol.upper(),
+        "date": qd.date,
+        "open": qd.open,
+        "high": qd.high,
+        "low": qd.low,
+        "close": qd.close,
+        "volume": qd.volume,
+        "adjusted": qd.adjusted,
+        "provider": provider_name,
+        "fetched_at": fetched_at,
+    }
+
 
-def _store_quote(session, qd: QuoteData, provider_name: str) -> Quote:
-    existing = (
-        session.query(Quote)
-        .filter_by(symbol=qd.symbol.upper(), date=qd.date, provider=provider_name)
-        .first()
+def _optional_float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _record_row(rec: dict, fetched_at: datetime) -> dict:
+    """Validate a dumped record and turn it into a row; raises on bad input."""
+    symbol = rec["symbol"]
+    provider = rec["provider"]
+    if not isinstance(symbol, str) or not isinstance(provider, str):
+        raise TypeError("symbol and provider must be strings")
+    return {
+        "symbol": symbol.upper(),
+        "date": date.fromisoformat(rec["date"]),
+        "open": _optional_float(rec.get("open")),
+        "high": _optional_float(rec.get("high")),
+        "low": _optional_float(rec.get("low")),
+        "close": _optional_float(rec.get("close")),
+        "volume": _optional_float(rec.get("volume")),
+        "adjusted": bool(rec.get("adjusted", True)),
+        "provider": provider,
+        "fetched_at": fetched_at,
+    }
+
+
+def _upsert_statement():
+    table = Quote.__table__
+    stmt = sqlite_insert(table)
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=["symbol", "provider", "date"],
+        set_={col: excluded[col] for col in _VALUE_COLUMNS + ("fetched_at", "seq")},
+        where=or_(*(table.c[col].is_distinct_from(excluded[col]) for col in _VALUE_COLUMNS)),
     )
-    if existing:
-        existing.open = qd.open
-        existing.high = qd.high
-        existing.low = qd.low
-        existing.close = qd.close
-        existing.volume = qd.volume
-        existing.adjusted = qd.adjusted
-        existing.fetched_at = datetime.now(UTC)
-        return existing
-
-    row = Quote(
-        symbol=qd.symbol.upper(),
-        date=qd.date,
-        open=qd.open,
-        high=qd.high,
-        low=qd.low,
-        close=qd.close,
-        volume=qd.volume,
-        adjusted=qd.adjusted,
-        provider=provider_name,
-        fetched_at=datetime.now(UTC),
+
+
+def _stats_upsert_statement():
+    table = SymbolStat.__table__
+    stmt = sqlite_insert(table)
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=["symbol", "provider"],
+        set_={
+            "count": table.c.count + excluded.count,
+            "earliest": func.min(table.c.earliest, excluded.earliest),
+            "latest": func.max(table.c.latest, excluded.latest),
+            "last_fetched": func.max(
+                func.coalesce(table.c.last_fetched, excluded.last_fetched),
+                excluded.last_fetched,
+            ),
+            "writes": table.c.writes + 1,
+            "changed_at": excluded.changed_at,
+        },
     )
-    session.add(row)
-    return row
+
+
+def _reserve_seq(session, count: int) -> int:
+    """Reserve ``count`` write sequence numbers; returns the first.
+
+    The bump is the statement that opens the write transaction, so another
+    process writing quotes waits here until this one commits.
+    """
+    table = WriteSequence.__table__
+    stmt = sqlite_insert(table).values(id=1, value=count)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"], set_={"value": table.c.value + stmt.excluded.value}
+    ).returning(table.c.value)
+    return session.execute(stmt).scalar_one() - count + 1
+
+
+def _upsert_quotes(session, rows: Iterable[dict], batch_size: int = WRITE_BATCH_SIZE) -> WriteStats:
+    """Insert or update quote rows set-wise, ``batch_size`` rows per statement.
+
+    Runs inside the caller's transaction; the caller commits. Rows whose
+    values match what is stored are left alone, ``fetched_at`` and ``seq``
+    included. Each row written takes the next ``seq`` (see
+    :func:`_reserve_seq`). ``symbol_stats`` is updated in the same
+    transaction.
+    """
+    table = Quote.__table__
+    key = tuple_(table.c.symbol, table.c.provider, table.c.date)
+    stmt = _upsert_statement()
+    stats_stmt = _stats_upsert_statement()
+    stats = WriteStats()
+    for batch in _batched(rows, max(batch_size, 1)):
+        # executemany applies duplicates in order; keep only the last one.
+        groups: dict[tuple, dict] = {}
+        for r in batch:
+            groups.setdefault((r["symbol"], r["provider"]), {})[r["date"]] = r
+        for (symbol, provider), by_date in groups.items():
+            # Unchanged rows skip their number; the feed only needs order.
+            first = _reserve_seq(session, len(by_date))
+            group = [dict(r, seq=n) for n, r in enumerate(by_date.values(), first)]
+            keys = [(symbol, provider, d) for d in by_date]
+            existing = session.execute(
+                select(func.count()).select_from(table).where(key.in_(keys))
+            ).scalar()
+            changed = session.execute(stmt, group).rowcount
+            inserted = len(group) - existing
+            stats += WriteStats(inserted, changed - inserted, existing - (changed - inserted))
+            if changed:
+                session.execute(stats_stmt, {
+                    "symbol": symbol,
+                    "provider": provider,
+                    "count": inserted,
+                    "earliest": min(by_date),
+                    "latest": max(by_date),
+                    "last_fetched": max(r["fetched_at"] for r in group),
+                    "writes": 1,
+                    "changed_at": datetime.now(UTC),
+                })
+    return stats
 
 
 class QuoteService:
@@ -61,6 +339,10 @@ class QuoteService:
         init_db()
         self._prefetch_in_flight: set[tuple[str, str]] = set()
         self._lock = threading.Lock()
+        self._calendar = get_calendar(TRADING_CALENDAR)
+        self._quote_cache = LRUCache(QUOTE_CACHE_SIZE, QUOTE_CACHE_TTL)
+        self._history_ready: set[tuple[str, str]] = set()
+        self._flights = SingleFlight()
 
     @property
     def prefetch_in_flight(self) -> list[str]:
@@ -72,11 +354,159 @@ class QuoteService:
     # ------------------------------------------------------------------
 
     def _validate_symbol(self, symbol: str, provider_name: str):
+        session = get_read_session()
+        try:
+            now = datetime.now(UTC)
+            known = (
+                session.query(ValidatedSymbol.id)
+                .filter(
+                    ValidatedSymbol.symbol == symbol,
+                    ValidatedSymbol.provider == provider_name,
+                    ValidatedSymbol.expires_at > now,
+                )
+                .first()
+            )
+            rejected = not known and self._negative_days(
+                session, symbol, provider_name, None, None
+            )
+        finally:
+            session.close()
+        if known:
+            return
+        if rejected:
+            log.info("Invalid symbol rejected (cached): %s (provider=%s)", symbol, provider_name)
+            raise SymbolNotFoundError(symbol)
+
         provider = get_provider(provider_name)
-        if not provider.validate_symbol(symbol):
+        try:
+            details = provider.describe_symbol(symbol)
+        except Exception:
+            log.warning(
+                "Symbol validation unavailable for %s (provider=%s), allowing",
+                symbol, provider_name,
+                exc_info=True,
+            )
+            return
+
+        if details is None:
             log.error("Invalid symbol rejected: %s (provider=%s)", symbol, provider_name)
+            with get_session() as session:
+                self._record_negative(session, symbol, provider_name, None)
+                session.commit()
             raise SymbolNotFoundError(symbol)
 
+        # An unconfigured provider accepts everything without asking;
+        # don't let that vouch for the symbol once a key is added.
+        if provider.is_configured() and SYMBOL_VALIDATION_TTL > 0:
+            with get_session() as session:
+                self._record_valid(session, symbol, provider_name, details)
+
+    @staticmethod
+    def _record_valid(session, symbol: str, provider_name: str, details: dict):
+        now = datetime.now(UTC)
+        expires = now + timedelta(seconds=SYMBOL_VALIDATION_TTL)
+        row = (
+            session.query(ValidatedSymbol)
+            .filter_by(symbol=symbol, provider=provider_name)
+            .first()
+        )
+        if row:
+            row.details = details
+            row.validated_at = now
+            row.expires_at = expires
+        else:
+            session.add(ValidatedSymbol(
+                symbol=symbol,
+                provider=provider_name,
+                details=details,
+                validated_at=now,
+                expires_at=expires,
+            ))
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another request validated the same symbol first.
+            session.rollback()
+
+    # ------------------------------------------------------------------
+    # Negative results
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _negative_days(
+        session,
+        symbol: str,
+        provider_name: str,
+        start: Optional[date],
+        end: Optional[date],
+    ) -> set[Optional[date]]:
+        """Return unexpired negative entries; ``start=None`` asks about the symbol."""
+        query = session.query(NegativeResult.date).filter(
+            NegativeResult.symbol == symbol,
+            NegativeResult.provider == provider_name,
+            NegativeResult.expires_at > datetime.now(UTC),
+        )
+        if start is None:
+            query = query.filter(NegativeResult.date.is_(None))
+        else:
+            query = query.filter(NegativeResult.date >= start, NegativeResult.date <= end)
+        return {r.date for r in query.all()}
+
+    @staticmethod
+    def _record_negative(session, symbol: str, provider_name: str, day: Optional[date]):
+        now = datetime.now(UTC)
+        if day is None:
+            ttl = INVALID_SYMBOL_TTL
+        elif day >= date.today() - timedelta(days=_RECENT_DAYS):
+            ttl = min(NEGATIVE_CACHE_TTL, _RECENT_NEGATIVE_TTL)
+        else:
+            ttl = NEGATIVE_CACHE_TTL
+        if ttl <= 0:
+            return
+
+        # Replaces the entry for ``day``, and drops the symbol's expired
+        # ones while the index has them at hand; reads already skip those.
+        session.query(NegativeResult).filter(
+            NegativeResult.symbol == symbol,
+            NegativeResult.provider == provider_name,
+            or_(
+                (NegativeResult.date == day) if day is not None else NegativeResult.date.is_(None),
+                NegativeResult.expires_at <= now,
+            ),
+        ).delete(synchronize_session=False)
+        session.add(NegativeResult(
+            symbol=symbol,
+            provider=provider_name,
+            date=day,
+            expires_at=now + timedelta(seconds=ttl),
+            created_at=now,
+        ))
+
+    @classmethod
+    def _record_negatives(cls, session, symbol: str, provider_name: str, days: list[date]):
+        """:meth:`_record_negative` for many days, in one statement per batch."""
+        recent = date.today() - timedelta(days=_RECENT_DAYS)
+        for day in days:
+            if day >= recent:
+                cls._record_negative(session, symbol, provider_name, day)
+        days = [d for d in days if d < recent]
+        if not days or NEGATIVE_CACHE_TTL <= 0:
+            return
+        now = datetime.now(UTC)
+        expires_at = now + timedelta(seconds=NEGATIVE_CACHE_TTL)
+        table = NegativeResult.__table__
+        for batch in _batched(days, _DUMP_BATCH_SIZE):
+            session.execute(table.delete().where(
+                table.c.symbol == symbol,
+                table.c.provider == provider_name,
+                or_(table.c.date.in_(batch), table.c.expires_at <= now),
+            ))
+            session.execute(table.insert(), [
+                {"symbol": symbol, "provider": provider_name, "date": d,
+                 "expires_at": expires_at, "created_at": now}
+                for d in batch
+            ])
+
     # ------------------------------------------------------------------
     # Single-day quote with market-closed fallback
     # ------------------------------------------------------------------
@@ -89,75 +519,136 @@ class QuoteService:
     ) -> Optional[dict]:
         symbol = symbol.upper()
         pname = provider_name or DEFAULT_PROVIDER
-        session = get_session()
+        key = (symbol, day, pname)
+        hot = self._quote_cache.get(key)
+        if hot is not None:
+            self._maybe_background_prefetch(symbol, pname)
+            return dict(hot)
+
+        # Concurrent misses for the same key share one lookup/provider walk.
+        result = self._flights.do(("quote",) + key, self._resolve_quote, symbol, day, pname)
+        if result is None:
+            return None
+        self._quote_cache.put(key, result)
+        return dict(result)
+
+    def _resolve_quote(self, symbol: str, day: date, pname: str) -> Optional[dict]:
+        # Reads go through short read-only sessions, each closed before the
+        # provider, the writer or another session is touched, so a miss never
+        # holds a pooled connection while it waits on any of them.
+        window_start = day - timedelta(days=_MAX_FALLBACK_DAYS)
+        session = get_read_session()
         try:
+            # One indexed lookup covers the requested day and the whole
+            # fallback window: the newest stored bar on or before ``day``.
             row = (
                 session.query(Quote)
-                .filter_by(symbol=symbol, date=day, provider=pname)
+                .filter(
+                    Quote.symbol == symbol,
+                    Quote.provider == pname,
+                    Quote.date <= day,
+                    Quote.date >= window_start,
+                )
+                .order_by(Quote.date.desc())
                 .first()
             )
-            if row:
-                log.info("Cache hit: %s %s (%s)", symbol, day, pname)
-                result = row.to_dict()
-                result["requested_date"] = day.isoformat()
-                self._maybe_background_prefetch(symbol, pname)
-                return result
-
-            self._validate_symbol(symbol, pname)
-
-            provider = get_provider(pname)
-            qd = provider.get_quote(symbol, day)
+            cached = row.to_dict() if row else None
+            cached_date = row.date if row else None
 
-            if qd is not None:
-                _store_quote(session, qd, pname)
-                session.commit()
-                log.info("Cache miss → fetched: %s %s (%s)", symbol, day, pname)
-                row = (
-                    session.query(Quote)
-                    .filter_by(symbol=symbol, date=day, provider=pname)
-                    .first()
-                )
-                result = row.to_dict()
-                result["requested_date"] = day.isoformat()
-                self._maybe_background_prefetch(symbol, pname)
-                return result
+            # Trading sessions rather than calendar days, so a weekend or
+            # holiday goes straight to the previous session. Only sessions
+            # newer than the stored bar and not known to be empty are asked
+            # for, all in one provider call.
+            sessions = []
+            if cached_date != day:
+                sessions = [
+                    d for d in self._calendar.sessions_between(window_start, day)
+                    if not cached_date or d > cached_date
+                ]
+            if sessions:
+                no_bar = self._negative_days(session, symbol, pname, sessions[0], day)
+                sessions = [d for d in sessions if d not in no_bar]
+        finally:
+            session.close()
 
-            # Market closed — walk back up to _MAX_FALLBACK_DAYS
-            log.info("No data for %s on %s, walking back for previous trading day", symbol, day)
-            for offset in range(1, _MAX_FALLBACK_DAYS + 1):
-                fallback_day = day - timedelta(days=offset)
+        if cached_date == day:
+            log.info("Cache hit: %s %s (%s)", symbol, day, pname)
+            return self._quote_result(cached, symbol, day, pname)
 
-                cached = (
-                    session.query(Quote)
-                    .filter_by(symbol=symbol, date=fallback_day, provider=pname)
-                    .first()
-                )
-                if cached:
-                    log.info("Fallback cache hit: %s %s (requested %s)", symbol, fallback_day, day)
-                    result = cached.to_dict()
-                    result["requested_date"] = day.isoformat()
-                    self._maybe_background_prefetch(symbol, pname)
-                    return result
-
-                qd = provider.get_quote(symbol, fallback_day)
-                if qd is not None:
-                    _store_quote(session, qd, pname)
-                    session.commit()
-                    log.info("Fallback fetched: %s %s (requested %s)", symbol, fallback_day, day)
+        if sessions:
+            self._validate_symbol(symbol, pname)
+            fetched = self._fetch_window(symbol, sessions, pname)
+            if fetched:
+                if fetched == day:
+                    log.info("Cache miss → fetched: %s %s (%s)", symbol, day, pname)
+                else:
+                    log.info("Fallback fetched: %s %s (requested %s)", symbol, fetched, day)
+                session = get_read_session()
+                try:
                     row = (
                         session.query(Quote)
-                        .filter_by(symbol=symbol, date=fallback_day, provider=pname)
+                        .filter_by(symbol=symbol, date=fetched, provider=pname)
                         .first()
                     )
-                    result = row.to_dict()
-                    result["requested_date"] = day.isoformat()
-                    self._maybe_background_prefetch(symbol, pname)
-                    return result
+                    fresh = row.to_dict()
+                finally:
+                    session.close()
+                return self._quote_result(fresh, symbol, day, pname)
 
-            log.warning("No trading day found within %d days of %s for %s", _MAX_FALLBACK_DAYS, day, symbol)
+        if cached:
+            log.info("Fallback cache hit: %s %s (requested %s)", symbol, cached_date, day)
+            return self._quote_result(cached, symbol, day, pname)
+
+        log.warning("No trading day found within %d days of %s for %s", _MAX_FALLBACK_DAYS, day, symbol)
+        return None
+
+    def _fetch_window(self, symbol: str, sessions: list[date], pname: str) -> Optional[date]:
+        """Fetch ``sessions`` (oldest first) in one provider call and store them.
+
+        A single session uses ``get_quote``, which is cheaper than a history
+        download on providers without range requests; more use one
+        ``get_history`` over the span. Sessions without a bar are remembered
+        as such. Returns the newest date fetched, or None.
+        """
+        provider = get_provider(pname)
+        if len(sessions) == 1:
+            qd = provider.get_quote(symbol, sessions[0])
+            quotes = [qd] if qd is not None else []
+        else:
+            quotes = [
+                q for q in provider.get_history(symbol, sessions[0], sessions[-1])
+                if sessions[0] <= q.date <= sessions[-1]
+            ]
+        got = {q.date for q in quotes}
+        empty = [d for d in sessions if d not in got]
+        if empty:
+            log.info("No data for %s on %s", symbol, ", ".join(map(str, empty)))
+        with get_session() as wsession:
+            if quotes:
+                now = datetime.now(UTC)
+                _upsert_quotes(wsession, [_quote_row(q, pname, now) for q in quotes])
+            self._record_negatives(wsession, symbol, pname, empty)
+            wsession.commit()
+        if not quotes:
             return None
-        finally:
-            session.close()
+        self._invalidate_quotes(symbol, pname, min(got), max(got))
+        return max(got)
+
+    def _quote_result(self, result: dict, symbol: str, day: date, provider_name: str) -> dict:
+        result["requested_date"] = day.isoformat()
+        self._maybe_background_prefetch(symbol, provider_name)
+        return result
+
+    def _invalidate_quotes(self, symbol: str, provider_name: str, start: date, end: date):
+        """Evict cached results a write to ``[start, end]`` could change.
+
+        Requests up to ``_MAX_FALLBACK_DAYS`` after a newly stored bar may have
+        been answered with an older fallback bar, so they go too.
+        """
+        last = end + timedelta(days=_MAX_FALLBACK_DAYS)
+        self._quote_cache.invalidate(
+            lambda k: k[0] == symbol and k[2] == provider_name and start <= k[1] <= last
+        )
 
     # ------------------------------------------------------------------
     # Latest quote (no date specified)
@@ -172,13 +663,211 @@ class QuoteService:
         pname = provider_name or DEFAULT_PROVIDER
         return self.get_quote(symbol, date.today(), provider_name=pname)
 
+    # ------------------------------------------------------------------
+    # Batch quotes
+    # ------------------------------------------------------------------
+
+    def get_quotes(
+        self,
+        items: Iterable[tuple[str, date]],
+        provider_name: Optional[str] = None,
+    ) -> list[dict]:
+        """Resolve many (symbol, day) pairs with :meth:`get_quote`'s fallback.
+
+        Returns one entry per item, in order: ``symbol``, ``date`` and a
+        ``status`` of ``ok`` (with ``quote``), ``not_found``,
+        ``invalid_symbol`` or ``error`` (with ``error``).
+
+        Stored bars for every item are read in one query. Items that need a
+        provider are grouped per symbol into range downloads, written
+        together, and then resolved from the stored rows. Unlike
+        :meth:`get_quote`, a batch does not start background prefetches.
+        """
+        pname = provider_name or DEFAULT_PROVIDER
+        provider = get_provider(pname)
+        items = [(symbol.upper(), day) for symbol, day in items]
+        results: dict[tuple[str, date], dict] = {}
+        pending = []
+        for key in dict.fromkeys(items):
+            hot = self._quote_cache.get((key[0], key[1], pname))
+            if hot is not None:
+                results[key] = {"status": "ok", "quote": dict(hot)}
+            else:
+                pending.append(key)
+
+        if pending:
+            stored, no_bar = self._stored_bars(pending, pname)
+            needed: dict[str, set[date]] = {}
+            # Items whose answer waits on a download; the rest are settled
+            # by what is stored, whatever happens to their symbol's fetch.
+            fetching = set()
+            for symbol, day in pending:
+                newest = self._newest_bar(stored.get(symbol, []), day)
+                after = newest.date + timedelta(days=1) if newest else day - timedelta(days=_MAX_FALLBACK_DAYS)
+                skip = no_bar.get(symbol, set())
+                sessions = [d for d in self._calendar.sessions_between(after, day) if d not in skip]
+                if sessions:
+                    needed.setdefault(symbol, set()).update(sessions)
+                    fetching.add((symbol, day))
+
+            failed = self._fetch_sessions(needed, provider, pname) if needed else {}
+            if needed:
+                stored, _ = self._stored_bars(pending, pname)
+
+            for symbol, day in pending:
+                if symbol in failed and (symbol, day) in fetching:
+                    results[(symbol, day)] = failed[symbol]
+                    continue
+                row = self._newest_bar(stored.get(symbol, []), day)
+                if row is None:
+                    results[(symbol, day)] = {"status": "not_found"}
+                    continue
+                quote = row.to_dict()
+                quote["requested_date"] = day.isoformat()
+                self._quote_cache.put((symbol, day, pname), quote)
+                results[(symbol, day)] = {"status": "ok", "quote": dict(quote)}
+
+        return [
+            {"symbol": symbol, "date": day.isoformat(), **results[(symbol, day)]}
+            for symbol, day in items
+        ]
+
+    @staticmethod
+    def _fallback_windows(days: list[date]) -> list[tuple[date, date]]:
+        """Merge each day's fallback window into non-overlapping ranges."""
+        windows: list[list[date]] = []
+        for day in sorted(days):
+            start = day - timedelta(days=_MAX_FALLBACK_DAYS)
+            if windows and start <= windows[-1][1]:
+                windows[-1][1] = day
+            else:
+                windows.append([start, day])
+        return [(lo, hi) for lo, hi in windows]
+
+    def _stored_bars(
+        self, keys: list[tuple[str, date]], pname: str
+    ) -> tuple[dict[str, list[Quote]], dict[str, set[date]]]:
+        """Read the stored bars and no-bar days covering every key's window.
+
+        Returns rows per symbol, oldest first, and unexpired no-bar days per
+        symbol. One query each per :data:`_RANGES_PER_QUERY` merged windows:
+        SQLite parses the ``OR`` chain as a tree and caps its depth at 1000.
+        """
+        days_by_symbol: dict[str, list[date]] = {}
+        for symbol, day in keys:
+            days_by_symbol.setdefault(symbol, []).append(day)
+        ranges = [
+            (symbol, lo, hi)
+            for symbol, days in days_by_symbol.items()
+            for lo, hi in self._fallback_windows(days)
+        ]
+
+        stored: dict[str, list[Quote]] = {}
+        no_bar: dict[str, set[date]] = {}
+        session = get_read_session()
+        try:
+            # A symbol's windows are contiguous and ascending in ``ranges``,
+            # so rows still arrive oldest first per symbol across chunks.
+            for chunk in _batched(ranges, _RANGES_PER_QUERY):
+                rows = (
+                    session.query(Quote)
+                    .filter(
+                        Quote.provider == pname,
+                        or_(*(
+                            and_(Quote.symbol == symbol, Quote.date >= lo, Quote.date <= hi)
+                            for symbol, lo, hi in chunk
+                        )),
+                    )
+                    .order_by(Quote.symbol, Quote.date)
+                    .all()
+                )
+                for row in rows:
+                    stored.setdefault(row.symbol, []).append(row)
+                negatives = session.execute(
+                    select(NegativeResult.symbol, NegativeResult.date).where(
+                        NegativeResult.provider == pname,
+                        NegativeResult.expires_at > datetime.now(UTC),
+                        or_(*(
+                            and_(
+                                NegativeResult.symbol == symbol,
+                                NegativeResult.date >= lo,
+                                NegativeResult.date <= hi,
+                            )
+                            for symbol, lo, hi in chunk
+                        )),
+                    )
+                ).all()
+                for symbol, day in negatives:
+                    no_bar.setdefault(symbol, set()).add(day)
+        finally:
+            session.close()
+        return stored, no_bar
+
+    @staticmethod
+    def _newest_bar(rows: list[Quote], day: date) -> Optional[Quote]:
+        """The newest of ``rows`` (oldest first) within ``day``'s fallback window."""
+        i = bisect.bisect_right(rows, day, key=lambda r: r.date)
+        if i and rows[i - 1].date >= day - timedelta(days=_MAX_FALLBACK_DAYS):
+            return rows[i - 1]
+        return None
+
+    def _fetch_sessions(
+        self, needed: dict[str, set[date]], provider: StockProvider, pname: str
+    ) -> dict[str, dict]:
+        """Download ``needed`` sessions per symbol and store them in one write.
+
+        Sessions the provider has no bar for are remembered as such. Returns
+        a failure entry for each symbol that couldn't be fetched.
+        """
+        now = datetime.now(UTC)
+        rows, negatives, failed = [], [], {}
+        for symbol, days in needed.items():
+            try:
+                self._validate_symbol(symbol, pname)
+            except SymbolNotFoundError as exc:
+                failed[symbol] = {"status": "invalid_symbol", "error": str(exc)}
+                continue
+            days = sorted(days)
+            expected = self._calendar.sessions_between(days[0], days[-1])
+            ranges = missing_ranges(
+                expected, set(expected) - set(days), _PREFETCH_MERGE_SESSIONS
+            )
+            if not provider.range_requests:
+                ranges = span(ranges)
+            try:
+                quotes = [
+                    q for lo, hi in ranges for q in provider.get_history(symbol, lo, hi)
+                ]
+            except Exception as exc:
+                log.warning("Batch: provider error for %s (%s)", symbol, pname, exc_info=True)
+                failed[symbol] = {"status": "error", "error": f"Provider error: {exc}"}
+                continue
+            got = {q.date for q in quotes}
+            rows.extend(_quote_row(q, pname, now) for q in quotes)
+            negatives.extend((symbol, d) for d in days if d not in got)
+            log.info(
+                "Batch: fetched %d bar(s) for %s (%s) in %d request(s)",
+                len(quotes), symbol, pname, len(ranges),
+            )
+
+        if rows or negatives:
+            with get_session() as wsession:
+                _upsert_quotes(wsession, rows)
+                for symbol, day in negatives:
+                    self._record_negative(wsession, symbol, pname, day)
+                wsession.commit()
+        for symbol in {r["symbol"] for r in rows}:
+            dates = [r["date"] for r in rows if r["symbol"] == symbol]
+            self._invalidate_quotes(symbol, pname, min(dates), max(dates))
+        return failed
+
     # ------------------------------------------------------------------
     # Multi-provider comparison
     # ------------------------------------------------------------------
 
     def get_quote_all_providers(self, symbol: str, day: date) -> list[dict]:
         symbol = symbol.upper()
-        session = get_session()
+        session = get_read_session()
         try:
             rows = (
                 session.query(Quote)
@@ -193,78 +882,445 @@ class QuoteService:
     # History
     # ------------------------------------------------------------------
 
+    def _history_rows(
+        self,
+        symbol: str,
+        provider: str,
+        start: date,
+        end: date,
+        fields: list[str],
+        typed: bool = False,
+        after: Optional[date] = None,
+        limit: Optional[int] = None,
+    ) -> tuple[list, list]:
+        """Read ``fields`` of the stored range as raw tuples, oldest first.
+
+        ``after`` (exclusive) and ``limit`` page through the range in SQL.
+        Returns the rows and a converter (or None) per field; see
+        :func:`_quote_columns`.
+        """
+        columns, converters = _quote_columns(fields, typed)
+        table = Quote.__table__
+        stmt = (
+            select(*columns)
+            .where(
+                table.c.symbol == symbol,
+                table.c.provider == provider,
+                table.c.date >= start,
+                table.c.date <= end,
+            )
+            .order_by(table.c.date)
+        )
+        if after is not None:
+            stmt = stmt.where(table.c.date > after)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        session = get_read_session()
+        try:
+            return session.execute(stmt).all(), converters
+        finally:
+            session.close()
+
     def get_history(
         self,
         symbol: str,
         start: date,
         end: date,
         provider_name: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+        after: Optional[date] = None,
+        limit: Optional[int] = None,
     ) -> list[dict]:
+        """Return stored quotes in ``[start, end]``, oldest first.
+
+        ``fields`` limits each record to those keys (default: all of
+        :data:`QUOTE_FIELDS`); unknown names raise ValueError. Only the
+        needed columns are read, as plain tuples. ``after`` skips dates up
+        to and including it and ``limit`` caps the rows returned, so a
+        caller can page by passing the last date it received.
+        """
         symbol = symbol.upper()
         pname = provider_name or DEFAULT_PROVIDER
-        session = get_session()
+        fields = _check_fields(fields)
+
+        # symbol and provider are fixed by the query; don't read them per row.
+        selected = [f for f in fields if f not in ("symbol", "provider")]
+        rows, converters = self._history_rows(
+            symbol, pname, start, end, selected, after=after, limit=limit
+        )
+        constants = {"symbol": symbol, "provider": pname}
+        return _history_records(rows, fields, selected, converters, constants)
+
+    def get_history_columns(
+        self,
+        symbol: str,
+        start: date,
+        end: date,
+        provider_name: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+        typed: bool = False,
+        after: Optional[date] = None,
+        limit: Optional[int] = None,
+    ) -> dict:
+        """Return the same range as :meth:`get_history`, one list per field.
+
+        ``symbol`` and ``provider`` are the same for every row, so they are
+        returned once alongside ``count`` rather than as columns. Rows are
+        transposed directly; no per-row dicts are built. ``typed`` returns
+        ``date`` and ``fetched_at`` as integers (see :func:`_quote_columns`);
+        ``after`` and ``limit`` page as in :meth:`get_history`.
+        """
+        symbol = symbol.upper()
+        pname = provider_name or DEFAULT_PROVIDER
+        selected = [
+            f for f in _check_fields(fields) if f not in ("symbol", "provider")
+        ]
+        rows, converters = self._history_rows(
+            symbol, pname, start, end, selected, typed, after, limit
+        )
+
+        return {
+            "symbol": symbol,
+            "provider": pname,
+            "count": len(rows),
+            "fields": selected,
+            "columns": _history_columns(rows, selected, converters),
+        }
+
+    def iter_histories(
+        self,
+        symbols: Iterable[str],
+        start: date,
+        end: date,
+        provider_name: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+        columnar: bool = False,
+        batch_size: int = _DUMP_BATCH_SIZE,
+        typed: bool = False,
+    ) -> Iterator[tuple[str, Any]]:
+        """Yield ``(symbol, history)`` for many symbols, in symbol order.
+
+        Rows for every symbol are read ``batch_size`` at a time, keyed on
+        (symbol, date), each batch on a session that is closed before
+        anything is yielded. A slow consumer, such as a streamed response,
+        therefore holds no read connection or open statement between
+        batches. Only one symbol's rows, plus one batch, are held at a
+        time. ``history`` is a list of :meth:`get_history` records or, with
+        ``columnar``, the ``columns`` of :meth:`get_history_columns`
+        (``typed`` as there). Symbols with nothing stored yield an empty
+        history.
+        """
+        symbols = sorted({s.upper() for s in symbols})
+        pname = provider_name or DEFAULT_PROVIDER
+        fields = _check_fields(fields)
+        selected = [f for f in fields if f not in ("symbol", "provider")]
+        columns, converters = _quote_columns(selected, typed)
+
+        def build(symbol, rows):
+            if columnar:
+                return _history_columns(rows, selected, converters)
+            constants = {"symbol": symbol, "provider": pname}
+            return _history_records(rows, fields, selected, converters, constants)
+
+        table = Quote.__table__
+        # The stored date, raw, so a batch's last key binds back unchanged.
+        day = type_coerce(table.c.date, Integer if QUOTES_COMPACT_STORAGE else String)
+        stmt = (
+            select(table.c.symbol, day, *columns)
+            .where(
+                table.c.symbol.in_(symbols),
+                table.c.provider == pname,
+                table.c.date >= start,
+                table.c.date <= end,
+            )
+            .order_by(table.c.symbol, table.c.date)
+            .limit(max(batch_size, 1))
+        )
+        remaining = iter(symbols)
+
+        def flush(symbol, rows):
+            for other in remaining:
+                if other == symbol:
+                    break
+                yield other, build(other, [])
+            yield symbol, build(symbol, rows)
+
+        current, rows, last = None, [], None
+        while True:
+            session = get_read_session()
+            try:
+                page = stmt if last is None else stmt.where(tuple_(table.c.symbol, day) > last)
+                batch = session.execute(page).all()
+            finally:
+                session.close()
+            for row in batch:
+                if row[0] != current:
+                    if current is not None:
+                        yield from flush(current, rows)
+                    current, rows = row[0], []
+                rows.append(row[2:])
+            if len(batch) < max(batch_size, 1):
+                break
+            last = tuple(batch[-1][:2])
+        if current is not None:
+            yield from flush(current, rows)
+        for other in remaining:
+            yield other, build(other, [])
+
+    def get_history_matrix(
+        self,
+        symbols: Iterable[str],
+        start: date,
+        end: date,
+        provider_name: Optional[str] = None,
+        field: str = "close",
+    ) -> dict:
+        """Return one field for many symbols as a dense date x symbol matrix.
+
+        ``dates`` holds every date any of the symbols has a bar for, oldest
+        first; ``values[i][j]`` is ``field`` for ``symbols[j]`` on
+        ``dates[i]``, or None where that symbol has no bar. Symbols keep
+        their given order.
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        pname = provider_name or DEFAULT_PROVIDER
+        if field in ("symbol", "provider", "date"):
+            raise ValueError(f"Cannot align on '{field}'; pick a value field.")
+        _check_fields([field])
+        (date_col, value_col), (to_date, to_value) = _quote_columns(["date", field])
+
+        table = Quote.__table__
+        stmt = (
+            select(table.c.symbol, date_col, value_col)
+            .where(
+                table.c.symbol.in_(symbols),
+                table.c.provider == pname,
+                table.c.date >= start,
+                table.c.date <= end,
+            )
+            .order_by(table.c.date)
+        )
+        session = get_read_session()
+        try:
+            rows = session.execute(stmt).all()
+        finally:
+            session.close()
+
+        index = {s: j for j, s in enumerate(symbols)}
+        dates, values = [], []
+        last = None
+        for symbol, day, value in rows:
+            if day != last:
+                last = day
+                dates.append(to_date(day) if to_date else day)
+                values.append([None] * len(symbols))
+            values[-1][index[symbol]] = to_value(value) if to_value else value
+        return {
+            "provider": pname,
+            "field": field,
+            "symbols": symbols,
+            "dates": dates,
+            "values": values,
+        }
+
+    def get_changes(
+        self,
+        since: int = 0,
+        symbol: Optional[str] = None,
+        provider_name: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+        limit: int = 1000,
+    ) -> dict:
+        """Return quotes inserted or changed after write sequence ``since``.
+
+        Records come in write order, each with its ``seq``, filtered to
+        ``symbol`` and ``provider_name`` when given (every provider
+        otherwise). ``until`` is the last ``seq`` returned, or ``since``
+        when there is nothing new: pass it back as ``since`` to resume.
+        ``more`` says whether another page is ready. Quotes are never
+        deleted, so replaying the feed from 0 rebuilds the table.
+        """
+        fields = _check_fields(fields)
+        columns, converters = _quote_columns(fields)
+        table = Quote.__table__
+        stmt = select(table.c.seq, *columns).where(table.c.seq > since)
+        if symbol:
+            stmt = stmt.where(table.c.symbol == symbol.upper())
+        if provider_name:
+            stmt = stmt.where(table.c.provider == provider_name)
+        stmt = stmt.order_by(table.c.seq).limit(limit + 1)
+        session = get_read_session()
+        try:
+            rows = session.execute(stmt).all()
+        finally:
+            session.close()
+
+        more = len(rows) > limit
+        rows = rows[:limit]
+        records = _history_records(
+            (row[1:] for row in rows), fields, list(fields), converters, {}
+        )
+        for row, rec in zip(rows, records):
+            rec["seq"] = row[0]
+        return {
+            "since": since,
+            "until": rows[-1][0] if rows else since,
+            "more": more,
+            "count": len(records),
+            "quotes": records,
+        }
+
+    # ------------------------------------------------------------------
+    # Prefetch
+    # ------------------------------------------------------------------
+
+    def prefetch(
+        self,
+        symbol: str,
+        start: date,
+        end: date,
+        provider_name: Optional[str] = None,
+        full: bool = False,
+    ) -> int:
+        """Download missing history from a provider and store it. Returns row count.
+
+        Only sessions not already stored are requested unless ``full`` is set.
+        """
+        symbol = symbol.upper()
+        pname = provider_name or DEFAULT_PROVIDER
+        # Identical concurrent prefetches share one download and one write.
+        return self._flights.do(
+            ("history", symbol, pname, start, end, full),
+            self._prefetch, symbol, start, end, pname, full,
+        )
+
+    def plan_prefetch(
+        self,
+        symbol: str,
+        start: date,
+        end: date,
+        provider_name: Optional[str] = None,
+    ) -> list[tuple[date, date]]:
+        """Return the date ranges a prefetch of ``[start, end]`` would request.
+
+        Sessions that are stored, or that the provider recently answered
+        with no bar (before a listing, say), are not requested again.
+        """
+        symbol = symbol.upper()
+        pname = provider_name or DEFAULT_PROVIDER
+        # The newest sessions are always refreshed: today's bar may be partial.
+        refresh_from = date.today() - timedelta(days=_RECENT_DAYS)
+        session = get_read_session()
         try:
             rows = (
-                session.query(Quote)
+                session.query(Quote.date)
                 .filter(
                     Quote.symbol == symbol,
+                    Quote.provider == pname,
                     Quote.date >= start,
                     Quote.date <= end,
-                    Quote.provider == pname,
+                    Quote.date < refresh_from,
                 )
-                .order_by(Quote.date)
                 .all()
             )
-            return [r.to_dict() for r in rows]
+            present = {r.date for r in rows}
+            present.update(
+                d for d in self._negative_days(session, symbol, pname, start, end)
+                if d < refresh_from
+            )
         finally:
             session.close()
 
-    # ------------------------------------------------------------------
-    # Prefetch
-    # ------------------------------------------------------------------
+        expected = self._calendar.sessions_between(start, end)
+        ranges = missing_ranges(expected, present, _PREFETCH_MERGE_SESSIONS)
+        if not get_provider(pname).range_requests:
+            ranges = span(ranges)
+        return ranges
 
-    def prefetch(
+    def sessions_between(self, start: date, end: date) -> list[date]:
+        """Trading sessions in ``[start, end]`` on the configured calendar."""
+        return self._calendar.sessions_between(start, end)
+
+    def covers(
         self,
         symbol: str,
         start: date,
         end: date,
         provider_name: Optional[str] = None,
-    ) -> int:
-        """Download history from a provider and store it. Returns row count."""
+    ) -> bool:
+        """Whether every session in ``[start, end]`` has a stored bar.
+
+        Days the calendar closes need no bar. ``negative_results`` entries
+        don't count: they expire and may record a transient empty answer,
+        so a range they fill can still change. Reads only dates, off the
+        (symbol, provider, date) index; no provider is involved.
+        """
         symbol = symbol.upper()
         pname = provider_name or DEFAULT_PROVIDER
+        table = Quote.__table__
+        session = get_read_session()
+        try:
+            known = set(session.execute(
+                select(table.c.date).where(
+                    table.c.symbol == symbol,
+                    table.c.provider == pname,
+                    table.c.date >= start,
+                    table.c.date <= end,
+                )
+            ).scalars())
+        finally:
+            session.close()
+        return known.issuperset(self._calendar.sessions_between(start, end))
+
+    def _prefetch(self, symbol: str, start: date, end: date, pname: str, full: bool) -> int:
         provider = get_provider(pname)
+        ranges = [(start, end)] if full else self.plan_prefetch(symbol, start, end, pname)
+        if not ranges:
+            log.info("Prefetch: %s (%s) already complete for %s→%s", symbol, pname, start, end)
+            return 0
 
-        try:
-            quotes = provider.get_history(symbol, start, end)
-        except Exception:
-            log.warning(
-                "Prefetch: provider error for %s %s→%s (%s), storing what was retrieved",
-                symbol, start, end, pname,
-                exc_info=True,
-            )
-            quotes = []
+        quotes, answered = [], []
+        for range_start, range_end in ranges:
+            try:
+                quotes.extend(provider.get_history(symbol, range_start, range_end))
+            except Exception:
+                log.warning(
+                    "Prefetch: provider error for %s %s→%s (%s), storing what was retrieved",
+                    symbol, range_start, range_end, pname,
+                    exc_info=True,
+                )
+            else:
+                answered.extend(self._calendar.sessions_between(range_start, range_end))
+
+        # Sessions the provider answered without a bar are remembered, so
+        # the next prefetch doesn't ask for them again.
+        got = {q.date for q in quotes}
+        empty = [d for d in answered if d not in got]
+        if empty:
+            with get_session() as session:
+                self._record_negatives(session, symbol, pname, empty)
+                session.commit()
 
         if not quotes:
             log.warning("Prefetch: no data returned for %s (%s)", symbol, pname)
             return 0
 
+        now = datetime.now(UTC)
         session = get_session()
-        stored = 0
         try:
-            for qd in quotes:
-                try:
-                    _store_quote(session, qd, pname)
-                    session.flush()
-                    stored += 1
-                except IntegrityError:
-                    session.rollback()
+            stats = _upsert_quotes(session, (_quote_row(qd, pname, now) for qd in quotes))
             session.commit()
         finally:
             session.close()
+        self._invalidate_quotes(
+            symbol, pname, min(q.date for q in quotes), max(q.date for q in quotes)
+        )
 
-        log.info("Prefetch complete: %s (%s) — %d quotes stored", symbol, pname, stored)
-        return stored
+        log.info(
+            "Prefetch complete: %s (%s) — %r from %d request(s)",
+            symbol, pname, stats, len(ranges),
+        )
+        return stats.total
 
     # ------------------------------------------------------------------
     # Background prefetch
@@ -273,22 +1329,23 @@ class QuoteService:
     def _maybe_background_prefetch(self, symbol: str, provider_name: str):
         key = (symbol, provider_name)
         with self._lock:
-            if key in self._prefetch_in_flight:
+            if key in self._history_ready or key in self._prefetch_in_flight:
                 return
             self._prefetch_in_flight.add(key)
 
-        session = get_session()
+        session = get_read_session()
         try:
-            count = (
-                session.query(func.count(Quote.id))
-                .filter_by(symbol=symbol, provider=provider_name)
-                .scalar()
-            )
+            count = session.execute(
+                select(SymbolStat.count).where(
+                    SymbolStat.symbol == symbol, SymbolStat.provider == provider_name
+                )
+            ).scalar()
         finally:
             session.close()
 
         if count and count > 30:
             with self._lock:
+                self._history_ready.add(key)
                 self._prefetch_in_flight.discard(key)
             return
 
@@ -296,6 +1353,7 @@ class QuoteService:
         thread = threading.Thread(
             target=self._do_background_prefetch,
             args=(symbol, provider_name, key),
+            name=f"prefetch-{symbol}-{provider_name}",
             daemon=True,
         )
         thread.start()
@@ -320,154 +1378,229 @@ class QuoteService:
     # Info / diagnostics
     # ------------------------------------------------------------------
 
-    def get_symbol_info(self, symbol: str) -> Optional[dict]:
-        symbol = symbol.upper()
-        session = get_session()
+    @staticmethod
+    def _read_symbol_stats(session, symbol: Optional[str] = None):
+        stmt = select(
+            SymbolStat.symbol,
+            SymbolStat.provider,
+            SymbolStat.count,
+            SymbolStat.earliest,
+            SymbolStat.latest,
+            SymbolStat.last_fetched,
+        ).where(SymbolStat.count > 0).order_by(SymbolStat.symbol, SymbolStat.provider)
+        if symbol is not None:
+            stmt = stmt.where(SymbolStat.symbol == symbol)
+        return session.execute(stmt).all()
+
+    @staticmethod
+    def _database_size() -> tuple[str, float]:
+        db_path = DATABASE_URL.replace("sqlite:///", "")
+        db_size_mb = 0.0
+        if os.path.exists(db_path):
+            db_size_mb = round(os.path.getsize(db_path) / (1024 * 1024), 2)
+        return db_path, db_size_mb
+
+    def data_version(
+        self, symbol: Optional[str] = None, provider_name: Optional[str] = None
+    ) -> tuple[tuple, Optional[datetime]]:
+        """Return a version of the stored quotes and when they last changed.
+
+        The version changes with every write that changes quotes for
+        ``symbol`` (every provider, unless one is given), or for any symbol
+        without one. One indexed read of ``symbol_stats``; made for HTTP
+        validators, so the time (of the last such write, not the newest
+        ``fetched_at``) is naive UTC, as stored.
+        """
+        stats = SymbolStat.__table__
+        stmt = select(
+            func.count(),
+            func.sum(stats.c.writes),
+            func.sum(stats.c.count),
+            func.max(stats.c.changed_at),
+        )
+        if symbol is not None:
+            stmt = stmt.where(stats.c.symbol == symbol.upper())
+        if provider_name is not None:
+            stmt = stmt.where(stats.c.provider == provider_name)
+        session = get_read_session()
         try:
-            rows = (
-                session.query(
-                    Quote.provider,
-                    func.count(Quote.id).label("cnt"),
-                    func.min(Quote.date).label("earliest"),
-                    func.max(Quote.date).label("latest"),
-                    func.max(Quote.fetched_at).label("last_fetched"),
-                )
-                .filter_by(symbol=symbol)
-                .group_by(Quote.provider)
-                .all()
-            )
-            if not rows:
-                return None
-
-            by_provider = {}
-            total = 0
-            all_earliest = None
-            all_latest = None
-            providers_list = []
-            for r in rows:
-                by_provider[r.provider] = {
-                    "count": r.cnt,
-                    "earliest": r.earliest.isoformat() if r.earliest else None,
-                    "latest": r.latest.isoformat() if r.latest else None,
-                    "last_fetched": r.last_fetched.isoformat() if r.last_fetched else None,
-                }
-                total += r.cnt
-                providers_list.append(r.provider)
-                if all_earliest is None or (r.earliest and r.earliest < all_earliest):
-                    all_earliest = r.earliest
-                if all_latest is None or (r.latest and r.latest > all_latest):
-                    all_latest = r.latest
-
-            return {
-                "symbol": symbol,
-                "providers": providers_list,
-                "total_quotes": total,
-                "date_range": {
-                    "earliest": all_earliest.isoformat() if all_earliest else None,
-                    "latest": all_latest.isoformat() if all_latest else None,
-                },
-                "by_provider": by_provider,
-            }
+            row = tuple(session.execute(stmt).one())
         finally:
             session.close()
+        return row, row[-1]
 
-    def get_cache_info(self) -> dict:
-        session = get_session()
+    def cache_info_version(self) -> tuple:
+        """Return a key that changes whenever :meth:`get_cache_info` would."""
+        version, _ = self.data_version()
+        return (
+            version,
+            self._database_size(),
+            sorted(self.prefetch_in_flight),
+            self._quote_cache.stats(),
+            self._flights.stats(),
+        )
+
+    @staticmethod
+    def _summarize(rows) -> dict:
+        """Fold per-provider ``symbol_stats`` rows for one symbol together."""
+        earliest = min((r.earliest for r in rows if r.earliest), default=None)
+        latest = max((r.latest for r in rows if r.latest), default=None)
+        last_fetched = max((r.last_fetched for r in rows if r.last_fetched), default=None)
+        return {
+            "total_quotes": sum(r.count for r in rows),
+            "providers": [r.provider for r in rows],
+            "earliest": earliest.isoformat() if earliest else None,
+            "latest": latest.isoformat() if latest else None,
+            "last_fetched": last_fetched.isoformat() if last_fetched else None,
+        }
+
+    def get_symbol_info(self, symbol: str) -> Optional[dict]:
+        symbol = symbol.upper()
+        session = get_read_session()
         try:
-            total = session.query(func.count(Quote.id)).scalar() or 0
-
-            symbol_rows = (
-                session.query(
-                    Quote.symbol,
-                    func.count(Quote.id).label("cnt"),
-                    func.min(Quote.date).label("earliest"),
-                    func.max(Quote.date).label("latest"),
-                    func.max(Quote.fetched_at).label("last_fetched"),
-                )
-                .group_by(Quote.symbol)
-                .order_by(Quote.symbol)
-                .all()
-            )
+            rows = self._read_symbol_stats(session, symbol)
+        finally:
+            session.close()
+        if not rows:
+            return None
 
-            symbols = []
-            for r in symbol_rows:
-                prov_rows = (
-                    session.query(Quote.provider)
-                    .filter_by(symbol=r.symbol)
-                    .distinct()
-                    .all()
-                )
-                symbols.append({
-                    "symbol": r.symbol,
-                    "total_quotes": r.cnt,
-                    "providers": sorted(p[0] for p in prov_rows),
+        summary = self._summarize(rows)
+        return {
+            "symbol": symbol,
+            "providers": summary["providers"],
+            "total_quotes": summary["total_quotes"],
+            "date_range": {
+                "earliest": summary["earliest"],
+                "latest": summary["latest"],
+            },
+            "by_provider": {
+                r.provider: {
+                    "count": r.count,
                     "earliest": r.earliest.isoformat() if r.earliest else None,
                     "latest": r.latest.isoformat() if r.latest else None,
                     "last_fetched": r.last_fetched.isoformat() if r.last_fetched else None,
-                })
+                }
+                for r in rows
+            },
+        }
 
-            db_path = DATABASE_URL.replace("sqlite:///", "")
-            db_size_mb = 0.0
-            if os.path.exists(db_path):
-                db_size_mb = round(os.path.getsize(db_path) / (1024 * 1024), 2)
-
-            configured = {}
-            for name, prov in list_providers().items():
-                configured[name] = prov.is_configured()
-
-            return {
-                "total_quotes": total,
-                "total_symbols": len(symbol_rows),
-                "database_path": db_path,
-                "database_size_mb": db_size_mb,
-                "providers_configured": configured,
-                "prefetch_in_flight": self.prefetch_in_flight,
-                "symbols": symbols,
-            }
+    def get_cache_info(self) -> dict:
+        session = get_read_session()
+        try:
+            rows = self._read_symbol_stats(session)
         finally:
             session.close()
 
+        symbols = []
+        for sym, group in groupby(rows, key=lambda r: r.symbol):
+            symbols.append({"symbol": sym, **self._summarize(list(group))})
+        total = sum(s["total_quotes"] for s in symbols)
+
+        db_path, db_size_mb = self._database_size()
+
+        configured = {}
+        for name, prov in list_providers().items():
+            configured[name] = prov.is_configured()
+
+        return {
+            "total_quotes": total,
+            "total_symbols": len(symbols),
+            "database_path": db_path,
+            "database_size_mb": db_size_mb,
+            "providers_configured": configured,
+            "prefetch_in_flight": self.prefetch_in_flight,
+            "quote_cache": self._quote_cache.stats(),
+            "coalescing": self._flights.stats(),
+            "sqlite_pragmas": active_pragmas(),
+            "symbols": symbols,
+        }
+
     # ------------------------------------------------------------------
     # Dump / load (backup & restore)
     # ------------------------------------------------------------------
 
     def dump_database(self) -> list[dict]:
-        session = get_session()
+        return list(self.iter_quotes())
+
+    def iter_quotes(
+        self,
+        symbol: Optional[str] = None,
+        provider_name: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        batch_size: int = _DUMP_BATCH_SIZE,
+    ) -> Iterator[dict]:
+        """Yield stored quotes as dicts, ordered by symbol, provider and date.
+
+        Rows are streamed from the cursor ``batch_size`` at a time instead of
+        being loaded up front, so memory stays flat for any table size.
+        """
+        table = Quote.__table__
+        columns, converters = _quote_columns(QUOTE_FIELDS)
+        convert = [(i, fn) for i, fn in enumerate(converters) if fn]
+        stmt = select(*columns)
+        if symbol:
+            stmt = stmt.where(table.c.symbol == symbol.upper())
+        if provider_name:
+            stmt = stmt.where(table.c.provider == provider_name)
+        if start:
+            stmt = stmt.where(table.c.date >= start)
+        if end:
+            stmt = stmt.where(table.c.date <= end)
+        stmt = stmt.order_by(table.c.symbol, table.c.provider, table.c.date)
+
+        session = get_read_session()
         try:
-            rows = session.query(Quote).order_by(Quote.symbol, Quote.date).all()
-            return [r.to_dict() for r in rows]
+            result = session.execute(
+                stmt.execution_options(stream_results=True, yield_per=batch_size)
+            )
+            for row in result:
+                row = list(row)
+                for i, fn in convert:
+                    row[i] = fn(row[i])
+                yield dict(zip(QUOTE_FIELDS, row))
         finally:
             session.close()
 
-    def load_database(self, records: list[dict]) -> int:
-        session = get_session()
-        loaded = 0
+    def load_database(self, records: Iterable[dict]) -> int:
+        return self.load_records(records).total
+
+    def load_records(
+        self,
+        records: Iterable[dict],
+        batch_size: int = WRITE_BATCH_SIZE,
+        on_commit: Optional[Callable[[WriteStats], None]] = None,
+    ) -> WriteStats:
+        """Validate and upsert records, committing every ``batch_size`` rows.
+
+        ``records`` is consumed lazily, one batch at a time, so it can be a
+        streaming reader; ``on_commit`` runs after each committed batch with
+        the running totals (e.g. to save a resume checkpoint).
+        """
+        now = datetime.now(UTC)
         skipped = 0
-        try:
+
+        def rows():
+            nonlocal skipped
             for i, rec in enumerate(records):
                 try:
-                    qd = QuoteData(
-                        symbol=rec["symbol"],
-                        date=date.fromisoformat(rec["date"]),
-                        open=rec.get("open"),
-                        high=rec.get("high"),
-                        low=rec.get("low"),
-                        close=rec.get("close"),
-                        volume=rec.get("volume"),
-                        adjusted=rec.get("adjusted", True),
-                    )
-                    _store_quote(session, qd, rec["provider"])
-                    session.flush()
-                    loaded += 1
+                    yield _record_row(rec, now)
                 except (KeyError, ValueError, TypeError) as exc:
                     log.warning("Skipping malformed record %d: %s", i, exc)
                     skipped += 1
-                except IntegrityError:
-                    session.rollback()
-            session.commit()
+
+        stats = WriteStats()
+        session = get_session()
+        try:
+            for batch in _batched(rows(), max(batch_size, 1)):
+                stats += _upsert_quotes(session, batch, batch_size)
+                session.commit()
+                if on_commit:
+                    on_commit(stats)
         finally:
             session.close()
+            self._quote_cache.clear()
         if skipped:
             log.warning("Database load: %d records skipped due to errors", skipped)
-        log.info("Database load complete: %d records imported", loaded)
-        return loaded
+        log.info("Database load complete: %d records imported (%r)", stats.total, stats)
+        return stats
@@ -0,0 +1,157 @@
+"""Exchange trading calendars.
+
+Sessions are derived from each exchange's holiday rules and precomputed one
+year at a time, so "previous trading day" is a bisect rather than a walk
+through calendar days with a provider call per step.
+"""
+
+import bisect
+import threading
+from datetime import date, timedelta
+
+_WEEKEND = (5, 6)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The n-th ``weekday`` (Mon=0) of a month; n=-1 is the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        offset = (weekday - first.weekday()) % 7
+        return first + timedelta(days=offset + 7 * (n - 1))
+    nxt = date(year + month // 12, month % 12 + 1, 1)
+    last = nxt - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    w = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * w) // 451
+    month, day = divmod(h + w - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays move to Friday, Sunday holidays to Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+class TradingCalendar:
+    """Weekday sessions minus the exchange's holidays."""
+
+    name: str = ""
+
+    def __init__(self):
+        self._years: dict[int, list[date]] = {}
+        self._lock = threading.Lock()
+
+    def holidays(self, year: int) -> set[date]:
+        """Return the weekday closures for a year."""
+        return set()
+
+    def _sessions_for_year(self, year: int) -> list[date]:
+        sessions = self._years.get(year)
+        if sessions is not None:
+            return sessions
+        with self._lock:
+            sessions = self._years.get(year)
+            if sessions is None:
+                closed = self.holidays(year)
+                day = date(year, 1, 1)
+                sessions = []
+                while day.year == year:
+                    if day.weekday() not in _WEEKEND and day not in closed:
+                        sessions.append(day)
+                    day += timedelta(days=1)
+                self._years[year] = sessions
+        return sessions
+
+    def is_session(self, day: date) -> bool:
+        sessions = self._sessions_for_year(day.year)
+        i = bisect.bisect_left(sessions, day)
+        return i < len(sessions) and sessions[i] == day
+
+    def previous_session(self, day: date) -> date:
+        """Return the latest session on or before ``day``."""
+        year = day.year
+        while True:
+            sessions = self._sessions_for_year(year)
+            i = bisect.bisect_right(sessions, day)
+            if i:
+                return sessions[i - 1]
+            year -= 1
+
+    def sessions_between(self, start: date, end: date) -> list[date]:
+        """Return every session in ``[start, end]``, oldest first."""
+        result = []
+        for year in range(start.year, end.year + 1):
+            sessions = self._sessions_for_year(year)
+            lo = bisect.bisect_left(sessions, start)
+            hi = bisect.bisect_right(sessions, end)
+            result.extend(sessions[lo:hi])
+        return result
+
+
+class NYSECalendar(TradingCalendar):
+    name = "XNYS"
+
+    # One-off closures not covered by the recurring rules.
+    _SPECIAL_CLOSURES = {
+        date(2001, 9, 11), date(2001, 9, 12), date(2001, 9, 13), date(2001, 9, 14),
+        date(2004, 6, 11),   # Reagan funeral
+        date(2007, 1, 2),    # Ford funeral
+        date(2012, 10, 29), date(2012, 10, 30),  # Hurricane Sandy
+        date(2018, 12, 5),   # G.H.W. Bush funeral
+        date(2025, 1, 9),    # Carter funeral
+    }
+
+    def holidays(self, year: int) -> set[date]:
+        days = {
+            _nth_weekday(year, 2, 0, 3),    # Washington's Birthday
+            _easter(year) - timedelta(days=2),  # Good Friday
+            _nth_weekday(year, 5, 0, -1),   # Memorial Day
+            _observed(date(year, 7, 4)),
+            _nth_weekday(year, 9, 0, 1),    # Labor Day
+            _nth_weekday(year, 11, 3, 4),   # Thanksgiving
+            _observed(date(year, 12, 25)),
+        }
+        # A Saturday New Year's Day is not observed on the prior Friday.
+        new_year = date(year, 1, 1)
+        if new_year.weekday() != 5:
+            days.add(_observed(new_year))
+        if year >= 1998:
+            days.add(_nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+        if year >= 2022:
+            days.add(_observed(date(year, 6, 19)))  # Juneteenth
+        days.update(d for d in self._SPECIAL_CLOSURES if d.year == year)
+        return days
+
+
+class WeekdayCalendar(TradingCalendar):
+    """Every Monday–Friday is a session (no holiday rules)."""
+
+    name = "weekdays"
+
+
+_calendars: dict[str, TradingCalendar] = {
+    cal.name: cal for cal in (NYSECalendar(), WeekdayCalendar())
+}
+
+
+def get_calendar(name: str) -> TradingCalendar:
+    if name not in _calendars:
+        raise ValueError(
+            f"Unknown trading calendar '{name}'. Available: {list(_calendars.keys())}"
+        )
+    return _calendars[name]
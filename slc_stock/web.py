@@ -2,9 +2,9 @@ import logging
 from datetime import date, timedelta
 from html import escape as html_escape
 
-from flask import Blueprint, render_template, request
+from flask import Blueprint, make_response, render_template, request
 
-from slc_stock.app import _get_svc
+from slc_stock.app import _etag, _get_svc, _not_modified, _set_validators
 from slc_stock.providers import SymbolNotFoundError
 from slc_stock.validation import is_valid_symbol_format
 
@@ -14,6 +14,8 @@ web = Blueprint("web", __name__)
 
 _MAX_CHART_DAYS = 3650
 _MIN_CHART_DAYS = 1
+# What partials/chart_data.html reads from each quote.
+_CHART_FIELDS = ("date", "open", "high", "low", "close")
 
 
 def _bad_symbol_html():
@@ -87,8 +89,13 @@ def ui_quote(symbol: str, date_str: str):
 @web.route("/ui/cache-status")
 def ui_cache_status():
     svc = _get_svc()
+    etag = _etag(svc.cache_info_version())
+    resp = _not_modified(etag)
+    if resp:
+        return resp
     cache_info = svc.get_cache_info()
-    return render_template("partials/cache_status.html", cache=cache_info)
+    html = render_template("partials/cache_status.html", cache=cache_info)
+    return _set_validators(make_response(html), etag)
 
 
 @web.route("/ui/chart-data/<symbol>")
@@ -102,8 +109,14 @@ def ui_chart_data(symbol: str):
         return '<p class="error">days must be between 1 and 3650.</p>', 400
     end = date.today()
     start = end - timedelta(days=days)
-    quotes = svc.get_history(symbol, start, end)
-    return render_template("partials/chart_data.html", symbol=symbol, quotes=quotes)
+    version, last_modified = svc.data_version(symbol)
+    etag = _etag(version, start)
+    resp = _not_modified(etag, last_modified)
+    if resp:
+        return resp
+    quotes = svc.get_history(symbol, start, end, fields=_CHART_FIELDS)
+    html = render_template("partials/chart_data.html", symbol=symbol, quotes=quotes)
+    return _set_validators(make_response(html), etag, last_modified)
 
 
 @web.route("/ui/prefetch/<symbol>", methods=["POST"])
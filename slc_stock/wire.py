@@ -0,0 +1,212 @@
+"""Binary encodings for columnar API responses.
+
+Bulk endpoints return JSON by default, and negotiate on ``Accept``:
+
+- ``application/msgpack`` (also ``application/x-msgpack``): a map holding
+  the response metadata and ``columns``, where each column is a typed
+  array ``{"dtype": "<f8", "data": <bin>}``, readable with
+  ``numpy.frombuffer(col["data"], col["dtype"])``.
+- ``application/vnd.apache.arrow.stream``: one Arrow IPC record batch, with
+  the metadata on the schema. Needs the optional ``pyarrow`` package.
+
+Column types follow the columnar backup format: ``date`` is int32 days
+since 1970-01-01, ``fetched_at`` int64 microseconds since 1970-01-01 UTC,
+prices float64 (NaN = null), ``volume`` int64 (INT64_MIN = null) and
+``adjusted`` uint8. The column arrays are written out as-is, without
+per-value encoding.
+"""
+
+import json
+import math
+import struct
+from array import array
+from typing import Optional
+
+from slc_stock.backup import _NULL_INT, _little_endian
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: pip install pyarrow
+    pa = None
+
+MIME_JSON = "application/json"
+MIME_MSGPACK = "application/msgpack"
+MIME_ARROW = "application/vnd.apache.arrow.stream"
+
+# Other names clients send for the same encodings.
+_ALIASES = {
+    "application/x-msgpack": MIME_MSGPACK,
+    "application/vnd.msgpack": MIME_MSGPACK,
+}
+
+
+def _price(v):
+    return math.nan if v is None else v
+
+
+def _volume(v):
+    return _NULL_INT if v is None else round(v)
+
+
+# Field -> (array typecode, dtype, per-value preparation or None).
+_COLUMN_TYPES = {
+    "date": ("i", "<i4", None),
+    "open": ("d", "<f8", _price),
+    "high": ("d", "<f8", _price),
+    "low": ("d", "<f8", _price),
+    "close": ("d", "<f8", _price),
+    "volume": ("q", "<i8", _volume),
+    "adjusted": ("B", "|u1", None),
+    "fetched_at": ("q", "<i8", None),
+}
+
+
+def media_types() -> list[str]:
+    """Return the response types this install can produce, JSON first."""
+    types = [MIME_JSON, MIME_MSGPACK, *_ALIASES]
+    if pa is not None:
+        types.append(MIME_ARROW)
+    return types
+
+
+def negotiate(accept) -> str:
+    """Pick the response type for a werkzeug ``MIMEAccept``.
+
+    Anything that doesn't name a type on offer gets JSON, as it always has.
+    Asking for Arrow when pyarrow isn't installed raises ValueError.
+    """
+    match = accept.best_match(media_types()) if accept else None
+    if match is None:
+        if pa is None and accept.quality(MIME_ARROW) and not accept.quality(MIME_JSON):
+            raise ValueError(
+                f"{MIME_ARROW} needs pyarrow, which is not installed. "
+                f"Available: {media_types()}"
+            )
+        return MIME_JSON
+    return _ALIASES.get(match, match)
+
+
+def typed_columns(columns: dict[str, list]) -> dict[str, array]:
+    """Pack typed column lists (see ``get_history_columns(typed=True)``)."""
+    packed = {}
+    for name, values in columns.items():
+        typecode, _, prepare = _COLUMN_TYPES[name]
+        # Prices only need touching when one is missing; volume may be a float.
+        if prepare is _volume or (prepare and None in values):
+            values = [prepare(v) for v in values]
+        packed[name] = _little_endian(array(typecode, values))
+    return packed
+
+
+def encode(mimetype: str, meta: dict, columns: dict[str, array]) -> bytes:
+    if mimetype == MIME_MSGPACK:
+        return encode_msgpack(meta, columns)
+    if mimetype == MIME_ARROW:
+        return encode_arrow(meta, columns)
+    raise ValueError(f"Cannot encode '{mimetype}'. Available: {media_types()[1:]}")
+
+
+# ----------------------------------------------------------------------
+# MessagePack
+# ----------------------------------------------------------------------
+
+def _pack_length(out: list, n: int, fix: Optional[int], fix_max: int, codes: bytes):
+    """Append a msgpack length header: fix form, then 8/16/32-bit forms."""
+    if fix is not None and n <= fix_max:
+        out.append(bytes((fix | n,)))
+    elif codes[0] and n < 0x100:
+        out.append(struct.pack(">BB", codes[0], n))
+    elif n < 0x10000:
+        out.append(struct.pack(">BH", codes[1], n))
+    else:
+        out.append(struct.pack(">BI", codes[2], n))
+
+
+def _pack(out: list, obj):
+    if obj is None:
+        out.append(b"\xc0")
+    elif obj is True:
+        out.append(b"\xc3")
+    elif obj is False:
+        out.append(b"\xc2")
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80 or -0x20 <= obj < 0:
+            out.append(struct.pack(">b", obj))
+        else:
+            out.append(struct.pack(">Bq", 0xD3, obj))
+    elif isinstance(obj, float):
+        out.append(struct.pack(">Bd", 0xCB, obj))
+    elif isinstance(obj, str):
+        raw = obj.encode("utf-8")
+        _pack_length(out, len(raw), 0xA0, 31, b"\xd9\xda\xdb")
+        out.append(raw)
+    elif isinstance(obj, (bytes, array)):
+        view = memoryview(obj).cast("B")
+        _pack_length(out, view.nbytes, None, 0, b"\xc4\xc5\xc6")
+        out.append(view)
+    elif isinstance(obj, (list, tuple)):
+        _pack_length(out, len(obj), 0x90, 15, b"\x00\xdc\xdd")
+        for item in obj:
+            _pack(out, item)
+    elif isinstance(obj, dict):
+        _pack_length(out, len(obj), 0x80, 15, b"\x00\xde\xdf")
+        for key, value in obj.items():
+            _pack(out, key)
+            _pack(out, value)
+    else:
+        raise TypeError(f"Cannot pack {type(obj).__name__} as MessagePack")
+
+
+def encode_msgpack(meta: dict, columns: dict[str, array]) -> bytes:
+    body = dict(meta)
+    body["columns"] = {
+        name: {"dtype": _COLUMN_TYPES[name][1], "data": values}
+        for name, values in columns.items()
+    }
+    out = []
+    _pack(out, body)
+    return b"".join(out)
+
+
+# ----------------------------------------------------------------------
+# Arrow IPC
+# ----------------------------------------------------------------------
+
+def _arrow_type(name: str):
+    if name == "date":
+        return pa.date32()
+    if name == "fetched_at":
+        return pa.timestamp("us", tz="UTC")
+    return {"d": pa.float64(), "q": pa.int64()}[_COLUMN_TYPES[name][0]]
+
+
+def _arrow_array(name: str, values: array):
+    if name == "adjusted":
+        return pa.array(values.tolist(), type=pa.bool_())
+    if name == "volume" and _NULL_INT in values:
+        return pa.array(
+            [None if v == _NULL_INT else v for v in values], type=pa.int64()
+        )
+    # Wraps the array's buffer; nothing is copied.
+    return pa.Array.from_buffers(
+        _arrow_type(name), len(values), [None, pa.py_buffer(values)]
+    )
+
+
+def encode_arrow(meta: dict, columns: dict[str, array]) -> bytes:
+    if pa is None:
+        raise RuntimeError("Arrow responses need pyarrow: pip install pyarrow")
+    batch = pa.RecordBatch.from_arrays(
+        [_arrow_array(name, values) for name, values in columns.items()],
+        names=list(columns),
+    )
+    schema = batch.schema.with_metadata(
+        {
+            key: value if isinstance(value, str) else json.dumps(value)
+            for key, value in meta.items()
+        }
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch.replace_schema_metadata(schema.metadata))
+    return sink.getvalue().to_pybytes()
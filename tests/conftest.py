@@ -1,11 +1,19 @@
+import atexit
 import os
+import shutil
+import tempfile
+import threading
 from datetime import date
 from typing import Optional
 from unittest.mock import patch
 
 import pytest
 
-os.environ["DATABASE_URL"] = "sqlite://"
+# A file-backed database (rather than sqlite://) so background prefetch
+# threads get their own connections, as they do in production.
+_DB_DIR = tempfile.mkdtemp(prefix="slc-stock-test-")
+atexit.register(shutil.rmtree, _DB_DIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/quotes.db"
 
 from slc_stock.providers import QuoteData, StockProvider, _registry, register  # noqa: E402
 
@@ -70,14 +78,21 @@ class MockProvider(StockProvider):
         return results
 
 
+def _join_background_prefetch():
+    for thread in threading.enumerate():
+        if thread.name.startswith("prefetch-"):
+            thread.join(timeout=10)
+
+
 @pytest.fixture(autouse=True)
 def mock_provider():
     """Replace all registered providers with MockProvider and reset DB for every test."""
-    from slc_stock.db import engine
+    from slc_stock.db import engine, init_db
     from slc_stock.models import Base
 
+    _join_background_prefetch()
     Base.metadata.drop_all(engine)
-    Base.metadata.create_all(engine)
+    init_db()
 
     original = dict(_registry)
     _registry.clear()
@@ -86,6 +101,7 @@ def mock_provider():
     with patch("slc_stock.config.DEFAULT_PROVIDER", "mock"):
         with patch("slc_stock.service.DEFAULT_PROVIDER", "mock"):
             yield
+            _join_background_prefetch()
 
     _registry.clear()
     _registry.update(original)
@@ -1,3 +1,9 @@
+import json
+from datetime import date
+
+import pytest
+
+
 class TestHealthEndpoint:
     def test_health(self, client):
         resp = client.get("/api/v1/health")
@@ -95,6 +101,293 @@ class TestInfoEndpoint:
         assert data["total_quotes"] >= 1
 
 
+class TestConditionalGet:
+    @staticmethod
+    def _write(close: float, fetched_at=None):
+        from datetime import UTC, date, datetime
+
+        from slc_stock.db import get_session
+        from slc_stock.service import _upsert_quotes
+
+        with get_session() as session:
+            _upsert_quotes(session, [{
+                "symbol": "CSCO", "provider": "mock", "date": date(2026, 2, 13),
+                "open": close, "high": close, "low": close, "close": close,
+                "volume": 100.0, "adjusted": True,
+                "fetched_at": fetched_at or datetime.now(UTC),
+            }])
+            session.commit()
+
+    def test_history_not_modified(self, client):
+        url = "/api/v1/stock/history/CSCO?years=1&provider=mock"
+        self._write(1.0)
+        first = client.get(url)
+        etag = first.headers["ETag"]
+        again = client.get(url, headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.data == b""
+        assert again.headers["ETag"] == etag
+
+        self._write(2.0)
+        changed = client.get(url, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+
+    def test_history_etag_depends_on_representation(self, client):
+        self._write(1.0)
+        url = "/api/v1/stock/history/CSCO?years=1&provider=mock"
+        as_json = client.get(url).headers["ETag"]
+        as_msgpack = client.get(url, headers={"Accept": "application/msgpack"}).headers["ETag"]
+        columnar = client.get(url + "&format=columnar").headers["ETag"]
+        assert len({as_json, as_msgpack, columnar}) == 3
+
+    def test_info_if_modified_since(self, client):
+        self._write(1.0)
+        first = client.get("/api/v1/stock/info/CSCO")
+        assert first.headers["Last-Modified"]
+        again = client.get(
+            "/api/v1/stock/info/CSCO",
+            headers={"If-Modified-Since": first.headers["Last-Modified"]},
+        )
+        assert again.status_code == 304
+
+    def test_loaded_correction_is_modified(self, client):
+        """A load carrying an old fetched_at still moves Last-Modified."""
+        from datetime import UTC, datetime
+
+        fetched = datetime(2026, 2, 13, 22, tzinfo=UTC)
+        self._write(1.0, fetched)
+        self._write(2.0, fetched)
+        resp = client.get(
+            "/api/v1/stock/info/CSCO",
+            headers={"If-Modified-Since": "Sun, 01 Mar 2026 00:00:00 GMT"},
+        )
+        assert resp.status_code == 200
+
+    def test_inventory_not_modified(self, client):
+        etag = client.get("/api/v1/stock/info").headers["ETag"]
+        resp = client.get("/api/v1/stock/info", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
+
+class TestBatchQuotesEndpoint:
+    def test_batch(self, client):
+        resp = client.post("/api/v1/stock/quotes", json={"items": [
+            {"symbol": "CSCO", "date": "2026-02-13"},
+            {"symbol": "CSCO", "date": "not-a-date"},
+            {"symbol": "<script>", "date": "2026-02-13"},
+            {"symbol": "FAKESYMBOL", "date": "2026-02-13"},
+        ]})
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["count"] == 4
+        assert [r["status"] for r in data["results"]] == ["ok", "invalid", "invalid", "invalid_symbol"]
+        assert data["results"][0]["quote"]["close"] == 103.0
+
+    def test_bad_body(self, client):
+        assert client.post("/api/v1/stock/quotes", json=[1, 2]).status_code == 400
+        assert client.post("/api/v1/stock/quotes", data="nope").status_code == 400
+
+    def test_too_many_items(self, client):
+        items = [{"symbol": "CSCO", "date": "2026-02-13"}] * 1001
+        resp = client.post("/api/v1/stock/quotes", json={"items": items})
+        assert resp.status_code == 400
+
+    def test_unknown_provider(self, client):
+        resp = client.post("/api/v1/stock/quotes", json={
+            "provider": "nope", "items": [{"symbol": "CSCO", "date": "2026-02-13"}],
+        })
+        assert resp.status_code == 400
+
+
+class TestMultiHistoryEndpoint:
+    @pytest.fixture
+    def stored(self, client):
+        from slc_stock.app import _get_svc
+
+        for symbol in ("CSCO", "AAPL"):
+            _get_svc().prefetch(symbol, date(2026, 2, 9), date(2026, 2, 13), provider_name="mock")
+
+    def test_get_streams_groups(self, client, stored):
+        resp = client.get(
+            "/api/v1/stock/history?symbols=CSCO,AAPL,IBIT&start=2026-02-09&end=2026-02-13&provider=mock"
+        )
+        assert resp.status_code == 200
+        assert resp.is_streamed
+        data = json.loads(resp.get_data())
+        assert list(data["symbols"]) == ["AAPL", "CSCO", "IBIT"]
+        assert len(data["symbols"]["CSCO"]) == 5
+        assert data["symbols"]["IBIT"] == []
+        assert data["provider"] == "mock"
+
+    def test_post_aligned(self, client, stored):
+        resp = client.post("/api/v1/stock/history", json={
+            "symbols": ["CSCO", "AAPL"], "start": "2026-02-09", "end": "2026-02-13",
+            "provider": "mock", "align": True,
+        })
+        data = resp.get_json()
+        assert data["symbols"] == ["CSCO", "AAPL"]
+        assert data["field"] == "close"
+        assert len(data["dates"]) == len(data["values"]) == 5
+
+    def test_repeated_symbols_params(self, client, stored):
+        resp = client.get(
+            "/api/v1/stock/history?symbols=CSCO&symbols=AAPL,IBIT&start=2026-02-09&end=2026-02-13"
+        )
+        assert list(json.loads(resp.get_data())["symbols"]) == ["AAPL", "CSCO", "IBIT"]
+
+    def test_unknown_provider(self, client):
+        resp = client.get("/api/v1/stock/history?symbols=CSCO&start=2026-02-09&provider=nope")
+        assert resp.status_code == 400
+        assert "nope" in resp.get_json()["error"]
+
+    def test_msgpack(self, client, stored):
+        import struct
+
+        resp = client.get(
+            "/api/v1/stock/history?symbols=CSCO,AAPL,IBIT&start=2026-02-09&end=2026-02-13&fields=date,close",
+            headers={"Accept": "application/msgpack"},
+        )
+        assert resp.status_code == 200
+        assert resp.mimetype == "application/msgpack"
+        assert "Accept" in resp.headers["Vary"]
+        assert b"\xa6counts\x93\x05\x05\x00" in resp.data
+        assert b"\xa5close\x82\xa5dtype\xa3<f8\xa4data\xc4\x50" in resp.data
+        assert struct.pack("<d", 103.0) * 10 in resp.data
+
+    def test_aligned_is_json_only(self, client, stored):
+        resp = client.get(
+            "/api/v1/stock/history?symbols=CSCO&start=2026-02-09&align=true",
+            headers={"Accept": "application/msgpack"},
+        )
+        assert resp.status_code == 406
+
+    @pytest.mark.parametrize("query", [
+        "",
+        "symbols=CSCO",
+        "symbols=CSCO&start=2026-02-13&end=2026-02-09",
+        "symbols=<x>&start=2026-02-09",
+        "symbols=CSCO&start=2026-02-09&fields=bogus",
+    ])
+    def test_bad_requests(self, client, query):
+        assert client.get(f"/api/v1/stock/history?{query}").status_code == 400
+
+
+class TestChangesEndpoint:
+    def test_changes(self, client):
+        from slc_stock.service import QuoteService
+
+        QuoteService().prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 13), provider_name="mock")
+        data = client.get("/api/v1/stock/changes?symbol=CSCO&fields=date,close").get_json()
+        assert data["since"] == 0
+        assert data["count"] == len(data["quotes"]) > 0
+        assert set(data["quotes"][0]) == {"date", "close", "seq"}
+        again = client.get(f"/api/v1/stock/changes?symbol=CSCO&since={data['until']}").get_json()
+        assert again["count"] == 0
+        assert again["until"] == data["until"]
+
+    @pytest.mark.parametrize("query", [
+        "since=-1", "limit=0", "limit=100000", "symbol=$$$", "fields=bogus",
+    ])
+    def test_bad_requests(self, client, query):
+        assert client.get(f"/api/v1/stock/changes?{query}").status_code == 400
+
+
+class TestCacheControl:
+    def test_old_quote_is_immutable(self, client):
+        resp = client.get("/api/v1/stock/quote/CSCO/2026-02-13")
+        assert resp.cache_control.immutable
+        assert resp.cache_control.public
+        assert resp.cache_control.max_age == 365 * 86400
+
+    def test_recent_quote_is_short_lived(self, client):
+        from datetime import date
+        from unittest.mock import patch
+
+        with patch("slc_stock.app.date") as fake_date:
+            fake_date.today.return_value = date(2026, 2, 16)
+            fake_date.fromisoformat = date.fromisoformat
+            resp = client.get("/api/v1/stock/quote/CSCO/2026-02-13")
+        assert not resp.cache_control.immutable
+        assert resp.cache_control.max_age == 60
+        assert resp.cache_control.stale_while_revalidate == 300
+
+    def test_fallback_across_a_holiday_is_immutable(self, client):
+        resp = client.get("/api/v1/stock/quote/CSCO/2026-02-16")  # Presidents' Day
+        assert resp.get_json()["date"] == "2026-02-13"
+        assert resp.cache_control.immutable
+
+    def test_fallback_across_a_session_is_short_lived(self, client):
+        from unittest.mock import patch
+
+        from slc_stock.service import QuoteService
+        from tests.conftest import MockProvider
+
+        QuoteService().prefetch("CSCO", date(2026, 2, 12), date(2026, 2, 12), provider_name="mock")
+        with patch.object(QuoteService, "_maybe_background_prefetch"), \
+                patch.object(MockProvider, "get_quote", return_value=None), \
+                patch.object(MockProvider, "get_history", return_value=[]):
+            resp = client.get("/api/v1/stock/quote/CSCO/2026-02-13")
+        assert resp.get_json()["date"] == "2026-02-12"
+        assert not resp.cache_control.immutable
+        assert resp.cache_control.max_age == 60
+
+    def test_history_is_short_lived(self, client):
+        resp = client.get("/api/v1/stock/history/CSCO?years=1")
+        assert resp.cache_control.max_age == 60
+        assert not resp.cache_control.immutable
+
+    def test_complete_old_history_is_immutable(self, client):
+        from slc_stock.service import QuoteService
+
+        QuoteService().prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 13), provider_name="mock")
+        resp = client.get("/api/v1/stock/history/CSCO?start=2026-02-09&end=2026-02-13")
+        assert resp.status_code == 200
+        assert resp.cache_control.immutable
+
+    def test_history_with_negative_gap_is_short_lived(self, client):
+        from unittest.mock import patch
+
+        from slc_stock.service import QuoteService
+        from tests.conftest import MockProvider
+
+        original = MockProvider.get_history
+
+        def without_11th(self, symbol, start, end):
+            return [q for q in original(self, symbol, start, end) if q.date != date(2026, 2, 11)]
+
+        with patch.object(MockProvider, "get_history", without_11th):
+            QuoteService().prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 13), provider_name="mock")
+            resp = client.get("/api/v1/stock/history/CSCO?start=2026-02-09&end=2026-02-13")
+        assert resp.status_code == 200
+        assert "2026-02-11" not in [q["date"] for q in resp.get_json()["quotes"]]
+        assert not resp.cache_control.immutable
+        assert resp.cache_control.max_age == 60
+
+    def test_old_history_revalidation_skips_coverage(self, client):
+        from unittest.mock import patch
+
+        from slc_stock.service import QuoteService
+
+        url = "/api/v1/stock/history/CSCO?start=2026-02-09&end=2026-02-13"
+        QuoteService().prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 13), provider_name="mock")
+        etag = client.get(url).headers["ETag"]
+        with patch.object(QuoteService, "covers", side_effect=AssertionError):
+            resp = client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert "Cache-Control" not in resp.headers
+
+    def test_incomplete_old_history_is_short_lived(self, client):
+        resp = client.get("/api/v1/stock/history/CSCO?start=2026-02-09&end=2026-02-13")
+        assert not resp.cache_control.immutable
+        assert resp.cache_control.max_age == 60
+
+    def test_errors_are_not_cached(self, client):
+        resp = client.get("/api/v1/stock/quote/ZZZZ/2026-02-13")
+        assert resp.status_code == 400
+        assert "Cache-Control" not in resp.headers
+
+
 class TestHistoryEndpoint:
     def test_history(self, client):
         resp = client.get("/api/v1/stock/history/CSCO?years=1")
@@ -103,6 +396,97 @@ class TestHistoryEndpoint:
         assert data["symbol"] == "CSCO"
         assert "quotes" in data
 
+    def test_history_fields(self, client):
+        client.get("/api/v1/stock/quote/CSCO/2026-02-13")
+        resp = client.get("/api/v1/stock/history/CSCO?years=1&fields=date,close")
+        assert resp.status_code == 200
+        quotes = resp.get_json()["quotes"]
+        assert all(set(q) == {"date", "close"} for q in quotes)
+        assert "2026-02-13" in [q["date"] for q in quotes]
+
+    def test_history_unknown_field(self, client):
+        resp = client.get("/api/v1/stock/history/CSCO?fields=date,bogus")
+        assert resp.status_code == 400
+        assert "bogus" in resp.get_json()["error"]
+
+    def test_history_columnar(self, client):
+        client.get("/api/v1/stock/quote/CSCO/2026-02-13")
+        resp = client.get("/api/v1/stock/history/CSCO?years=1&format=columnar&fields=date,close")
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["symbol"] == "CSCO"
+        assert data["fields"] == ["date", "close"]
+        assert "2026-02-13" in data["columns"]["date"]
+        assert len(data["columns"]["close"]) == data["count"]
+
+    def test_history_msgpack(self, client):
+        import struct
+
+        close = client.get("/api/v1/stock/quote/CSCO/2026-02-13").get_json()["close"]
+        resp = client.get(
+            "/api/v1/stock/history/CSCO?years=1&fields=date,close",
+            headers={"Accept": "application/msgpack"},
+        )
+        assert resp.status_code == 200
+        assert resp.mimetype == "application/msgpack"
+        assert "Accept" in resp.headers["Vary"]
+        assert b"\xa5close\x82\xa5dtype\xa3<f8\xa4data\xc4" in resp.data
+        assert struct.pack("<d", close) in resp.data
+
+    def test_history_unknown_format(self, client):
+        resp = client.get("/api/v1/stock/history/CSCO?format=xml")
+        assert resp.status_code == 400
+
+    def test_history_date_range(self, client):
+        from slc_stock.service import QuoteService
+
+        QuoteService().prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
+        resp = client.get("/api/v1/stock/history/CSCO?start=2026-02-10&end=2026-02-12")
+        data = resp.get_json()
+        assert (data["start"], data["end"]) == ("2026-02-10", "2026-02-12")
+        assert [q["date"] for q in data["quotes"]] == ["2026-02-10", "2026-02-11", "2026-02-12"]
+        assert data["next_cursor"] is None
+
+    def test_history_pages_with_cursor(self, client):
+        from slc_stock.service import QuoteService
+
+        QuoteService().prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
+        url = "/api/v1/stock/history/CSCO?start=2026-02-09&end=2026-02-20&limit=4&fields=close"
+        dates, cursor = [], ""
+        while True:
+            data = client.get(f"{url}&cursor={cursor}" if cursor else url).get_json()
+            assert data["count"] <= 4
+            dates += [q["date"] for q in data["quotes"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        full = client.get(url.replace("&limit=4&fields=close", "")).get_json()["quotes"]
+        assert dates == [q["date"] for q in full]
+        assert len(dates) > 4
+
+    def test_history_columnar_cursor(self, client):
+        from slc_stock.service import QuoteService
+
+        QuoteService().prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 13), provider_name="mock")
+        resp = client.get(
+            "/api/v1/stock/history/CSCO?start=2026-02-09&end=2026-02-13"
+            "&limit=2&cursor=2026-02-09&format=columnar&fields=close"
+        )
+        data = resp.get_json()
+        assert data["columns"]["date"] == ["2026-02-10", "2026-02-11"]
+        assert data["next_cursor"] == "2026-02-11"
+
+    @pytest.mark.parametrize("query", [
+        "start=2026-02-30",
+        "start=2026-02-13&end=2026-02-09",
+        "cursor=yesterday",
+        "limit=0",
+        "limit=100000",
+        "start=2020-01-01&end=2020-02-01&provider=bogus",
+    ])
+    def test_history_bad_range(self, client, query):
+        assert client.get(f"/api/v1/stock/history/CSCO?{query}").status_code == 400
+
     def test_history_years_too_large(self, client):
         """Issue 4: years=9999 should return 400, not crash with 500."""
         resp = client.get("/api/v1/stock/history/CSCO?years=9999")
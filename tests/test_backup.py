@@ -0,0 +1,130 @@
+import io
+import json
+
+import pytest
+
+from slc_stock.backup import (
+    FORMAT_COLUMNAR,
+    FORMAT_JSON,
+    FORMAT_NDJSON,
+    BackupFormatError,
+    Checkpoint,
+    ColumnarReader,
+    RecordReader,
+    open_reader,
+    write_columnar,
+)
+
+RECORDS = [
+    {"symbol": "CSCO", "date": f"2026-02-{d:02d}", "provider": "mock", "close": 100.0 + d}
+    for d in range(1, 21)
+]
+
+
+class TestRecordReader:
+    def test_json_array(self):
+        data = json.dumps(RECORDS, indent=2).encode()
+        reader = RecordReader(io.BytesIO(data), chunk_size=16)
+        assert list(reader) == RECORDS
+        assert reader.format == FORMAT_JSON
+        assert reader.count == len(RECORDS)
+
+    def test_ndjson(self):
+        data = "".join(json.dumps(r) + "\n" for r in RECORDS).encode()
+        reader = RecordReader(io.BytesIO(data), chunk_size=16)
+        assert list(reader) == RECORDS
+        assert reader.format == FORMAT_NDJSON
+
+    def test_empty_array(self):
+        assert list(RecordReader(io.BytesIO(b" [ ] "))) == []
+
+    @pytest.mark.parametrize("fmt", [FORMAT_JSON, FORMAT_NDJSON])
+    def test_resume_from_offset(self, fmt):
+        if fmt == FORMAT_JSON:
+            data = json.dumps(RECORDS).encode()
+        else:
+            data = "".join(json.dumps(r) + "\n" for r in RECORDS).encode()
+        reader = RecordReader(io.BytesIO(data), chunk_size=32)
+        for _ in range(7):
+            next(reader)
+        resumed = RecordReader(io.BytesIO(data), fmt=reader.format, start_offset=reader.offset)
+        assert list(resumed) == RECORDS[7:]
+
+    def test_truncated_array(self):
+        data = json.dumps(RECORDS).encode()[:-40]
+        with pytest.raises(BackupFormatError):
+            list(RecordReader(io.BytesIO(data)))
+
+    def test_non_array_json(self):
+        with pytest.raises(BackupFormatError):
+            list(RecordReader(io.BytesIO(b'[{"a": 1}'), fmt=FORMAT_JSON))
+
+
+def _full_records():
+    return [
+        {
+            "symbol": sym, "date": f"2026-02-{d:02d}", "open": 100.5, "high": None,
+            "low": 99.0, "close": 100.0 + d, "volume": 1000 * d, "adjusted": d % 2 == 0,
+            "provider": "mock", "fetched_at": "2026-02-20T12:34:56.789012",
+        }
+        for sym in ("AAPL", "CSCO")
+        for d in range(1, 21)
+    ]
+
+
+class TestColumnar:
+    def test_round_trip(self):
+        records = _full_records()
+        buf = io.BytesIO()
+        assert write_columnar(records, buf) == len(records)
+        assert len(buf.getvalue()) < len(json.dumps(records)) / 4
+        buf.seek(0)
+        reader = open_reader(buf)
+        assert isinstance(reader, ColumnarReader)
+        assert reader.format == FORMAT_COLUMNAR
+        assert list(reader) == records
+
+    def test_resume_from_block_boundary(self, monkeypatch):
+        monkeypatch.setattr("slc_stock.backup._BLOCK_ROWS", 8)
+        records = _full_records()
+        buf = io.BytesIO()
+        write_columnar(records, buf)
+        buf.seek(0)
+        reader = open_reader(buf)
+        for _ in range(12):
+            next(reader)
+        # Mid-block: the offset points at the start of the second block.
+        assert reader.count_at_offset == 8
+        resumed = open_reader(io.BytesIO(buf.getvalue()), FORMAT_COLUMNAR, reader.offset)
+        assert list(resumed) == records[8:]
+
+    def test_corrupt_block_detected(self):
+        buf = io.BytesIO()
+        write_columnar(_full_records(), buf)
+        data = bytearray(buf.getvalue())
+        data[40] ^= 0xFF
+        with pytest.raises(BackupFormatError):
+            list(open_reader(io.BytesIO(bytes(data))))
+
+    def test_future_version_rejected(self):
+        buf = io.BytesIO()
+        write_columnar(_full_records(), buf)
+        data = bytearray(buf.getvalue())
+        data[8] = 99
+        with pytest.raises(BackupFormatError):
+            open_reader(io.BytesIO(bytes(data)))
+
+
+class TestCheckpoint:
+    def test_round_trip_and_stale_file(self, tmp_path):
+        path = tmp_path / "backup.json"
+        path.write_text("[]")
+        cp = Checkpoint(str(path))
+        assert cp.read() is None
+        cp.write(FORMAT_JSON, 10, 3)
+        assert cp.read()["offset"] == 10
+
+        path.write_text("[ ]")  # different size: a different file
+        assert cp.read() is None
+        cp.clear()
+        cp.clear()
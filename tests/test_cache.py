@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+from slc_stock.cache import LRUCache
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        cache = LRUCache(maxsize=10, ttl=5)
+        with patch("slc_stock.cache.time.monotonic", return_value=100.0):
+            cache.put("a", 1)
+        with patch("slc_stock.cache.time.monotonic", return_value=104.0):
+            assert cache.get("a") == 1
+        with patch("slc_stock.cache.time.monotonic", return_value=106.0):
+            assert cache.get("a") is None
+
+    def test_invalidate_predicate(self):
+        cache = LRUCache(maxsize=10)
+        cache.put(("CSCO", 1), "x")
+        cache.put(("AAPL", 1), "y")
+        assert cache.invalidate(lambda k: k[0] == "CSCO") == 1
+        assert cache.get(("CSCO", 1)) is None
+        assert cache.get(("AAPL", 1)) == "y"
+
+    def test_weighted_by_value(self):
+        cache = LRUCache(maxsize=10, weigh=len)
+        cache.put("a", b"x" * 4)
+        cache.put("b", b"x" * 4)
+        cache.put("c", b"x" * 4)
+        assert cache.get("a") is None
+        assert cache.stats()["weight"] == 8
+        cache.put("huge", b"x" * 11)
+        assert cache.get("huge") is None
+        assert cache.get("b") is not None
+
+    def test_zero_size_disables(self):
+        cache = LRUCache(maxsize=0)
+        cache.put("a", 1)
+        assert cache.get("a") is None
+        assert cache.stats()["misses"] == 1
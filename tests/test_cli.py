@@ -46,3 +46,146 @@ class TestCompareCommand:
         assert result.exit_code != 0
         assert "invalid date" in result.output.lower()
         assert "Traceback" not in result.output
+
+
+class TestStreamingLoad:
+    def _write_ndjson(self, path, days):
+        with open(path, "w") as f:
+            for d in days:
+                f.write(json.dumps({
+                    "symbol": "CSCO", "date": f"2026-02-{d:02d}", "provider": "mock",
+                    "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10.0,
+                }) + "\n")
+
+    def test_load_ndjson(self, tmp_path):
+        path = tmp_path / "backup.ndjson"
+        self._write_ndjson(path, range(1, 11))
+        result = CliRunner().invoke(cli, ["load", str(path), "--batch-size", "3"])
+        assert result.exit_code == 0, result.output
+        assert "Loaded 10 quotes" in result.output
+        assert not os.path.exists(f"{path}.checkpoint")
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        from slc_stock.backup import Checkpoint, RecordReader
+
+        path = tmp_path / "backup.ndjson"
+        self._write_ndjson(path, range(1, 11))
+        with open(path, "rb") as f:
+            reader = RecordReader(f)
+            for _ in range(4):
+                next(reader)
+        Checkpoint(str(path)).write(reader.format, reader.offset, 4)
+
+        result = CliRunner().invoke(cli, ["load", str(path)])
+        assert result.exit_code == 0, result.output
+        assert "Resuming after 4 records" in result.output
+        assert "Loaded 6 quotes" in result.output
+
+    def test_resume_columnar_counts_each_record_once(self, tmp_path, monkeypatch):
+        from unittest.mock import patch
+
+        from slc_stock.backup import Checkpoint, write_columnar
+
+        monkeypatch.setattr("slc_stock.backup._BLOCK_ROWS", 8)
+        path = tmp_path / "backup.slcq"
+        with open(path, "wb") as f:
+            write_columnar([
+                {
+                    "symbol": sym, "date": f"2026-02-{d:02d}", "provider": "mock",
+                    "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10,
+                    "adjusted": True, "fetched_at": "2026-02-20T12:00:00",
+                }
+                for sym in ("AAPL", "CSCO") for d in range(1, 21)
+            ], f)
+
+        original = Checkpoint.write
+
+        def write_then_stop(self, *args):
+            original(self, *args)
+            raise KeyboardInterrupt
+
+        # Stop after the first commit, 12 records in: mid-way through block 2.
+        with patch.object(Checkpoint, "write", write_then_stop):
+            CliRunner().invoke(cli, ["load", str(path), "--batch-size", "12"])
+        assert Checkpoint(str(path)).read()["records"] == 8
+
+        result = CliRunner().invoke(cli, ["load", str(path)])
+        assert result.exit_code == 0, result.output
+        assert "Resuming after 8 records" in result.output
+        assert "Loaded 32 quotes" in result.output
+
+    def test_malformed_file_reports_error(self, tmp_path):
+        path = tmp_path / "backup.json"
+        path.write_text('[{"symbol": "CSCO"')
+        result = CliRunner().invoke(cli, ["load", str(path)])
+        assert result.exit_code != 0
+        assert "Traceback" not in result.output
+
+
+class TestStreamingDump:
+    def _seed(self):
+        from datetime import date
+
+        from slc_stock.service import QuoteService
+
+        svc = QuoteService()
+        svc.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
+        svc.prefetch("AAPL", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
+
+    def test_ndjson_with_filters(self, tmp_path):
+        self._seed()
+        path = tmp_path / "out.ndjson"
+        result = CliRunner().invoke(cli, [
+            "dump", "-o", str(path), "--format", "ndjson",
+            "--symbol", "csco", "--start", "2026-02-12", "--end", "2026-02-17",
+        ])
+        assert result.exit_code == 0, result.output
+        lines = path.read_text().splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [r["date"] for r in records] == ["2026-02-12", "2026-02-13", "2026-02-17"]
+        assert {r["symbol"] for r in records} == {"CSCO"}
+
+    def test_json_round_trip(self, tmp_path):
+        self._seed()
+        path = tmp_path / "out.json"
+        result = CliRunner().invoke(cli, ["dump", "-o", str(path)])
+        assert result.exit_code == 0
+        data = json.loads(path.read_text())
+        assert len(data) == 18
+        assert set(data[0]) == {
+            "symbol", "date", "open", "high", "low", "close", "volume",
+            "adjusted", "provider", "fetched_at",
+        }
+
+    def test_columnar_round_trip(self, tmp_path):
+        self._seed()
+        path = tmp_path / "out.slcq"
+        result = CliRunner().invoke(cli, ["dump", "-o", str(path), "--format", "columnar"])
+        assert result.exit_code == 0
+        assert "Dumped 18 quotes" in result.output
+        result = CliRunner().invoke(cli, ["load", str(path)])
+        assert result.exit_code == 0, result.output
+        assert "Loaded 18 quotes" in result.output
+
+
+class TestMigrateCommand:
+    def test_current(self):
+        result = CliRunner().invoke(cli, ["migrate"])
+        assert result.exit_code == 0
+        assert "Schema is current" in result.output
+
+    def test_dry_run_then_apply(self):
+        from slc_stock.db import engine
+        from slc_stock.models import SchemaVersion
+
+        with engine.begin() as conn:
+            conn.execute(SchemaVersion.__table__.delete())
+
+        result = CliRunner().invoke(cli, ["migrate", "--dry-run"])
+        assert result.exit_code == 0
+        assert "Pending 3: backfill symbol_stats" in result.output
+
+        result = CliRunner().invoke(cli, ["migrate"])
+        assert result.exit_code == 0
+        assert "Applied 3: backfill symbol_stats" in result.output
+        assert "from version 0 to 7" in result.output
@@ -0,0 +1,73 @@
+import gzip
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from flask import Flask, Response
+
+from slc_stock import compression
+
+HISTORY = "/api/v1/stock/history/CSCO?years=1&provider=mock"
+
+
+@pytest.fixture
+def stored(client):
+    from slc_stock.app import _get_svc
+
+    compression._cache.clear()
+    _get_svc().prefetch("CSCO", date(2026, 2, 1), date(2026, 12, 1), provider_name="mock")
+
+
+class TestCompressResponse:
+    def test_gzip(self, client, stored):
+        plain = client.get(HISTORY)
+        resp = client.get(HISTORY, headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in resp.headers["Vary"]
+        assert gzip.decompress(resp.data) == plain.data
+        assert int(resp.headers["Content-Length"]) == len(resp.data) < len(plain.data)
+        assert resp.headers["ETag"] == "W/" + plain.headers["ETag"]
+
+    def test_identity_without_accept_encoding(self, client, stored):
+        resp = client.get(HISTORY)
+        assert "Content-Encoding" not in resp.headers
+        assert "Accept-Encoding" in resp.headers["Vary"]
+
+    def test_small_bodies_are_left_alone(self, client):
+        resp = client.get("/api/v1/health", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in resp.headers
+
+    def test_weak_etag_revalidates(self, client, stored):
+        etag = client.get(HISTORY, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+        resp = client.get(HISTORY, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert resp.status_code == 304
+
+    def test_compressed_body_is_cached(self, client, stored):
+        with patch.object(compression, "compress", wraps=compression.compress) as spy:
+            first = client.get(HISTORY, headers={"Accept-Encoding": "gzip"})
+            second = client.get(HISTORY, headers={"Accept-Encoding": "gzip"})
+        assert spy.call_count == 1
+        assert first.data == second.data
+
+    def test_brotli_preferred(self, client, stored):
+        brotli = pytest.importorskip("brotli")
+        plain = client.get(HISTORY)
+        resp = client.get(HISTORY, headers={"Accept-Encoding": "gzip, br"})
+        assert resp.headers["Content-Encoding"] == "br"
+        assert brotli.decompress(resp.data) == plain.data
+
+
+class TestStreaming:
+    def test_streamed_body_is_compressed_incrementally(self):
+        app = Flask(__name__)
+        app.after_request(compression.compress_response)
+
+        @app.route("/stream")
+        def stream():
+            return Response((f'{{"n": {i}}}\n' for i in range(1000)), mimetype="text/plain")
+
+        resp = app.test_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in resp.headers
+        expected = "".join(f'{{"n": {i}}}\n' for i in range(1000)).encode()
+        assert gzip.decompress(resp.data) == expected
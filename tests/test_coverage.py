@@ -0,0 +1,34 @@
+from datetime import date
+
+from slc_stock.coverage import missing_ranges, span
+
+DAYS = [date(2026, 2, d) for d in (9, 10, 11, 12, 13, 17, 18, 19, 20)]
+
+
+class TestMissingRanges:
+    def test_nothing_stored(self):
+        assert missing_ranges(DAYS, set()) == [(date(2026, 2, 9), date(2026, 2, 20))]
+
+    def test_everything_stored(self):
+        assert missing_ranges(DAYS, set(DAYS)) == []
+
+    def test_separate_gaps(self):
+        present = set(DAYS[2:7])
+        assert missing_ranges(DAYS, present) == [
+            (date(2026, 2, 9), date(2026, 2, 10)),
+            (date(2026, 2, 19), date(2026, 2, 20)),
+        ]
+
+    def test_gaps_merged_across_small_islands(self):
+        present = {date(2026, 2, 11), date(2026, 2, 12)}
+        assert missing_ranges(DAYS, present, merge_within=2) == [
+            (date(2026, 2, 9), date(2026, 2, 20)),
+        ]
+        assert len(missing_ranges(DAYS, present, merge_within=1)) == 2
+
+
+class TestSpan:
+    def test_span(self):
+        ranges = [(date(2026, 2, 9), date(2026, 2, 10)), (date(2026, 2, 19), date(2026, 2, 20))]
+        assert span(ranges) == [(date(2026, 2, 9), date(2026, 2, 20))]
+        assert span([]) == []
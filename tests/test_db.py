@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from slc_stock import db, migrations
+
+
+class TestEngineProfile:
+    def test_writer_pragmas(self):
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+            assert conn.exec_driver_sql("PRAGMA query_only").scalar() == 0
+
+    def test_active_pragmas(self):
+        pragmas = db.active_pragmas()
+        assert pragmas["journal_mode"] == "wal"
+        assert pragmas["synchronous"] == "NORMAL"
+        assert pragmas["temp_store"] == "MEMORY"
+        assert pragmas["cache_size"] == -65536
+        assert pragmas["mmap_size"] == 256 * 1024 * 1024
+        assert pragmas["query_only"] is True
+
+    def test_reader_rejects_writes(self):
+        with db.read_engine.connect() as conn:
+            with pytest.raises(OperationalError, match="readonly"):
+                conn.execute(text("DELETE FROM quotes"))
+
+    def test_single_writer_connection(self):
+        assert db.engine.pool.size() == 1
+        assert db.read_engine is not db.engine
+
+    def test_invalid_choice(self):
+        with pytest.raises(ValueError, match="synchronous"):
+            db._choice("synchronous", "sometimes")
+        assert db._choice("synchronous", "normal") == "NORMAL"
+
+
+class TestReportedPragmas:
+    def test_cache_info_reports_pragmas(self, service):
+        info = service.get_cache_info()
+        assert info["sqlite_pragmas"]["journal_mode"] == "wal"
+
+
+class TestQuotesLayout:
+    def test_fresh_table_keyed_on_symbol_provider_date(self):
+        from sqlalchemy import inspect
+
+        with db.engine.connect() as conn:
+            insp = inspect(conn)
+            assert insp.get_pk_constraint("quotes")["constrained_columns"] == [
+                "symbol", "provider", "date",
+            ]
+            assert [ix["column_names"] for ix in insp.get_indexes("quotes")] == [["seq"]]
+            assert migrations.current_version(conn) == migrations.HEAD
+
+
+class TestCompactTypes:
+    def test_epoch_day_round_trip(self):
+        from datetime import date
+
+        from slc_stock.models import EpochDay
+
+        t = EpochDay()
+        assert t.process_bind_param(date(1970, 1, 2), None) == 1
+        assert t.process_bind_param(date(2026, 2, 9), None) == 20493
+        assert t.result_processor(None, None)(20493) == date(2026, 2, 9)
+        assert t.process_bind_param(None, None) is None
+        assert t.process_result_value(None, None) is None
+
+    def test_whole_number_rounds(self):
+        from slc_stock.models import WholeNumber
+
+        t = WholeNumber()
+        assert t.process_bind_param(1234.6, None) == 1235
+        assert t.process_bind_param(None, None) is None
@@ -0,0 +1,203 @@
+from datetime import UTC, date, datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from slc_stock import migrations
+from slc_stock.models import Base, SymbolStat
+
+# The quotes table as the first release created it (before ``adjusted``).
+_LEGACY_QUOTES = [
+    """CREATE TABLE quotes (
+        id INTEGER NOT NULL,
+        symbol VARCHAR NOT NULL,
+        date DATE NOT NULL,
+        open FLOAT, high FLOAT, low FLOAT, close FLOAT, volume FLOAT,
+        provider VARCHAR NOT NULL,
+        fetched_at DATETIME NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_symbol_date_provider UNIQUE (symbol, date, provider)
+    )""",
+    "CREATE INDEX ix_quotes_symbol ON quotes (symbol)",
+    "CREATE INDEX ix_quotes_date ON quotes (date)",
+    """INSERT INTO quotes (symbol, date, open, high, low, close, volume, provider, fetched_at)
+       VALUES ('CSCO', '2026-02-10', 1, 2, 0.5, 1.5, 100, 'mock', '2026-02-11 00:00:00'),
+              ('CSCO', '2026-02-09', 1, 2, 0.5, 1.4, 100, 'mock', '2026-02-11 00:00:00')""",
+]
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with eng.begin() as conn:
+        for stmt in _LEGACY_QUOTES:
+            conn.execute(text(stmt))
+    yield eng
+    eng.dispose()
+
+
+def _indexes(conn):
+    return {ix["name"]: ix["column_names"] for ix in inspect(conn).get_indexes("quotes")}
+
+
+class TestRunner:
+    def test_dry_run_changes_nothing(self, legacy_engine):
+        steps = migrations.migrate(legacy_engine, dry_run=True)
+        assert [m.version for m in steps] == [m.version for m in migrations.MIGRATIONS]
+        with legacy_engine.connect() as conn:
+            assert migrations.current_version(conn) is None
+            assert "adjusted" not in {c["name"] for c in inspect(conn).get_columns("quotes")}
+
+    def test_upgrades_legacy_database(self, legacy_engine):
+        applied = migrations.migrate(legacy_engine)
+        assert [m.version for m in applied] == [1, 2, 3, 4, 5, 6, 7]
+        with legacy_engine.connect() as conn:
+            assert migrations.current_version(conn) == migrations.HEAD
+            assert _indexes(conn) == {
+                "ix_quotes_symbol_provider_date": ["symbol", "provider", "date"],
+                "ix_quotes_seq": ["seq"],
+            }
+            adjusted = conn.execute(text("SELECT adjusted FROM quotes")).scalars().all()
+            seqs = conn.execute(text("SELECT seq FROM quotes ORDER BY date")).scalars().all()
+            counter = conn.execute(text("SELECT value FROM write_sequence")).scalar()
+            stats = conn.execute(text("SELECT symbol, provider, count FROM symbol_stats")).all()
+        assert adjusted == [1, 1]
+        assert seqs == [1, 2]
+        assert counter == 2
+        assert stats == [("CSCO", "mock", 2)]
+
+    def test_current_schema_is_a_no_op(self, legacy_engine):
+        migrations.migrate(legacy_engine)
+        assert migrations.migrate(legacy_engine) == []
+        assert migrations.migrate(legacy_engine, dry_run=True) == []
+
+    def test_fresh_database_is_stamped(self, tmp_path):
+        eng = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+        try:
+            assert migrations.migrate(eng) == []
+            with eng.connect() as conn:
+                assert migrations.current_version(conn) == migrations.HEAD
+        finally:
+            eng.dispose()
+
+    def test_failed_step_rolls_back(self, legacy_engine):
+        def broken(conn):
+            migrations.create_index(conn, "ix_quotes_close", "quotes", ("close",))
+            raise RuntimeError("boom")
+
+        steps = migrations.MIGRATIONS + [migrations.Migration(99, "broken", broken)]
+        with patch.object(migrations, "MIGRATIONS", steps):
+            with pytest.raises(RuntimeError):
+                migrations.migrate(legacy_engine)
+        with legacy_engine.connect() as conn:
+            assert migrations.current_version(conn) == migrations.HEAD
+            assert "ix_quotes_close" not in _indexes(conn)
+
+    def test_init_db_skips_migrate_when_current(self):
+        from slc_stock import db
+
+        with patch.object(migrations, "migrate") as spy:
+            db.init_db()
+        spy.assert_not_called()
+
+
+class TestQuotesKey:
+    def test_index_legacy_table(self, legacy_engine):
+        with legacy_engine.begin() as conn:
+            migrations._key_quotes(conn)
+            indexes = _indexes(conn)
+            plan = conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT date FROM quotes "
+                "WHERE symbol = 'CSCO' AND provider = 'mock' AND date >= '2026-01-01'"
+            ).all()
+        assert indexes == {"ix_quotes_symbol_provider_date": ["symbol", "provider", "date"]}
+        assert "COVERING INDEX ix_quotes_symbol_provider_date" in plan[0][-1]
+
+    def test_upsert_after_upgrade(self, legacy_engine):
+        from slc_stock.service import _upsert_quotes
+
+        migrations.migrate(legacy_engine)
+        migrations.ensure_quotes_layout(legacy_engine)
+        row = {
+            "symbol": "CSCO", "provider": "mock", "date": date(2026, 2, 10),
+            "open": 1.0, "high": 2.0, "low": 0.5, "close": 9.0, "volume": 100.0,
+            "adjusted": True, "fetched_at": datetime.now(UTC),
+        }
+        with Session(legacy_engine) as session:
+            stats = _upsert_quotes(session, [row])
+            session.commit()
+        assert (stats.inserted, stats.updated) == (0, 1)
+        with legacy_engine.connect() as conn:
+            count = conn.execute(text("SELECT count FROM symbol_stats")).scalar()
+        assert count == 2
+
+
+class TestQuotesLayout:
+    @pytest.fixture
+    def opposite_engine(self, tmp_path):
+        """A quotes table in the opposite layout to the configured one."""
+        layout = migrations.configured_quotes_layout()
+        compact = not layout["compact"]
+        eng = create_engine(f"sqlite:///{tmp_path / 'opposite.db'}")
+        Base.metadata.create_all(eng, tables=[SymbolStat.__table__])
+        day = (date(2026, 2, 9) - date(1970, 1, 1)).days if compact else "'2026-02-09'"
+        with eng.begin() as conn:
+            conn.execute(text(f"""CREATE TABLE quotes (
+                symbol VARCHAR NOT NULL,
+                date {"INTEGER" if compact else "DATE"} NOT NULL,
+                open FLOAT, high FLOAT, low FLOAT, close FLOAT,
+                volume {"INTEGER" if compact else "FLOAT"},
+                adjusted BOOLEAN NOT NULL,
+                provider VARCHAR NOT NULL,
+                fetched_at DATETIME NOT NULL,
+                seq INTEGER NOT NULL DEFAULT 0,
+                CONSTRAINT pk_quotes PRIMARY KEY (symbol, provider, date)
+            ){"" if layout["clustered"] else " WITHOUT ROWID"}"""))
+            conn.execute(text(
+                "INSERT INTO quotes VALUES "
+                f"('CSCO', {day}, 1, 2, 0.5, 1.5, 1500000, 1, 'mock', '2026-02-11 00:00:00', 1)"
+            ))
+        yield eng
+        eng.dispose()
+
+    def test_rebuild_to_configured_layout(self, opposite_engine):
+        from slc_stock.models import Quote
+
+        assert migrations.ensure_quotes_layout(opposite_engine)
+        assert not migrations.ensure_quotes_layout(opposite_engine)
+        with opposite_engine.connect() as conn:
+            assert migrations.quotes_layout(conn) == migrations.configured_quotes_layout()
+        with Session(opposite_engine) as session:
+            quote = session.query(Quote).one()
+            stat = session.query(SymbolStat).one()
+            in_range = session.query(Quote).filter(Quote.date >= date(2026, 2, 9)).count()
+        assert quote.date == date(2026, 2, 9)
+        assert quote.volume == 1500000
+        assert (stat.count, stat.earliest, stat.latest) == (1, date(2026, 2, 9), date(2026, 2, 9))
+        assert in_range == 1
+
+    def test_clustered_range_scan_uses_primary_key(self, legacy_engine):
+        migrations.migrate(legacy_engine)
+        migrations.ensure_quotes_layout(legacy_engine)
+        with legacy_engine.connect() as conn:
+            plan = conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT * FROM quotes "
+                "WHERE symbol = 'CSCO' AND provider = 'mock' AND date >= 0"
+            ).all()
+            clustered = migrations.quotes_layout(conn)["clustered"]
+        expected = "PRIMARY KEY" if clustered else "INDEX"
+        assert expected in plan[0][-1]
+
+
+class TestSymbolStatsBackfill:
+    def test_rebuild_symbol_stats(self, legacy_engine):
+        migrations.migrate(legacy_engine)
+        with legacy_engine.begin() as conn:
+            conn.execute(SymbolStat.__table__.delete())
+            migrations.rebuild_symbol_stats(conn)
+            row = conn.execute(
+                text("SELECT count, earliest, latest FROM symbol_stats")
+            ).one()
+        assert tuple(row) == (2, "2026-02-09", "2026-02-10")
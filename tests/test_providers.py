@@ -0,0 +1,29 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from slc_stock.providers.yfinance_provider import YFinanceProvider
+
+
+class TestYFinanceDescribeSymbol:
+    def _ticker(self, **kwargs):
+        return patch("slc_stock.providers.yfinance_provider.yf.Ticker", **kwargs)
+
+    def test_known_symbol(self):
+        info = {"shortName": "Cisco Systems", "exchange": "NMS", "currency": "USD"}
+        with self._ticker(return_value=MagicMock(info=info)):
+            details = YFinanceProvider().describe_symbol("CSCO")
+        assert details["name"] == "Cisco Systems"
+
+    def test_unknown_symbol(self):
+        with self._ticker(return_value=MagicMock(info={"trailingPegRatio": None})):
+            assert YFinanceProvider().describe_symbol("ZZZZ") is None
+
+    def test_transport_error_propagates(self):
+        with self._ticker(side_effect=ConnectionError("offline")):
+            with pytest.raises(ConnectionError):
+                YFinanceProvider().describe_symbol("CSCO")
+
+    def test_validate_symbol_fails_closed_on_transport_error(self):
+        with self._ticker(side_effect=ConnectionError("offline")):
+            assert YFinanceProvider().validate_symbol("CSCO") is False
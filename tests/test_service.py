@@ -1,6 +1,8 @@
-from datetime import date
+from datetime import date, datetime
+from unittest.mock import patch
 
 import pytest
+from sqlalchemy import func
 
 from slc_stock.providers import SymbolNotFoundError
 
@@ -52,6 +54,68 @@ class TestGetQuote:
         assert result["date"] == "2026-11-24"
         assert result["requested_date"] == "2026-11-27"
 
+    def test_holiday_fallback_skips_closed_days(self, service):
+        """Only trading sessions are sent to the provider during fallback."""
+        from tests.conftest import MockProvider
+
+        with patch.object(MockProvider, "get_history", autospec=True,
+                          side_effect=MockProvider.get_history) as spy:
+            result = service.get_quote("CSCO", date(2026, 2, 16))
+        assert [c.args[2:] for c in spy.call_args_list] == [(date(2026, 2, 9), date(2026, 2, 13))]
+        assert result["date"] == "2026-02-13"
+
+    def test_single_missing_session_uses_get_quote(self, service):
+        service._maybe_background_prefetch = lambda *args: None
+        service.get_quote("CSCO", date(2026, 2, 12))
+        from tests.conftest import MockProvider
+
+        with patch.object(MockProvider, "get_history") as history, \
+                patch.object(MockProvider, "get_quote", autospec=True,
+                             side_effect=MockProvider.get_quote) as quote:
+            result = service.get_quote("CSCO", date(2026, 2, 13))
+        history.assert_not_called()
+        assert [c.args[2] for c in quote.call_args_list] == [date(2026, 2, 13)]
+        assert result["date"] == "2026-02-13"
+
+    def test_fallback_cache_hit_skips_provider(self, service):
+        service.get_quote("CSCO", date(2026, 2, 13))
+        from tests.conftest import MockProvider
+
+        with patch.object(MockProvider, "get_quote") as spy:
+            result = service.get_quote("CSCO", date(2026, 2, 15))
+        assert result["date"] == "2026-02-13"
+        spy.assert_not_called()
+
+
+class TestQuoteCache:
+    def test_repeat_read_skips_database(self, service):
+        service.get_quote("CSCO", date(2026, 2, 13))
+        with patch("slc_stock.service.get_session") as spy, \
+                patch("slc_stock.service.get_read_session") as read_spy:
+            result = service.get_quote("CSCO", date(2026, 2, 13))
+        assert result["close"] == 103.0
+        spy.assert_not_called()
+        read_spy.assert_not_called()
+        assert service.get_cache_info()["quote_cache"]["hits"] == 1
+
+    def test_returned_dict_is_a_copy(self, service):
+        service.get_quote("CSCO", date(2026, 2, 13))["close"] = -1
+        assert service.get_quote("CSCO", date(2026, 2, 13))["close"] == 103.0
+
+    def test_prefetch_invalidates_fallback_results(self, service):
+        """A weekend request answered from Thursday must see Friday once stored."""
+        from tests.conftest import MockProvider
+
+        service._maybe_background_prefetch = lambda *args: None
+        service.prefetch("CSCO", date(2026, 2, 12), date(2026, 2, 12), provider_name="mock")
+        with patch.object(MockProvider, "get_quote", return_value=None):
+            assert service.get_quote("CSCO", date(2026, 2, 14))["date"] == "2026-02-12"
+        # Friday is now a remembered no-bar day, so only a full prefetch asks.
+        service.prefetch(
+            "CSCO", date(2026, 2, 13), date(2026, 2, 13), provider_name="mock", full=True
+        )
+        assert service.get_quote("CSCO", date(2026, 2, 14))["date"] == "2026-02-13"
+
 
 class TestInvalidSymbol:
     def test_invalid_symbol_raises_400(self, service):
@@ -65,6 +129,261 @@ class TestInvalidSymbol:
         assert info is None
 
 
+class TestCoalescing:
+    def test_concurrent_misses_fetch_once(self, service):
+        import threading
+        import time
+
+        from tests.conftest import MockProvider
+
+        service._maybe_background_prefetch = lambda *args: None
+        original = MockProvider.get_history
+        calls = []
+
+        def slow_get_history(self, symbol, start, end):
+            calls.append((start, end))
+            time.sleep(0.2)
+            return original(self, symbol, start, end)
+
+        results = []
+        with patch.object(MockProvider, "get_history", slow_get_history):
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(service.get_quote("CSCO", date(2026, 2, 13)))
+                )
+                for _ in range(10)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(10)
+
+        assert len(calls) == 1
+        assert len(results) == 10
+        assert all(r["date"] == "2026-02-13" for r in results)
+
+
+    def test_misses_beyond_read_pool_size(self, service):
+        """Misses waiting on the provider hold no pooled read connection."""
+        import threading
+        import time
+
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        import slc_stock.db as db
+        from tests.conftest import VALID_SYMBOLS, MockProvider
+
+        service._maybe_background_prefetch = lambda *args: None
+        original = MockProvider.get_history
+
+        def slow_get_history(self, symbol, start, end):
+            time.sleep(0.3)
+            return original(self, symbol, start, end)
+
+        small = create_engine(db.read_engine.url, pool_size=2, max_overflow=0, pool_timeout=2)
+        requests = [(s, d) for s in sorted(VALID_SYMBOLS) for d in (date(2026, 2, 13), date(2026, 2, 20))]
+        results, errors = [], []
+
+        def fetch(symbol, day):
+            try:
+                results.append(service.get_quote(symbol, day))
+            except Exception as exc:
+                errors.append(exc)
+
+        try:
+            with patch.object(db, "ReadSession", sessionmaker(bind=small)), \
+                    patch.object(MockProvider, "get_history", slow_get_history):
+                threads = [threading.Thread(target=fetch, args=r) for r in requests]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join(20)
+        finally:
+            small.dispose()
+
+        assert errors == []
+        assert len(results) == len(requests)
+        assert all(r is not None for r in results)
+
+
+class TestBatchQuotes:
+    @pytest.fixture
+    def history_calls(self):
+        from tests.conftest import MockProvider
+
+        calls = []
+        original = MockProvider.get_history
+
+        def spy(self, symbol, start, end):
+            calls.append((symbol, start, end))
+            return original(self, symbol, start, end)
+
+        with patch.object(MockProvider, "get_history", spy), \
+                patch.object(MockProvider, "get_quote", side_effect=AssertionError):
+            yield calls
+
+    def test_cold_batch(self, service, history_calls):
+        results = service.get_quotes([
+            ("CSCO", date(2026, 2, 13)),
+            ("csco", date(2026, 2, 16)),  # Presidents' Day: falls back to the 13th
+            ("AAPL", date(2026, 2, 10)),
+            ("FAKE", date(2026, 2, 10)),
+        ], provider_name="mock")
+
+        assert [r["status"] for r in results] == ["ok", "ok", "ok", "invalid_symbol"]
+        assert results[1]["quote"]["date"] == "2026-02-13"
+        assert results[1]["quote"]["requested_date"] == "2026-02-16"
+        assert results[2]["quote"]["symbol"] == "AAPL"
+        assert sorted(c[0] for c in history_calls) == ["AAPL", "CSCO"]
+
+    def test_warm_batch_needs_no_provider(self, service, history_calls):
+        items = [("CSCO", date(2026, 2, 13)), ("CSCO", date(2026, 2, 16))]
+        service.get_quotes(items, provider_name="mock")
+        service._quote_cache.clear()
+        history_calls.clear()
+
+        results = service.get_quotes(items, provider_name="mock")
+        assert [r["status"] for r in results] == ["ok", "ok"]
+        assert history_calls == []
+
+    def test_no_bar_is_remembered(self, service, history_calls):
+        items = [("CSCO", date(2025, 6, 10))]
+        assert service.get_quotes(items, provider_name="mock")[0]["status"] == "not_found"
+        assert len(history_calls) == 1
+        assert service.get_quotes(items, provider_name="mock")[0]["status"] == "not_found"
+        assert len(history_calls) == 1
+
+    def test_stored_bars_at_batch_limit(self, service):
+        from slc_stock.config import BATCH_MAX_ITEMS
+
+        service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 13), provider_name="mock")
+        keys = [(f"S{i:04d}", date(2026, 2, 13)) for i in range(BATCH_MAX_ITEMS - 1)]
+        keys.append(("CSCO", date(2026, 2, 13)))
+        stored, no_bar = service._stored_bars(keys, "mock")
+        assert list(stored) == ["CSCO"]
+        assert [r.date for r in stored["CSCO"]] == sorted(r.date for r in stored["CSCO"])
+        assert no_bar == {}
+
+    def test_provider_error(self, service):
+        from tests.conftest import MockProvider
+
+        with patch.object(MockProvider, "get_history", side_effect=RuntimeError("down")):
+            result = service.get_quotes([("CSCO", date(2026, 2, 13))], provider_name="mock")[0]
+        assert result["status"] == "error"
+        assert "down" in result["error"]
+
+    def test_provider_error_spares_stored_days(self, service):
+        from tests.conftest import MockProvider
+
+        service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 13), provider_name="mock")
+        service._quote_cache.clear()
+        with patch.object(MockProvider, "get_history", side_effect=RuntimeError("down")):
+            results = service.get_quotes(
+                [("CSCO", date(2026, 2, 12)), ("CSCO", date(2026, 2, 20))],
+                provider_name="mock",
+            )
+        assert results[0]["status"] == "ok"
+        assert results[0]["quote"]["date"] == "2026-02-12"
+        assert results[1]["status"] == "error"
+
+
+class TestSymbolValidationCache:
+    def test_valid_symbol_not_revalidated(self, service):
+        from tests.conftest import MockProvider
+
+        service.get_quote("CSCO", date(2026, 2, 13))
+        with patch.object(MockProvider, "validate_symbol") as spy:
+            service.get_quote("AAPL", date(2026, 2, 13))
+            service.get_quote("AAPL", date(2026, 2, 12))
+        assert spy.call_count == 1
+
+    def test_details_stored(self, service):
+        from slc_stock.db import get_session
+        from slc_stock.models import ValidatedSymbol
+        from tests.conftest import MockProvider
+
+        with patch.object(MockProvider, "describe_symbol",
+                          return_value={"name": "Cisco Systems"}):
+            service.get_quote("CSCO", date(2026, 2, 13))
+        session = get_session()
+        row = session.query(ValidatedSymbol).filter_by(symbol="CSCO", provider="mock").one()
+        session.close()
+        assert row.details == {"name": "Cisco Systems"}
+
+    def test_provider_outage_allows_without_caching(self, service):
+        from slc_stock.db import get_session
+        from slc_stock.models import ValidatedSymbol
+        from tests.conftest import MockProvider
+
+        with patch.object(MockProvider, "describe_symbol",
+                          side_effect=RuntimeError("down")):
+            assert service.get_quote("CSCO", date(2026, 2, 13)) is not None
+        session = get_session()
+        assert session.query(ValidatedSymbol).count() == 0
+        session.close()
+
+
+class TestNegativeCache:
+    def test_invalid_symbol_remembered(self, service):
+        from tests.conftest import MockProvider
+
+        with pytest.raises(SymbolNotFoundError):
+            service.get_quote("FAKESYMBOL", date(2026, 2, 13))
+        with patch.object(MockProvider, "validate_symbol") as spy:
+            with pytest.raises(SymbolNotFoundError):
+                service.get_quote("FAKESYMBOL", date(2026, 2, 13))
+        spy.assert_not_called()
+
+    def test_missing_bar_remembered(self, service):
+        from tests.conftest import MockProvider
+
+        service._maybe_background_prefetch = lambda *args: None
+        with patch.object(MockProvider, "get_history", return_value=[]):
+            assert service.get_quote("CSCO", date(2026, 2, 13)) is None
+        with patch.object(MockProvider, "get_history") as history, \
+                patch.object(MockProvider, "get_quote") as quote:
+            assert service.get_quote("CSCO", date(2026, 2, 13)) is None
+        history.assert_not_called()
+        quote.assert_not_called()
+
+    def test_expired_entry_ignored(self, service):
+        from slc_stock.db import get_session
+        from slc_stock.models import NegativeResult
+
+        session = get_session()
+        session.add(NegativeResult(
+            symbol="CSCO", provider="mock", date=date(2026, 2, 13),
+            expires_at=datetime(2000, 1, 1),
+        ))
+        session.commit()
+        session.close()
+        assert service.get_quote("CSCO", date(2026, 2, 13))["date"] == "2026-02-13"
+
+    @pytest.mark.parametrize("bulk", [False, True])
+    def test_expired_entries_purged_on_write(self, service, bulk):
+        from slc_stock.db import get_session
+        from slc_stock.models import NegativeResult
+
+        session = get_session()
+        session.add_all([
+            NegativeResult(symbol="CSCO", provider="mock", date=date(2026, 1, d),
+                           expires_at=datetime(2000, 1, 1))
+            for d in range(1, 6)
+        ])
+        session.commit()
+        day = date(2026, 2, 14)
+        with get_session() as wsession:
+            if bulk:
+                service._record_negatives(wsession, "CSCO", "mock", [day])
+            else:
+                service._record_negative(wsession, "CSCO", "mock", day)
+            wsession.commit()
+        dates = [d for (d,) in session.query(NegativeResult.date).filter_by(symbol="CSCO")]
+        session.close()
+        assert dates == [day]
+
+
 class TestLatestQuote:
     def test_get_latest_quote(self, service):
         result = service.get_latest_quote("CSCO")
@@ -84,6 +403,311 @@ class TestPrefetch:
         assert len(history) == count
 
 
+class TestHistory:
+    @pytest.fixture
+    def stored(self, service):
+        service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
+        return date(2026, 2, 9), date(2026, 2, 20)
+
+    def test_matches_orm_records(self, service, stored):
+        from slc_stock.db import get_session
+        from slc_stock.models import Quote
+
+        history = service.get_history("csco", *stored, provider_name="mock")
+        with get_session() as session:
+            expected = [
+                q.to_dict()
+                for q in session.query(Quote).filter(Quote.symbol == "CSCO").order_by(Quote.date)
+            ]
+        assert history == expected
+
+    def test_selected_fields(self, service, stored):
+        history = service.get_history(
+            "CSCO", *stored, provider_name="mock", fields=["date", "close", "provider"]
+        )
+        assert history
+        assert all(list(rec) == ["date", "close", "provider"] for rec in history)
+        assert history[0]["date"] == "2026-02-09"
+        assert history[0]["provider"] == "mock"
+
+    def test_unknown_field(self, service, stored):
+        with pytest.raises(ValueError, match="Unknown field"):
+            service.get_history("CSCO", *stored, provider_name="mock", fields=["date", "bogus"])
+
+    def test_after_and_limit(self, service, stored):
+        page = service.get_history(
+            "CSCO", *stored, provider_name="mock", fields=["date"],
+            after=date(2026, 2, 12), limit=3,
+        )
+        assert [r["date"] for r in page] == ["2026-02-13", "2026-02-17", "2026-02-18"]
+
+
+class TestHistoryColumns:
+    def test_matches_rows(self, service):
+        service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
+        rows = service.get_history("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
+        result = service.get_history_columns(
+            "csco", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock"
+        )
+        assert (result["symbol"], result["provider"], result["count"]) == ("CSCO", "mock", len(rows))
+        assert "symbol" not in result["columns"] and "provider" not in result["columns"]
+        for name in result["fields"]:
+            assert result["columns"][name] == [r[name] for r in rows]
+
+    def test_empty_range(self, service):
+        result = service.get_history_columns(
+            "CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock", fields=["date", "close"]
+        )
+        assert result["count"] == 0
+        assert result["columns"] == {"date": [], "close": []}
+
+
+class TestMultiSymbolHistory:
+    @pytest.fixture
+    def stored(self, service):
+        for symbol in ("CSCO", "AAPL"):
+            service.prefetch(symbol, date(2026, 2, 9), date(2026, 2, 13), provider_name="mock")
+        return date(2026, 2, 9), date(2026, 2, 13)
+
+    def test_groups_match_single_history(self, service, stored):
+        groups = list(service.iter_histories(["csco", "IBIT", "AAPL"], *stored, provider_name="mock"))
+        assert [symbol for symbol, _ in groups] == ["AAPL", "CSCO", "IBIT"]
+        assert groups[0][1] == service.get_history("AAPL", *stored, provider_name="mock")
+        assert groups[2][1] == []
+
+    def test_batches_release_the_read_connection(self, service, stored):
+        from slc_stock.db import read_engine
+
+        expected = list(service.iter_histories(["CSCO", "AAPL"], *stored, provider_name="mock"))
+        histories = service.iter_histories(
+            ["CSCO", "AAPL"], *stored, provider_name="mock", batch_size=3
+        )
+        first = next(histories)
+        assert read_engine.pool.checkedout() == 0
+        assert [first, *histories] == expected
+
+    def test_columnar_groups(self, service, stored):
+        groups = dict(service.iter_histories(
+            ["CSCO"], *stored, provider_name="mock", fields=["date", "close"], columnar=True
+        ))
+        assert groups["CSCO"]["date"][0] == "2026-02-09"
+        assert len(groups["CSCO"]["close"]) == 5
+
+    def test_matrix(self, service, stored):
+        from slc_stock.db import get_session
+        from slc_stock.service import _upsert_quotes
+
+        # A bar only IBIT has, to leave holes in the other columns.
+        with get_session() as session:
+            _upsert_quotes(session, [{
+                "symbol": "IBIT", "provider": "mock", "date": date(2026, 2, 12),
+                "open": 1.0, "high": 1.0, "low": 1.0, "close": 50.0, "volume": 1.0,
+                "adjusted": True, "fetched_at": datetime(2026, 2, 20),
+            }])
+            session.commit()
+        matrix = service.get_history_matrix(["IBIT", "CSCO", "AAPL"], *stored, provider_name="mock")
+        assert matrix["symbols"] == ["IBIT", "CSCO", "AAPL"]
+        assert matrix["dates"] == ["2026-02-09", "2026-02-10", "2026-02-11", "2026-02-12", "2026-02-13"]
+        assert matrix["values"][0] == [None, 103.0, 103.0]
+        assert matrix["values"][3] == [50.0, 103.0, 103.0]
+
+    def test_matrix_rejects_key_field(self, service):
+        with pytest.raises(ValueError):
+            service.get_history_matrix(["CSCO"], date(2026, 2, 9), date(2026, 2, 13), field="date")
+
+
+class TestIncrementalPrefetch:
+    def test_second_prefetch_requests_nothing(self, service):
+        from tests.conftest import MockProvider
+
+        service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
+        with patch.object(MockProvider, "get_history") as spy:
+            count = service.prefetch(
+                "CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock"
+            )
+        assert count == 0
+        spy.assert_not_called()
+
+    def test_only_gaps_requested(self, service):
+        from tests.conftest import MockProvider
+
+        service.prefetch("CSCO", date(2026, 2, 11), date(2026, 2, 18), provider_name="mock")
+        with patch.object(MockProvider, "get_history", autospec=True,
+                          side_effect=MockProvider.get_history) as spy:
+            service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
+        assert [c.args[2:] for c in spy.call_args_list] == [
+            (date(2026, 2, 9), date(2026, 2, 20)),
+        ]
+        assert service.plan_prefetch(
+            "CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock"
+        ) == []
+
+    def test_empty_sessions_not_requested_again(self, service):
+        """Sessions before a listing come back empty; don't ask twice."""
+        from tests.conftest import MockProvider
+
+        service.prefetch("CSCO", date(2026, 1, 5), date(2026, 2, 20), provider_name="mock")
+        assert service.plan_prefetch(
+            "CSCO", date(2026, 1, 5), date(2026, 2, 20), provider_name="mock"
+        ) == []
+        with patch.object(MockProvider, "get_history") as spy:
+            assert service.prefetch(
+                "CSCO", date(2026, 1, 5), date(2026, 2, 20), provider_name="mock"
+            ) == 0
+        spy.assert_not_called()
+
+    def test_full_refetches_everything(self, service):
+        from tests.conftest import MockProvider
+
+        service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
+        with patch.object(MockProvider, "get_history", return_value=[]) as spy:
+            service.prefetch(
+                "CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock", full=True
+            )
+        spy.assert_called_once()
+
+
+class TestBulkUpsert:
+    def _rows(self, closes):
+        from slc_stock.service import _quote_row
+        from slc_stock.providers import QuoteData
+
+        now = datetime(2026, 2, 20)
+        return [
+            _quote_row(
+                QuoteData("CSCO", date(2026, 2, 9 + i), 100.0, 105.0, 99.0, c, 1000.0), "mock", now
+            )
+            for i, c in enumerate(closes)
+        ]
+
+    def test_counts(self, service):
+        from slc_stock.db import get_session
+        from slc_stock.service import _upsert_quotes
+
+        session = get_session()
+        try:
+            first = _upsert_quotes(session, self._rows([1.0, 2.0, 3.0]), batch_size=2)
+            second = _upsert_quotes(session, self._rows([1.0, 2.5, 3.0, 4.0]), batch_size=2)
+            session.commit()
+        finally:
+            session.close()
+        assert first.to_dict() == {"inserted": 3, "updated": 0, "unchanged": 0}
+        assert second.to_dict() == {"inserted": 1, "updated": 1, "unchanged": 2}
+        history = service.get_history("CSCO", date(2026, 2, 9), date(2026, 2, 12), "mock")
+        assert [q["close"] for q in history] == [1.0, 2.5, 3.0, 4.0]
+
+    def test_duplicate_keys_in_batch(self, service):
+        from slc_stock.db import get_session
+        from slc_stock.service import _upsert_quotes
+
+        rows = self._rows([1.0]) + self._rows([2.0])
+        session = get_session()
+        try:
+            stats = _upsert_quotes(session, rows)
+            session.commit()
+        finally:
+            session.close()
+        assert stats.total == 1
+        history = service.get_history("CSCO", date(2026, 2, 9), date(2026, 2, 9), "mock")
+        assert history[0]["close"] == 2.0
+
+
+class TestDataVersion:
+    def test_changes_only_when_quotes_change(self, service):
+        from slc_stock.db import get_session
+        from slc_stock.service import _upsert_quotes
+
+        def write(close):
+            with get_session() as session:
+                _upsert_quotes(session, TestBulkUpsert()._rows([close]))
+                session.commit()
+
+        empty, _ = service.data_version("CSCO")
+        write(1.0)
+        first, last_modified = service.data_version("CSCO")
+        write(1.0)
+        assert service.data_version("CSCO")[0] == first
+        write(2.0)
+        assert service.data_version("CSCO")[0] != first
+        assert service.data_version("CSCO", "other")[0] == empty
+        assert last_modified is not None
+
+
+class TestChanges:
+    @staticmethod
+    def _write(closes):
+        from slc_stock.db import get_session
+        from slc_stock.service import _upsert_quotes
+
+        with get_session() as session:
+            _upsert_quotes(session, TestBulkUpsert()._rows(closes))
+            session.commit()
+
+    def test_feed_follows_writes(self, service):
+        self._write([1.0, 2.0, 3.0])
+        first = service.get_changes(fields=["date", "close"])
+        assert [q["close"] for q in first["quotes"]] == [1.0, 2.0, 3.0]
+        assert [q["seq"] for q in first["quotes"]] == sorted(q["seq"] for q in first["quotes"])
+        assert first["until"] == first["quotes"][-1]["seq"]
+
+        self._write([1.0, 2.0, 3.0])
+        assert service.get_changes(first["until"])["count"] == 0
+
+        self._write([1.0, 2.5, 3.0])
+        delta = service.get_changes(first["until"], fields=["date", "close"])
+        assert [(q["date"], q["close"]) for q in delta["quotes"]] == [("2026-02-10", 2.5)]
+
+    def test_concurrent_writers_get_ordered_numbers(self, tmp_path):
+        """Two processes' writers: the second waits for the first to commit."""
+        import threading
+        import time
+
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.orm import Session
+
+        from slc_stock import migrations
+        from slc_stock.service import _upsert_quotes
+
+        path = tmp_path / "shared.db"
+        engines = [create_engine(f"sqlite:///{path}") for _ in range(2)]
+        try:
+            migrations.migrate(engines[0])
+            rows = TestBulkUpsert()._rows([1.0, 2.0])
+            other = [dict(r, symbol="AAPL") for r in rows]
+
+            def write_other():
+                with Session(engines[1]) as session:
+                    _upsert_quotes(session, other)
+                    session.commit()
+
+            first = Session(engines[0])
+            _upsert_quotes(first, rows)  # holds the write lock, uncommitted
+            second = threading.Thread(target=write_other)
+            second.start()
+            time.sleep(0.3)
+            first.commit()
+            first.close()
+            second.join(10)
+
+            with engines[0].connect() as conn:
+                seqs = conn.execute(text("SELECT symbol, seq FROM quotes ORDER BY seq")).all()
+        finally:
+            for eng in engines:
+                eng.dispose()
+        assert [s for s, _ in seqs] == ["CSCO", "CSCO", "AAPL", "AAPL"]
+        assert len({n for _, n in seqs}) == 4
+
+    def test_pages_and_filters(self, service):
+        self._write([1.0, 2.0, 3.0])
+        page = service.get_changes(limit=2)
+        assert (page["count"], page["more"]) == (2, True)
+        rest = service.get_changes(page["until"], limit=2)
+        assert (rest["count"], rest["more"]) == (1, False)
+        assert service.get_changes(symbol="aapl")["count"] == 0
+        assert service.get_changes(symbol="csco", provider_name="other")["count"] == 0
+        assert service.get_changes(symbol="csco", provider_name="mock")["count"] == 3
+
+
 class TestSymbolInfo:
     def test_info_after_prefetch(self, service):
         service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
@@ -113,6 +737,88 @@ class TestCacheInfo:
         assert info["symbols"][0]["symbol"] == "CSCO"
 
 
+class TestSymbolStats:
+    def _stats(self):
+        from slc_stock.db import get_session
+        from slc_stock.models import SymbolStat
+
+        session = get_session()
+        try:
+            return {
+                (r.symbol, r.provider): (r.count, r.earliest, r.latest)
+                for r in session.query(SymbolStat).all()
+            }
+        finally:
+            session.close()
+
+    def _aggregate(self):
+        from slc_stock.db import get_session
+        from slc_stock.models import Quote
+
+        session = get_session()
+        try:
+            rows = (
+                session.query(
+                    Quote.symbol, Quote.provider, func.count(),
+                    func.min(Quote.date), func.max(Quote.date),
+                )
+                .group_by(Quote.symbol, Quote.provider)
+                .all()
+            )
+            return {(r[0], r[1]): tuple(r[2:]) for r in rows}
+        finally:
+            session.close()
+
+    def test_maintained_by_prefetch_and_load(self, service):
+        service.prefetch("CSCO", date(2026, 2, 12), date(2026, 2, 20), provider_name="mock")
+        service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 13), provider_name="mock")
+        records = service.dump_database()
+        for rec in records:
+            rec["provider"] = "other"
+        records[0]["close"] = 1.0
+        service.load_database(records)
+        service.load_database(records)
+        assert self._stats() == self._aggregate()
+        assert self._stats()[("CSCO", "mock")] == (9, date(2026, 2, 9), date(2026, 2, 20))
+
+    def test_updates_do_not_change_count(self, service):
+        service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
+        records = service.dump_database()
+        for rec in records:
+            rec["close"] += 1
+        service.load_database(records)
+        assert self._stats()[("CSCO", "mock")][0] == 9
+
+    def test_rebuild_from_quotes(self, service):
+        from slc_stock.db import engine, init_db
+        from slc_stock.models import SchemaVersion, SymbolStat
+
+        service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
+        # A database from before schema versioning and symbol_stats.
+        with engine.begin() as conn:
+            conn.execute(SymbolStat.__table__.delete())
+            conn.execute(SchemaVersion.__table__.delete())
+        assert service.get_symbol_info("CSCO") is None
+        init_db()
+        assert self._stats() == self._aggregate()
+        assert service.get_symbol_info("CSCO")["total_quotes"] == 9
+
+    def test_info_by_provider(self, service):
+        service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 13), provider_name="mock")
+        records = service.dump_database()
+        for rec in records[:2]:
+            rec["provider"] = "other"
+        service.load_database(records[:2])
+        info = service.get_symbol_info("csco")
+        assert info["providers"] == ["mock", "other"]
+        assert info["total_quotes"] == 7
+        assert info["by_provider"]["other"]["count"] == 2
+        assert info["date_range"] == {"earliest": "2026-02-09", "latest": "2026-02-13"}
+        cache = service.get_cache_info()
+        assert cache["symbols"][0]["providers"] == ["mock", "other"]
+        assert cache["total_quotes"] == 7
+
+
 class TestDumpLoad:
     def test_round_trip(self, service):
         service.prefetch("CSCO", date(2026, 2, 9), date(2026, 2, 20), provider_name="mock")
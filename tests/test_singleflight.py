@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from slc_stock.singleflight import SingleFlight
+
+
+def _run_concurrently(n, target):
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return "value"
+
+        leader = threading.Thread(target=lambda: results.append(flights.do("k", slow)))
+        leader.start()
+        while not calls:
+            pass
+        followers = _run_concurrently(5, lambda: results.append(flights.do("k", slow)))
+        while flights.stats()["coalesced"] < 5:
+            pass
+        release.set()
+        for t in [leader, *followers]:
+            t.join(5)
+
+        assert len(calls) == 1
+        assert results == ["value"] * 6
+
+    def test_error_propagates_to_waiters(self):
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def failing():
+            started.set()
+            release.wait(5)
+            raise RuntimeError("boom")
+
+        def call():
+            try:
+                flights.do("k", failing)
+            except RuntimeError as exc:
+                errors.append(str(exc))
+
+        threads = _run_concurrently(1, call)
+        started.wait(5)
+        threads += _run_concurrently(3, call)
+        while flights.stats()["coalesced"] < 3:
+            pass
+        release.set()
+        for t in threads:
+            t.join(5)
+        assert errors == ["boom"] * 4
+
+    def test_key_released_after_call(self):
+        flights = SingleFlight()
+        assert flights.do("k", lambda: 1) == 1
+        assert flights.do("k", lambda: 2) == 2
+        assert flights.stats() == {"in_flight": 0, "coalesced": 0}
+
+    def test_leader_exception_raised(self):
+        flights = SingleFlight()
+        with pytest.raises(ValueError):
+            flights.do("k", lambda: int("x"))
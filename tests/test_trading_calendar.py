@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+
+from slc_stock.trading_calendar import get_calendar
+
+
+class TestNYSECalendar:
+    def test_holidays_2026(self):
+        cal = get_calendar("XNYS")
+        assert cal.holidays(2026) == {
+            date(2026, 1, 1),
+            date(2026, 1, 19),
+            date(2026, 2, 16),
+            date(2026, 4, 3),
+            date(2026, 5, 25),
+            date(2026, 6, 19),
+            date(2026, 7, 3),   # July 4 falls on a Saturday
+            date(2026, 9, 7),
+            date(2026, 11, 26),
+            date(2026, 12, 25),
+        }
+
+    def test_saturday_new_year_not_observed(self):
+        """Jan 1 2022 was a Saturday; Dec 31 2021 was a normal session."""
+        cal = get_calendar("XNYS")
+        assert cal.is_session(date(2021, 12, 31))
+
+    def test_previous_session_skips_weekend_and_holiday(self):
+        cal = get_calendar("XNYS")
+        assert cal.previous_session(date(2026, 2, 16)) == date(2026, 2, 13)
+        assert cal.previous_session(date(2026, 2, 17)) == date(2026, 2, 17)
+
+    def test_previous_session_crosses_year(self):
+        cal = get_calendar("XNYS")
+        assert cal.previous_session(date(2026, 1, 1)) == date(2025, 12, 31)
+
+    def test_sessions_between(self):
+        cal = get_calendar("XNYS")
+        assert cal.sessions_between(date(2026, 11, 24), date(2026, 11, 30)) == [
+            date(2026, 11, 24),
+            date(2026, 11, 25),
+            date(2026, 11, 27),
+            date(2026, 11, 30),
+        ]
+
+
+class TestCalendarRegistry:
+    def test_weekdays_calendar_has_no_holidays(self):
+        cal = get_calendar("weekdays")
+        assert cal.is_session(date(2026, 12, 25))
+        assert not cal.is_session(date(2026, 12, 26))
+
+    def test_unknown_calendar(self):
+        with pytest.raises(ValueError):
+            get_calendar("XXXX")
@@ -50,6 +50,11 @@ class TestHtmxPartials:
         assert resp.status_code == 200
         assert b"System Status" in resp.data
 
+    def test_cache_status_not_modified(self, client):
+        etag = client.get("/ui/cache-status").headers["ETag"]
+        resp = client.get("/ui/cache-status", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
     def test_quote_partial(self, client):
         resp = client.get("/ui/quote/CSCO/2026-02-13")
         assert resp.status_code == 200
@@ -0,0 +1,72 @@
+import math
+import struct
+from unittest.mock import patch
+
+import pytest
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from slc_stock import wire
+
+
+def _accept(header: str) -> MIMEAccept:
+    return parse_accept_header(header, MIMEAccept)
+
+
+class TestNegotiate:
+    @pytest.mark.parametrize("header, expected", [
+        ("", wire.MIME_JSON),
+        ("*/*", wire.MIME_JSON),
+        ("text/html", wire.MIME_JSON),
+        ("application/msgpack", wire.MIME_MSGPACK),
+        ("application/x-msgpack, application/json;q=0.5", wire.MIME_MSGPACK),
+    ])
+    def test_picks_type(self, header, expected):
+        assert wire.negotiate(_accept(header)) == expected
+
+    def test_arrow_without_pyarrow(self):
+        with patch.object(wire, "pa", None):
+            with pytest.raises(ValueError, match="pyarrow"):
+                wire.negotiate(_accept(wire.MIME_ARROW))
+            assert wire.negotiate(_accept(f"{wire.MIME_ARROW}, */*;q=0.1")) == wire.MIME_JSON
+
+
+class TestMsgpack:
+    def test_scalars_and_containers(self):
+        out = []
+        wire._pack(out, {"a": [1, -1, 1.5, None, True, "x"], "b": b"\x01"})
+        assert b"".join(out) == (
+            b"\x82\xa1a\x96\x01\xff\xcb" + struct.pack(">d", 1.5)
+            + b"\xc0\xc3\xa1x\xa1b\xc4\x01\x01"
+        )
+
+    def test_long_lengths(self):
+        out = []
+        wire._pack(out, ["y" * 40, list(range(20))])
+        body = b"".join(out)
+        assert body.startswith(b"\x92\xd9\x28" + b"y" * 40 + b"\xdc\x00\x14")
+
+    def test_typed_columns(self):
+        columns = wire.typed_columns({
+            "close": [1.5, None], "volume": [100.0, None], "adjusted": [True, False],
+        })
+        body = wire.encode_msgpack({"count": 2}, columns)
+        close = struct.pack("<2d", 1.5, math.nan)
+        volume = struct.pack("<2q", 100, -(2**63))
+        assert b"\xa3<f8\xa4data\xc4\x10" + close in body
+        assert b"\xa3<i8\xa4data\xc4\x10" + volume in body
+        assert b"\xa3|u1\xa4data\xc4\x02\x01\x00" in body
+
+
+class TestArrow:
+    def test_roundtrip(self):
+        pa = pytest.importorskip("pyarrow")
+        columns = wire.typed_columns({
+            "date": [20500, 20501], "close": [1.5, 2.5], "volume": [10.0, None],
+        })
+        body = wire.encode_arrow({"symbol": "CSCO", "fields": ["date", "close"]}, columns)
+        table = pa.ipc.open_stream(body).read_all()
+        assert table.column("close").to_pylist() == [1.5, 2.5]
+        assert table.column("volume").to_pylist() == [10, None]
+        assert str(table.column("date")[0]) == "2026-02-16"
+        assert table.schema.metadata[b"symbol"] == b"CSCO"